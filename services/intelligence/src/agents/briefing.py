@@ -10,9 +10,11 @@ import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, TYPE_CHECKING
 from zoneinfo import ZoneInfo
-import httpx
 
 from config import Config
+from http_clients import clients
+from inference_scheduler import Priority
+from prompts import PROMPTS
 
 if TYPE_CHECKING:
     from bot import MemuBot
@@ -55,26 +57,26 @@ class MorningBriefingAgent:
             return {'available': False}
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                url = "https://api.openweathermap.org/data/2.5/weather"
-                params = {
-                    'q': f"{Config.WEATHER_CITY},{Config.WEATHER_COUNTRY}",
-                    'appid': Config.WEATHER_API_KEY,
-                    'units': 'metric'
-                }
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            client = clients.get('web')
+            url = "https://api.openweathermap.org/data/2.5/weather"
+            params = {
+                'q': f"{Config.WEATHER_CITY},{Config.WEATHER_COUNTRY}",
+                'appid': Config.WEATHER_API_KEY,
+                'units': 'metric'
+            }
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
 
-                return {
-                    'available': True,
-                    'city': data.get('name', Config.WEATHER_CITY),
-                    'temp': round(data['main']['temp']),
-                    'feels_like': round(data['main']['feels_like']),
-                    'description': data['weather'][0]['description'],
-                    'icon': self._weather_emoji(data['weather'][0]['icon']),
-                    'humidity': data['main']['humidity']
-                }
+            return {
+                'available': True,
+                'city': data.get('name', Config.WEATHER_CITY),
+                'temp': round(data['main']['temp']),
+                'feels_like': round(data['main']['feels_like']),
+                'description': data['weather'][0]['description'],
+                'icon': self._weather_emoji(data['weather'][0]['icon']),
+                'humidity': data['main']['humidity']
+            }
         except Exception as e:
             logger.warning(f"Failed to get weather: {e}")
             return {'available': False}
@@ -108,27 +110,27 @@ class MorningBriefingAgent:
         max_count = Config.BRIEFING_NEWS_COUNT
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                for feed_url in feed_urls:
-                    if len(headlines) >= max_count:
-                        break
-                    try:
-                        response = await client.get(feed_url)
-                        if response.status_code != 200:
-                            continue
-                        root = ET.fromstring(response.text)
-                        # Standard RSS 2.0 parsing
-                        for item in root.iter('item'):
-                            if len(headlines) >= max_count:
-                                break
-                            title_el = item.find('title')
-                            if title_el is not None and title_el.text:
-                                headlines.append({
-                                    'title': title_el.text.strip()
-                                })
-                    except Exception as e:
-                        logger.debug(f"Failed to fetch feed {feed_url}: {e}")
+            client = clients.get('web')
+            for feed_url in feed_urls:
+                if len(headlines) >= max_count:
+                    break
+                try:
+                    response = await client.get(feed_url)
+                    if response.status_code != 200:
                         continue
+                    root = ET.fromstring(response.text)
+                    # Standard RSS 2.0 parsing
+                    for item in root.iter('item'):
+                        if len(headlines) >= max_count:
+                            break
+                        title_el = item.find('title')
+                        if title_el is not None and title_el.text:
+                            headlines.append({
+                                'title': title_el.text.strip()
+                            })
+                except Exception as e:
+                    logger.debug(f"Failed to fetch feed {feed_url}: {e}")
+                    continue
 
             return {
                 'available': len(headlines) > 0,
@@ -145,47 +147,47 @@ class MorningBriefingAgent:
             return {'available': False}
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                url = f"{Config.IMMICH_API_URL}/api/memories"
-                headers = {'x-api-key': Config.IMMICH_API_KEY}
-
-                response = await client.get(url, headers=headers)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    today = datetime.now(self.timezone).date()
-
-                    # Filter to memories that should show today
-                    todays_memories = []
-                    for memory in data:
-                        show_at = memory.get('showAt', '')
-                        if show_at:
-                            try:
-                                show_date = datetime.fromisoformat(show_at.replace('Z', '+00:00')).date()
-                                if show_date == today:
-                                    todays_memories.append(memory)
-                            except (ValueError, TypeError):
-                                continue
-
-                    # Count photos and group by year
-                    memories_by_year = {}
-                    total_photos = 0
-                    for memory in todays_memories:
-                        year_data = memory.get('data', {})
-                        year = year_data.get('year', 0)
-                        photo_count = len(memory.get('assets', []))
-                        total_photos += photo_count
-                        if year:
-                            memories_by_year[year] = photo_count
-
-                    return {
-                        'available': total_photos > 0,
-                        'total_count': total_photos,
-                        'by_year': memories_by_year
-                    }
-                else:
-                    logger.warning(f"Immich memories API returned {response.status_code}")
-                    return {'available': False}
+            client = clients.get('immich')
+            url = f"{Config.IMMICH_API_URL}/api/memories"
+            headers = {'x-api-key': Config.IMMICH_API_KEY}
+
+            response = await client.get(url, headers=headers)
+
+            if response.status_code == 200:
+                data = response.json()
+                today = datetime.now(self.timezone).date()
+
+                # Filter to memories that should show today
+                todays_memories = []
+                for memory in data:
+                    show_at = memory.get('showAt', '')
+                    if show_at:
+                        try:
+                            show_date = datetime.fromisoformat(show_at.replace('Z', '+00:00')).date()
+                            if show_date == today:
+                                todays_memories.append(memory)
+                        except (ValueError, TypeError):
+                            continue
+
+                # Count photos and group by year
+                memories_by_year = {}
+                total_photos = 0
+                for memory in todays_memories:
+                    year_data = memory.get('data', {})
+                    year = year_data.get('year', 0)
+                    photo_count = len(memory.get('assets', []))
+                    total_photos += photo_count
+                    if year:
+                        memories_by_year[year] = photo_count
+
+                return {
+                    'available': total_photos > 0,
+                    'total_count': total_photos,
+                    'by_year': memories_by_year
+                }
+            else:
+                logger.warning(f"Immich memories API returned {response.status_code}")
+                return {'available': False}
 
         except Exception as e:
             logger.warning(f"Failed to get memories: {e}")
@@ -273,30 +275,19 @@ class MorningBriefingAgent:
 
         return "\n\n".join(parts)
 
-    async def generate_briefing(self, data: Dict[str, Any]) -> str:
+    async def generate_briefing(self, data: Dict[str, Any], room_id: Optional[str] = None) -> str:
         """Generate the morning briefing using Ollama."""
         context = self.build_briefing_prompt(data)
-
-        system_prompt = """You are a warm Family Chief of Staff writing a concise morning briefing.
-
-Rules:
-- Start with a ONE sentence greeting including the weather (use EXACT data: temperature, description, city).
-- If there are calendar events, list them briefly.
-- If news headlines are provided, list ALL of them as bullet points under "Headlines:". Do NOT skip any.
-- If photo memories are mentioned, include them. If NO photo memories are in the data, do NOT mention photos at all.
-- If there are shopping list items, mention them briefly.
-- Do NOT invent, fabricate, or imagine ANY information not explicitly provided in the data.
-- Do NOT add filler text, lifestyle suggestions, or motivational padding.
-- Keep the entire briefing under 200 words."""
-
-        prompt = f"""Based on this information, write a warm morning briefing:
-
-{context}
-
-Morning briefing:"""
+        template = PROMPTS['briefing']
 
         try:
-            briefing = await self.bot.brain.generate(prompt, system_prompt=system_prompt)
+            briefing = await self.bot.brain.generate(
+                template.render(context=context),
+                system_prompt=template.system,
+                priority=Priority.BACKGROUND,
+                room_id=room_id,
+                task=template.name
+            )
             if briefing:
                 return briefing
         except Exception as e:
@@ -358,7 +349,7 @@ Morning briefing:"""
             data = await self.gather_all()
 
             # Generate briefing
-            briefing = await self.generate_briefing(data)
+            briefing = await self.generate_briefing(data, room_id=target_room)
 
             # Deliver to room
             await self.bot.send_text(target_room, f"🌅 **Morning Briefing**\n\n{briefing}")
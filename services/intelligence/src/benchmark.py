@@ -0,0 +1,187 @@
+"""
+Model benchmark for picking the fastest adequate model on this hub.
+
+Runs a fixed, labelled set of intent-classification and extraction requests
+against every model Ollama has locally, measuring latency, generation speed
+and accuracy. The fastest model that clears BENCHMARK_MIN_ACCURACY is
+recommended for the small-model tasks (see Brain.task_models), and results
+are stored in model_benchmarks for the admin dashboard. Models the Brain
+doesn't use are unloaded once their run is done.
+"""
+
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from call_ledger import percentile
+from config import Config
+from http_clients import clients
+from inference_scheduler import Priority
+from prompts import PROMPTS
+
+if TYPE_CHECKING:
+    from brain import Brain
+
+logger = logging.getLogger("memu.benchmark")
+
+NS_PER_S = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    """One labelled request: the task's template, the message, and what must come back."""
+    task: str
+    content: str
+    # field -> expected value; 'intent' must match exactly, other fields must contain it
+    expected: Dict[str, str]
+
+
+CASES: Sequence[BenchmarkCase] = (
+    BenchmarkCase('intent', "what's happening tomorrow?", {'intent': 'CALENDAR'}),
+    BenchmarkCase('intent', "anything on this weekend", {'intent': 'CALENDAR'}),
+    BenchmarkCase('intent', "swimming lessons saturday at 10am", {'intent': 'SCHEDULE'}),
+    BenchmarkCase('intent', "dentist appointment for Sam next Friday 3pm", {'intent': 'SCHEDULE'}),
+    BenchmarkCase('intent', "we need milk, bread and eggs", {'intent': 'LIST_ADD'}),
+    BenchmarkCase('intent', "what's on the shopping list", {'intent': 'LIST_SHOW'}),
+    BenchmarkCase('intent', "remind me to call grandma on sunday", {'intent': 'REMINDER'}),
+    BenchmarkCase('intent', "what's the wifi password?", {'intent': 'RECALL'}),
+    BenchmarkCase('intent', "the plumber's number is 07700 900123", {'intent': 'REMEMBER'}),
+    BenchmarkCase('intent', "what did I miss in here today", {'intent': 'SUMMARIZE'}),
+    BenchmarkCase('intent', "how are you doing today?", {'intent': 'CHAT'}),
+    BenchmarkCase('extract_reminder', "remind me to take the bins out tonight at 8pm",
+                  {'task': 'bins', 'time': '8'}),
+    BenchmarkCase('extract_reminder', "remind me to book the MOT tomorrow morning",
+                  {'task': 'MOT', 'time': 'tomorrow'}),
+    BenchmarkCase('extract_calendar_event', "football training Tuesday 5pm at the rec",
+                  {'summary': 'football', 'date': 'tuesday', 'time': '5'}),
+    BenchmarkCase('extract_calendar_event', "parents evening on March 12 at 6:30pm",
+                  {'summary': 'parents', 'date': 'march', 'time': '6'}),
+)
+
+
+def score(case: BenchmarkCase, parsed: Any) -> bool:
+    if not isinstance(parsed, dict):
+        return False
+    for field, want in case.expected.items():
+        got = parsed.get(field)
+        if not isinstance(got, str):
+            return False
+        if field == 'intent':
+            if got.strip().upper() != want:
+                return False
+        elif want.lower() not in got.lower():
+            return False
+    return True
+
+
+class ModelBenchmark:
+    """Benchmarks local models through the Brain and recommends one for the small-model tasks."""
+
+    def __init__(self, brain: "Brain", store=None, cases: Sequence[BenchmarkCase] = CASES):
+        self.brain = brain
+        self.store = store
+        self.cases = cases
+        # Recommendation of the last run persisted by this process
+        self.last_recommended: Optional[str] = None
+
+    async def local_models(self) -> List[str]:
+        """Models Ollama has on disk, skipping embedding-only models."""
+        response = await clients.get('ollama').get(f"{self.brain.ollama_url}/api/tags", timeout=10)
+        response.raise_for_status()
+        names = [m.get('name', '') for m in response.json().get('models', [])]
+        return [n for n in names if n and 'embed' not in n]
+
+    async def run(self, models: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Benchmark each model; results are sorted fastest (p50) first."""
+        models = models or await self.local_models()
+        results = [await self._benchmark_model(model) for model in models]
+        results.sort(key=lambda r: r['p50_ms'])
+        return results
+
+    async def _benchmark_model(self, model: str) -> Dict[str, Any]:
+        tokens = {'count': 0, 'ns': 0}
+
+        def collect(result: Dict[str, Any], task: Optional[str]) -> None:
+            if result.get('model') == model:
+                tokens['count'] += result.get('eval_count') or 0
+                tokens['ns'] += result.get('eval_duration') or 0
+
+        # Load the model first so load time doesn't land in the latency figures
+        await self.brain.generate("Hi", priority=Priority.BACKGROUND, options={'num_predict': 1}, model=model)
+
+        # Don't leave a model the Brain never calls taking up memory afterwards
+        unload = None if model in self.brain.active_models() else 0
+        latencies: List[float] = []
+        passed: Dict[str, List[bool]] = {}
+        self.brain.observers.append(collect)
+        try:
+            for i, case in enumerate(self.cases):
+                template = PROMPTS[case.task]
+                started = time.monotonic()
+                response = await self.brain.generate(
+                    template.render(content=case.content), system_prompt=template.system,
+                    json_mode=True, priority=Priority.BACKGROUND, task=template.name, model=model,
+                    keep_alive=unload if i == len(self.cases) - 1 else None
+                )
+                latencies.append((time.monotonic() - started) * 1000)
+                ok = bool(response) and score(case, self.brain._extract_json(response))
+                passed.setdefault(case.task, []).append(ok)
+        finally:
+            self.brain.observers.remove(collect)
+
+        all_passed = [ok for oks in passed.values() for ok in oks]
+        result = {
+            'model': model,
+            'cases': len(all_passed),
+            'accuracy': round(sum(all_passed) / len(all_passed), 3) if all_passed else 0.0,
+            'task_accuracy': {t: round(sum(oks) / len(oks), 3) for t, oks in passed.items()},
+            'tokens_per_s': round(tokens['count'] / (tokens['ns'] / NS_PER_S), 1) if tokens['ns'] else 0.0,
+            'p50_ms': round(percentile(latencies, 50)),
+            'p95_ms': round(percentile(latencies, 95)),
+        }
+        logger.info(
+            f"Benchmark {model}: accuracy {result['accuracy']:.0%}, p50 {result['p50_ms']}ms, "
+            f"p95 {result['p95_ms']}ms, {result['tokens_per_s']} tok/s"
+        )
+        return result
+
+    @staticmethod
+    def recommend(results: List[Dict[str, Any]], min_accuracy: Optional[float] = None) -> Optional[str]:
+        """Fastest model whose accuracy clears the bar, or None."""
+        bar = Config.BENCHMARK_MIN_ACCURACY if min_accuracy is None else min_accuracy
+        adequate = [r for r in results if r['accuracy'] >= bar]
+        return min(adequate, key=lambda r: r['p50_ms'])['model'] if adequate else None
+
+    def apply(self, model: str) -> None:
+        """Use `model` for the small-model tasks until restart (OLLAMA_SMALL_MODEL makes it stick)."""
+        from brain import SMALL_MODEL_TASKS
+        for task in SMALL_MODEL_TASKS:
+            self.brain.task_models[task] = model
+        logger.info(f"Benchmark: using {model} for {', '.join(SMALL_MODEL_TASKS)}")
+
+    async def latest_recommendation(self) -> Optional[str]:
+        """The model the most recent run recommended, without benchmarking again."""
+        if self.last_recommended is not None or self.store is None:
+            return self.last_recommended
+        try:
+            rows = await self.store.get_latest_benchmarks()
+        except Exception as e:
+            logger.warning(f"Failed to read stored benchmark results: {e}")
+            return None
+        return next((r['model'] for r in rows if r['recommended']), None)
+
+    async def persist(self, results: List[Dict[str, Any]], recommended: Optional[str]) -> Optional[str]:
+        """Store a run's results; returns the run id."""
+        self.last_recommended = recommended
+        if self.store is None:
+            return None
+        run_id = uuid.uuid4().hex[:12]
+        try:
+            for r in results:
+                await self.store.record_model_benchmark(run_id, {**r, 'recommended': r['model'] == recommended})
+        except Exception as e:
+            logger.warning(f"Failed to store benchmark results: {e}")
+            return None
+        return run_id
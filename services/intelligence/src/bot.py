@@ -1,13 +1,29 @@
 import logging
 import asyncio
-import httpx
 from nio import AsyncClient, MatrixRoom, RoomMessageText, InviteMemberEvent
 from config import Config
 from brain import Brain
 from memory import MemoryStore
 from tools.calendar_tool import CalendarManager
+from streaming import StreamingReply, TYPING_MARKER
+from intent_rules import FastIntentClassifier
+from intent_batcher import IntentBatcher
+from benchmark import ModelBenchmark
+from semantic_index import SemanticIndex
+from reminder_scheduler import ReminderScheduler
+from context_builder import ContextBuilder, rank_by_query
+from http_clients import clients
 import dateparser
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+# Natural-language intents whose handlers never call the model
+NO_MODEL_INTENTS = {'CALENDAR', 'LIST_ADD', 'LIST_SHOW', 'REMEMBER'}
+# Intents that only read and generate: a newer message may safely cancel them
+SUPERSEDABLE_INTENTS = {'CHAT', 'RECALL', 'SUMMARIZE'}
+SUPERSEDED_NOTE = "(stopped — replaced by your newer message)"
+# Matrix power level of a room admin
+ADMIN_POWER_LEVEL = 100
 
 logger = logging.getLogger("memu.bot")
 
@@ -21,6 +37,13 @@ class MemuBot:
         self.brain = Brain()
         self.memory = MemoryStore()
         self.calendar = CalendarManager()
+        self.fast_intent = FastIntentClassifier()
+        self.benchmark = ModelBenchmark(self.brain, self.memory)
+        self.semantic = SemanticIndex(self.brain, self.memory)
+        self.reminders = ReminderScheduler(self.memory, self.send_reminder)
+        self.intent_batcher = IntentBatcher(
+            self.brain, window_s=Config.INTENT_BATCH_WINDOW, max_batch=Config.INTENT_BATCH_MAX
+        ) if Config.INTENT_BATCH_ENABLED else None
 
         # Extract localpart for robust self-detection (e.g. "memu_bot" from "@memu_bot:domain")
         configured = Config.MATRIX_BOT_USERNAME or ""
@@ -31,17 +54,35 @@ class MemuBot:
         # AI mode cache: {room_id: mode} — avoids DB hit on every message
         self._ai_mode_cache = {}
 
+        # In-flight natural-language handling per (room, sender); a newer
+        # message from the same person cancels the older one, but only once
+        # it is answering a read-only intent (never while classifying or writing)
+        self._conversations: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._supersedable: Set[asyncio.Task] = set()
+        # Conversations cancelled by a newer message, and those with a streamed reply on screen
+        self._superseded: Set[asyncio.Task] = set()
+        self._streamed: Set[asyncio.Task] = set()
+        self.superseded = 0
+        self._benchmark_task: Optional[asyncio.Task] = None
+        # Chat archive backfills running in the background
+        self._backfills: Set[asyncio.Task] = set()
+
     async def start(self):
         logger.info("Starting MemuBot...")
         await self.memory.connect()
         await self.memory.init_db()  # Ensure tables exist
+        await self.semantic.available()  # Logs now if the embedding columns don't fit the config
+        if self.brain.cache is not None and Config.LLM_CACHE_PERSIST:
+            await self.brain.cache.attach_store(self.memory, self.brain.active_models())
+        if Config.LLM_LEDGER_PERSIST:
+            self.brain.ledger.attach_store(self.memory)
 
         # Add callbacks
         self.client.add_event_callback(self.message_callback, RoomMessageText)
         self.client.add_event_callback(self.invite_callback, InviteMemberEvent)
 
-        # Start reminder checker loop in background
-        asyncio.create_task(self.check_reminders_loop())
+        # Deliver reminders in the background, each at its due time
+        reminders_task = asyncio.create_task(self.reminders.run())
 
         try:
             # Do an initial sync to resolve the server-side user_id
@@ -55,20 +96,120 @@ class MemuBot:
                 # Update localpart from server-resolved ID for belt-and-braces safety
                 self._bot_localpart = self.client.user_id.split(':')[0].lstrip('@').lower()
 
+            # Catch the archive up on anything said while the bot was offline
+            for room_id in list(self.client.rooms):
+                self._start_backfill(room_id)
+
             # Sync forever
             await self.client.sync_forever(timeout=30000)
         except Exception as e:
             logger.error(f"Sync failed: {e}")
         finally:
+            reminders_task.cancel()
+            await self.reminders.close()
             await self.client.close()
+            # Write the last batch of call records while the pool is still open
+            await self.brain.ledger.flush()
             await self.memory.close()
 
     async def invite_callback(self, room: MatrixRoom, event: InviteMemberEvent):
         """Auto-join rooms when invited."""
         logger.info(f"Invited to room {room.room_id} by {event.sender}. Joining...")
         await self.client.join(room.room_id)
+        self._start_backfill(room.room_id)
+
+    @staticmethod
+    def _edit_of(event: RoomMessageText) -> Optional[Tuple[str, str]]:
+        """(original event_id, new body) when the event is an edit (m.replace)."""
+        content = event.source.get('content', {}) if isinstance(event.source, dict) else {}
+        relates = content.get('m.relates_to') or {}
+        if relates.get('rel_type') == 'm.replace' and relates.get('event_id'):
+            return relates['event_id'], (content.get('m.new_content') or {}).get('body', '')
+        return None
+
+    def _is_streaming_draft(self, event: RoomMessageText, body: str) -> bool:
+        """The bot's own in-progress streaming edit; only the final body is archived."""
+        if not body.endswith(TYPING_MARKER):
+            return False
+        sender_localpart = event.sender.split(':')[0].lstrip('@').lower()
+        return event.sender == self.client.user_id or sender_localpart == self._bot_localpart
+
+    @staticmethod
+    def _archive_row(room_id: str, event: RoomMessageText) -> Dict:
+        return {
+            'event_id': event.event_id,
+            'room_id': room_id,
+            'sender': event.sender,
+            'body': event.body,
+            'timestamp': event.server_timestamp,
+        }
+
+    async def _archive(self, room_id: str, event: RoomMessageText):
+        """Copy a message (or apply an edit) to the local chat archive."""
+        if not Config.CHAT_ARCHIVE_ENABLED:
+            return
+        try:
+            edit = self._edit_of(event)
+            if edit:
+                if not self._is_streaming_draft(event, edit[1]):
+                    await self.memory.update_archived_message(*edit)
+            else:
+                await self.memory.archive_messages([self._archive_row(room_id, event)])
+        except Exception as e:
+            logger.warning(f"Failed to archive message in {room_id}: {e}")
+
+    def _start_backfill(self, room_id: str):
+        if not Config.CHAT_ARCHIVE_ENABLED or Config.CHAT_ARCHIVE_BACKFILL <= 0:
+            return
+        task = asyncio.create_task(self.backfill_room(room_id))
+        self._backfills.add(task)
+        task.add_done_callback(self._backfills.discard)
+
+    async def backfill_room(self, room_id: str) -> int:
+        """
+        Page backwards through a room's history into the archive, stopping at
+        CHAT_ARCHIVE_BACKFILL messages or once a whole page is already archived.
+        Edits are applied to their originals like live ones. Returns how many
+        messages were added.
+        """
+        token = self.client.next_batch
+        seen = added = 0
+        edits: Dict[str, str] = {}
+        try:
+            while token and seen < Config.CHAT_ARCHIVE_BACKFILL:
+                resp = await self.client.room_messages(room_id, start=token, direction='b', limit=100)
+                chunk = getattr(resp, 'chunk', None)
+                if not chunk:
+                    break
+                seen += len(chunk)
+                rows = []
+                for event in chunk:
+                    if not isinstance(event, RoomMessageText):
+                        continue
+                    edit = self._edit_of(event)
+                    if not edit:
+                        rows.append(self._archive_row(room_id, event))
+                    elif not self._is_streaming_draft(event, edit[1]):
+                        # Paging backwards, so the first edit seen is the latest
+                        edits.setdefault(*edit)
+                new = await self.memory.archive_messages(rows)
+                added += new
+                if (rows and not new) or resp.end in (None, token):
+                    break
+                token = resp.end
+            # Originals can sit on a later page than their edits, so apply them last
+            for event_id, body in edits.items():
+                await self.memory.update_archived_message(event_id, body)
+        except Exception as e:
+            logger.warning(f"Chat archive backfill of {room_id} stopped: {e}")
+        if added:
+            logger.info(f"Archived {added} earlier messages from {room_id}")
+        return added
 
     async def message_callback(self, room: MatrixRoom, event: RoomMessageText):
+        # Everything the bot sees is archived, its own replies included
+        await self._archive(room.room_id, event)
+
         # Ignore messages from self — robust multi-layer check
         # Layer 1: exact user_id match (works when .env has correct full ID)
         if event.sender == self.client.user_id:
@@ -124,10 +265,62 @@ class MemuBot:
             if not is_dm and not bot_mentioned:
                 return
 
-        await self.process_message(room.room_id, event.sender, content)
+        # Handled in the background so sync keeps running and a follow-up
+        # message can supersede this one
+        self._start_conversation(room.room_id, event.sender, content)
+
+    def _start_conversation(self, room_id: str, sender: str, content: str) -> asyncio.Task:
+        key = (room_id, sender)
+        previous = self._conversations.get(key)
+        if previous is not None and not previous.done() and previous in self._supersedable:
+            logger.info(f"Newer message from {sender} in {room_id}; cancelling the previous request")
+            previous.cancel()
+            self._superseded.add(previous)
+            self.superseded += 1
+
+        task = asyncio.create_task(self._converse(room_id, sender, content))
+        self._conversations[key] = task
+        task.add_done_callback(lambda t, k=key: self._end_conversation(k, t))
+        return task
+
+    def _end_conversation(self, key: Tuple[str, str], task: asyncio.Task) -> None:
+        self._supersedable.discard(task)
+        self._superseded.discard(task)
+        self._streamed.discard(task)
+        if self._conversations.get(key) is task:
+            del self._conversations[key]
+
+    def _allow_supersede(self) -> None:
+        """Mark the running conversation as safe to cancel for a newer message."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._supersedable.add(task)
+
+    def reply_started(self) -> None:
+        """Called by StreamingReply once the running task has a reply on screen."""
+        task = asyncio.current_task()
+        if task is not None:
+            self._streamed.add(task)
+
+    async def _converse(self, room_id: str, sender: str, content: str):
+        try:
+            await self.process_message(room_id, sender, content)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if task not in self._superseded:
+                raise  # shutdown or teardown, not a newer message
+            logger.debug(f"Request from {sender} in {room_id} was superseded")
+            # A streamed reply has already been marked "(stopped)"
+            if task not in self._streamed:
+                try:
+                    await self.send_text(room_id, SUPERSEDED_NOTE)
+                except Exception as e:
+                    logger.warning(f"Failed to send superseded note: {e}")
+        except Exception as e:
+            logger.error(f"Failed to handle message from {sender} in {room_id}: {e}", exc_info=True)
 
-    async def send_text(self, room_id: str, text: str):
-        await self.client.room_send(
+    async def send_text(self, room_id: str, text: str) -> Optional[str]:
+        response = await self.client.room_send(
             room_id=room_id,
             message_type="m.room.message",
             content={
@@ -135,6 +328,26 @@ class MemuBot:
                 "body": text
             }
         )
+        return getattr(response, 'event_id', None)
+
+    async def edit_text(self, room_id: str, event_id: str, text: str):
+        """Replace the body of a message the bot already sent (m.replace)."""
+        await self.client.room_send(
+            room_id=room_id,
+            message_type="m.room.message",
+            content={
+                "msgtype": "m.text",
+                "body": f"* {text}",
+                "m.new_content": {
+                    "msgtype": "m.text",
+                    "body": text
+                },
+                "m.relates_to": {
+                    "rel_type": "m.replace",
+                    "event_id": event_id
+                }
+            }
+        )
 
     async def _get_ai_mode(self, room_id: str) -> str:
         """Get AI mode for a room, with in-memory cache."""
@@ -169,24 +382,43 @@ class MemuBot:
             await self.handle_calendar(room_id, content)
         elif content.startswith('/briefing'):
             await self.handle_briefing(room_id, content)
+        elif content.startswith('/benchmark'):
+            await self.handle_benchmark(room_id, sender, content)
         elif content.startswith('/help'):
             await self.handle_help(room_id)
         else:
-            # Natural language — classify intent and dispatch
-            result = await self.brain.analyze_intent(content)
+            # Natural language — classify intent and dispatch.
+            # Obvious phrasings skip the model entirely; only ambiguous text
+            # pays for an LLM round-trip.
+            result = self.fast_intent.classify(content) if Config.FAST_INTENT_ENABLED else None
+            # Only a model this message actually needs has to be installed
+            puller = self.brain.puller
+            if result is None and puller.is_loading(self.brain.model_for('intent')):
+                await self.send_text(room_id, puller.loading_message(self.brain.model_for('intent')))
+                return
+            if result is None and self.intent_batcher is not None:
+                result = await self.intent_batcher.classify(content, room_id=room_id)
+            elif result is None:
+                result = await self.brain.analyze_intent(content, room_id=room_id)
             intent = result.get('intent', 'NONE')
+            if intent not in NO_MODEL_INTENTS and intent != 'NONE' and puller.is_loading(self.brain.model):
+                await self.send_text(room_id, puller.loading_message(self.brain.model))
+                return
             extracted = result.get('content', content)
+            slots = result.get('slots') or {}
+            if intent in SUPERSEDABLE_INTENTS:
+                self._allow_supersede()
 
             if intent == 'CALENDAR':
                 await self.handle_calendar(room_id, f'/calendar {extracted}')
             elif intent == 'SCHEDULE':
-                await self.handle_schedule(room_id, sender, f'/schedule {extracted}')
+                await self.handle_schedule(room_id, sender, f'/schedule {extracted}', slots=slots)
             elif intent == 'LIST_ADD':
                 await self.handle_add_to_list(room_id, sender, f'/addtolist {extracted}')
             elif intent == 'LIST_SHOW':
                 await self.handle_show_list(room_id)
             elif intent == 'REMINDER':
-                await self.handle_remind(room_id, sender, f'/remind {extracted}')
+                await self.handle_remind(room_id, sender, f'/remind {extracted}', slots=slots)
             elif intent == 'RECALL':
                 await self.handle_recall(room_id, f'/recall {extracted}')
             elif intent == 'REMEMBER':
@@ -196,12 +428,10 @@ class MemuBot:
             elif intent == 'BRIEFING':
                 await self.handle_briefing(room_id, '')
             elif intent == 'CHAT':
-                response = await self.brain.generate(
-                    f'The user said: "{content}". Respond helpfully and briefly as a family assistant.',
-                    system_prompt='You are Memu, a helpful and intelligent family assistant. Be concise, capable, and mature.'
-                )
-                if response:
-                    await self.send_text(room_id, response)
+                async with StreamingReply(self, room_id) as reply:
+                    response = await self.brain.chat(content, on_progress=reply.update, room_id=room_id)
+                    if response:
+                        await reply.finish(response)
             # NONE = not addressed to bot or irrelevant, stay silent
 
     async def handle_remember(self, room_id: str, sender: str, content: str):
@@ -243,21 +473,23 @@ class MemuBot:
         # Multiple silos - use LLM synthesis for cross-silo intelligence
         if silo_count >= 2:
             context = self._format_cross_silo_context(query, results)
-            synthesis = await self.brain.synthesise_cross_silo(query, context)
-            if synthesis:
-                source_icons = []
-                if has_facts_chat:
-                    source_icons.append("💾💬")
-                if has_calendar:
-                    source_icons.append("📅")
-                if has_photos:
-                    source_icons.append("📸")
-                sources = " ".join(source_icons)
-                await self.send_text(
-                    room_id,
-                    f"🔍 **Cross-silo search** for '{query}' ({sources}):\n\n{synthesis}"
+            source_icons = []
+            if has_facts_chat:
+                source_icons.append("💾💬")
+            if has_calendar:
+                source_icons.append("📅")
+            if has_photos:
+                source_icons.append("📸")
+            sources = " ".join(source_icons)
+            async with StreamingReply(
+                self, room_id, header=f"🔍 **Cross-silo search** for '{query}' ({sources}):\n\n"
+            ) as reply:
+                synthesis = await self.brain.synthesise_cross_silo(
+                    query, context, on_progress=reply.update, room_id=room_id
                 )
-                return
+                if synthesis:
+                    await reply.finish(synthesis)
+                    return
             # Fall through to formatted display if synthesis fails
 
         # Single silo or synthesis failed - format directly
@@ -325,15 +557,24 @@ class MemuBot:
 
         # If response is very long, ask AI to summarise
         if len(response) > 1500:
-            summary = await self.brain.summarize_recall_results(query, response)
-            response = f"📋 Here's what I found about '{query}':\n\n{summary}"
+            async with StreamingReply(self, room_id, header=f"📋 Here's what I found about '{query}':\n\n") as reply:
+                summary = await self.brain.summarize_recall_results(
+                    query, response, on_progress=reply.update, room_id=room_id
+                )
+                await reply.finish(summary)
+            return
 
         await self.send_text(room_id, response)
 
     async def _cross_silo_search(self, room_id, query):
         """Search across all data silos in parallel."""
+        async def recall():
+            # Embedding the query overlaps with the calendar and photo searches
+            query_vector = await self.semantic.query_vector(query)
+            return await self.memory.unified_recall(room_id, query, query_vector=query_vector)
+
         results = await asyncio.gather(
-            self.memory.unified_recall(room_id, query),
+            recall(),
             self._search_calendar(query),
             self._search_photos(query),
             return_exceptions=True
@@ -373,102 +614,97 @@ class MemuBot:
             return []
 
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
-                url = f"{Config.IMMICH_API_URL}/api/search/smart"
-                headers = {'x-api-key': Config.IMMICH_API_KEY}
-                response = await client.post(url, headers=headers, json={"query": query})
-
-                if response.status_code == 200:
-                    data = response.json()
-                    # Handle different Immich response formats
-                    if "assets" in data:
-                        assets = data["assets"].get("items", [])
-                    elif isinstance(data, list):
-                        assets = data
-                    else:
-                        assets = []
-
-                    results = []
-                    for asset in assets[:10]:
-                        exif = asset.get("exifInfo", {}) or {}
-                        results.append({
-                            "filename": asset.get("originalFileName", ""),
-                            "date": asset.get("localDateTime", ""),
-                            "city": exif.get("city", "") or "",
-                            "description": exif.get("description", "") or "",
-                            "type": asset.get("type", "IMAGE"),
-                        })
-                    return results
+            client = clients.get('immich')
+            url = f"{Config.IMMICH_API_URL}/api/search/smart"
+            headers = {'x-api-key': Config.IMMICH_API_KEY}
+            response = await client.post(url, headers=headers, json={"query": query})
+
+            if response.status_code == 200:
+                data = response.json()
+                # Handle different Immich response formats
+                if "assets" in data:
+                    assets = data["assets"].get("items", [])
+                elif isinstance(data, list):
+                    assets = data
                 else:
-                    logger.info(f"Immich smart search returned {response.status_code}")
-                    return []
+                    assets = []
+
+                results = []
+                for asset in assets[:10]:
+                    exif = asset.get("exifInfo", {}) or {}
+                    results.append({
+                        "filename": asset.get("originalFileName", ""),
+                        "date": asset.get("localDateTime", ""),
+                        "city": exif.get("city", "") or "",
+                        "description": exif.get("description", "") or "",
+                        "type": asset.get("type", "IMAGE"),
+                    })
+                return results
+            else:
+                logger.info(f"Immich smart search returned {response.status_code}")
+                return []
         except Exception as e:
             logger.warning(f"Photo search failed: {e}")
             return []
 
     def _format_cross_silo_context(self, query, results):
-        """Format cross-silo results into context for LLM synthesis."""
-        parts = []
-
-        facts = results.get("facts", [])
-        if facts:
-            parts.append("## Saved Facts")
-            for fact in facts:
-                ts = fact['created_at']
-                if isinstance(ts, int):
-                    dt = datetime.fromtimestamp(ts / 1000)
-                    date_str = dt.strftime('%Y-%m-%d')
-                else:
-                    date_str = str(ts)
-                parts.append(f"- {fact['fact']} (saved {date_str})")
-
-        chat = results.get("chat", [])
-        if chat:
-            parts.append("\n## Chat History")
-            for msg in chat:
-                ts = msg['timestamp']
-                if isinstance(ts, int) and ts > 0:
-                    dt = datetime.fromtimestamp(ts / 1000)
-                    date_str = dt.strftime('%b %d')
-                else:
-                    date_str = "recently"
-                sender = msg['sender'].split(':')[0].replace('@', '')
-                body = msg['body'][:200]
-                parts.append(f"- {sender}: \"{body}\" ({date_str})")
-
-        calendar = results.get("calendar", [])
-        if calendar:
-            parts.append("\n## Calendar Events")
-            for event in calendar[:8]:
-                date_str = event['start'].strftime('%b %d, %Y') if event.get('start') else ''
-                time_str = ""
-                if event.get('start') and not event.get('all_day'):
-                    time_str = event['start'].strftime('%H:%M')
-                else:
-                    time_str = "All day"
-                location = f" at {event['location']}" if event.get('location') else ""
-                desc = f" - {event['description'][:100]}" if event.get('description') else ""
-                parts.append(f"- {event['summary']} ({date_str} {time_str}){location}{desc}")
+        """Format cross-silo results into context for LLM synthesis, within RECALL_CONTEXT_TOKENS."""
+        builder = ContextBuilder(Config.RECALL_CONTEXT_TOKENS, name="Cross-silo context")
+
+        facts = []
+        for fact in rank_by_query(results.get("facts", []), query, lambda f: f['fact']):
+            ts = fact['created_at']
+            if isinstance(ts, int):
+                dt = datetime.fromtimestamp(ts / 1000)
+                date_str = dt.strftime('%Y-%m-%d')
+            else:
+                date_str = str(ts)
+            facts.append(f"- {fact['fact']} (saved {date_str})")
+        builder.add_section("## Saved Facts", facts, weight=3, max_item_tokens=80)
+
+        chat = []
+        for msg in rank_by_query(results.get("chat", []), query, lambda m: m['body']):
+            ts = msg['timestamp']
+            if isinstance(ts, int) and ts > 0:
+                dt = datetime.fromtimestamp(ts / 1000)
+                date_str = dt.strftime('%b %d')
+            else:
+                date_str = "recently"
+            sender = msg['sender'].split(':')[0].replace('@', '')
+            chat.append(f"- {sender}: \"{msg['body']}\" ({date_str})")
+        builder.add_section("## Chat History", chat, weight=3, max_item_tokens=60)
+
+        calendar = []
+        for event in results.get("calendar", []):
+            date_str = event['start'].strftime('%b %d, %Y') if event.get('start') else ''
+            time_str = ""
+            if event.get('start') and not event.get('all_day'):
+                time_str = event['start'].strftime('%H:%M')
+            else:
+                time_str = "All day"
+            location = f" at {event['location']}" if event.get('location') else ""
+            desc = f" - {event['description']}" if event.get('description') else ""
+            calendar.append(f"- {event['summary']} ({date_str} {time_str}){location}{desc}")
+        builder.add_section("## Calendar Events", calendar, weight=2, max_item_tokens=50)
 
         photos = results.get("photos", [])
         if photos:
-            parts.append("\n## Photos")
-            count = len(photos)
+            # The overview lines come first so they survive when individual photos don't
+            photo_lines = [f"- {len(photos)} matching photos found"]
             cities = set(p['city'] for p in photos if p.get('city'))
             dates = [p['date'][:10] for p in photos if p.get('date')]
-
-            parts.append(f"- {count} matching photos found")
             if dates:
-                parts.append(f"- Date range: {min(dates)} to {max(dates)}")
+                photo_lines.append(f"- Date range: {min(dates)} to {max(dates)}")
             if cities:
-                parts.append(f"- Locations: {', '.join(cities)}")
-            for p in photos[:3]:
+                photo_lines.append(f"- Locations: {', '.join(cities)}")
+            for p in photos:
                 date_str = p['date'][:10] if p.get('date') else 'unknown date'
                 city = f" in {p['city']}" if p.get('city') else ""
                 desc = f" - {p['description']}" if p.get('description') else ""
-                parts.append(f"  - {p['filename']} ({date_str}){city}{desc}")
+                photo_lines.append(f"  - {p['filename']} ({date_str}){city}{desc}")
+            builder.add_section("## Photos", photo_lines, weight=1, max_item_tokens=40)
 
-        return "\n".join(parts)
+        return builder.build()
 
     async def handle_add_to_list(self, room_id: str, sender: str, content: str):
         raw = content.replace('/addtolist', '').strip()
@@ -509,11 +745,18 @@ class MemuBot:
         else:
             await self.send_text(room_id, f"❌ Could not find item '{item}'")
 
-    async def handle_remind(self, room_id: str, sender: str, content: str):
+    async def handle_remind(self, room_id: str, sender: str, content: str, slots: Optional[Dict] = None):
         raw = content.replace('/remind', '').strip()
 
-        # Try AI extraction first
-        data = await self.brain.extract_reminder(raw)
+        # Reuse slots from intent analysis when it already found a time,
+        # otherwise fall back to a dedicated AI extraction
+        if slots and slots.get('time'):
+            data = {
+                'task': slots.get('task') or raw,
+                'time': f"{slots.get('date') or ''} {slots['time']}".strip()
+            }
+        else:
+            data = await self.brain.extract_reminder(raw, room_id=room_id)
         task = data.get('task', raw)
         time_str = data.get('time')
 
@@ -533,46 +776,70 @@ class MemuBot:
             await self.send_text(room_id, "❌ I couldn't understand the time or it is in the past.")
             return
 
-        await self.memory.add_reminder(room_id, sender, task, dt)
+        reminder = await self.memory.add_reminder(room_id, sender, task, dt)
+        self.reminders.add(reminder)
         await self.send_text(room_id, f"⏰ Reminder set for {dt.strftime('%Y-%m-%d %H:%M')}: \"{task}\"")
 
+    async def _archived_history(self, room_id: str, limit: int = 50) -> List[str]:
+        """Recent messages from the local archive as "sender: body" lines, oldest first."""
+        if not Config.CHAT_ARCHIVE_ENABLED:
+            return []
+        try:
+            rows = await self.memory.get_recent_messages(room_id, limit=limit)
+        except Exception as e:
+            logger.warning(f"Failed to read chat archive: {e}")
+            return []
+        return [f"{r['sender'].split(':')[0].lstrip('@')}: {r['body']}" for r in rows]
+
     async def handle_summarize(self, room_id: str):
-        if not self.client.next_batch:
-            await self.send_text(room_id, "⚠️ I need to sync first before summarizing history.")
-            return
+        # The archive answers locally; the homeserver is only asked if it's empty
+        msgs = await self._archived_history(room_id)
 
-        resp = await self.client.room_messages(
-            room_id,
-            start=self.client.next_batch,
-            direction='b',
-            limit=50
-        )
+        if not msgs:
+            if not self.client.next_batch:
+                await self.send_text(room_id, "⚠️ I need to sync first before summarizing history.")
+                return
 
-        if isinstance(resp, str):
-            logger.error(f"Failed to fetch history: {resp}")
-            await self.send_text(room_id, "❌ Failed to fetch history.")
-            return
+            resp = await self.client.room_messages(
+                room_id,
+                start=self.client.next_batch,
+                direction='b',
+                limit=50
+            )
+
+            if isinstance(resp, str):
+                logger.error(f"Failed to fetch history: {resp}")
+                await self.send_text(room_id, "❌ Failed to fetch history.")
+                return
+
+            if not hasattr(resp, 'chunk'):
+                await self.send_text(room_id, "❌ Failed to fetch history (API error).")
+                return
 
-        if hasattr(resp, 'chunk'):
-            msgs = []
             for event in reversed(resp.chunk):
                 if isinstance(event, RoomMessageText):
-                    msgs.append(f"{event.sender}: {event.body}")
+                    sender = event.sender.split(':')[0].lstrip('@')
+                    msgs.append(f"{sender}: {event.body}")
 
-            if not msgs:
-                await self.send_text(room_id, "No recent activity to summarize.")
-                return
+        if not msgs:
+            await self.send_text(room_id, "No recent activity to summarize.")
+            return
 
-            context = "\n".join(msgs)
-            summary = await self.brain.summarize_chat(context)
-            await self.send_text(room_id, f"📋 Summary:\n{summary}")
-        else:
-            await self.send_text(room_id, "❌ Failed to fetch history (API error).")
+        # Newest messages matter most; the oldest are dropped to fit the budget
+        builder = ContextBuilder(Config.SUMMARY_CONTEXT_TOKENS, name="Summary context")
+        builder.add_section(None, msgs, max_item_tokens=100, keep='last')
+        context = builder.build()
+        async with StreamingReply(self, room_id, header="📋 Summary:\n") as reply:
+            summary = await self.brain.summarize_chat(context, on_progress=reply.update, room_id=room_id)
+            await reply.finish(summary)
 
-    async def handle_schedule(self, room_id: str, sender: str, content: str):
+    async def handle_schedule(self, room_id: str, sender: str, content: str, slots: Optional[Dict] = None):
         """
         Add an event to the family calendar.
         Example: /schedule Soccer practice Tuesday at 5pm
+
+        `slots` are event details already extracted during intent analysis;
+        when they include a date or time the extraction call is skipped.
         """
         raw = content.replace('/schedule', '').strip()
         if not raw:
@@ -584,8 +851,17 @@ class MemuBot:
             await self.send_text(room_id, "❌ Calendar service is not available. Please try again later.")
             return
 
-        # Use AI to extract event details
-        data = await self.brain.extract_calendar_event(raw)
+        # Use AI to extract event details (unless intent analysis already did)
+        if slots and (slots.get('date') or slots.get('time')):
+            data = {
+                'summary': slots.get('task'),
+                'date': slots.get('date'),
+                'time': slots.get('time'),
+                'duration': slots.get('duration'),
+                'location': slots.get('location'),
+            }
+        else:
+            data = await self.brain.extract_calendar_event(raw, room_id=room_id)
 
         fallback_summary = raw.split(' at ')[0] if ' at ' in raw else raw[:50]
         summary = data.get('summary') or fallback_summary
@@ -752,6 +1028,13 @@ class MemuBot:
 
         arg = content.lower().replace('/ai', '').strip()
 
+        if arg == 'status':
+            await self.handle_ai_status(room_id)
+            return
+        if arg == 'stats':
+            await self.handle_ai_stats(room_id)
+            return
+
         if arg not in VALID_MODES:
             current = await self._get_ai_mode(room_id)
             await self.send_text(
@@ -762,6 +1045,8 @@ class MemuBot:
                 f"• `/ai off` — Slash commands only (silent)\n"
                 f"• `/ai quiet` — Slash commands + @mentions\n"
                 f"• `/ai active` — Full natural language (default)\n"
+                f"• `/ai status` — Which AI machine is answering\n"
+                f"• `/ai stats` — Where the AI's time went today\n"
             )
             return
 
@@ -769,12 +1054,231 @@ class MemuBot:
         self._ai_mode_cache[room_id] = arg  # Update cache
         await self.send_text(room_id, MODE_DESCRIPTIONS[arg])
 
+    async def handle_ai_status(self, room_id: str):
+        """Show the inference backends and which one is being used."""
+        routing = self.brain.router.snapshot()
+        lines = ["🧠 **AI Status**", "", f"Model: {self.brain.model}"]
+        for task, model in sorted(self.brain.task_models.items()):
+            lines.append(f"• {task}: {model}")
+        if self.brain.escalations:
+            lines.append(f"Escalated to {self.brain.model}: {self.brain.escalations} times")
+        cancelled = self.brain.cancellations
+        if self.superseded or any(cancelled.values()):
+            lines.append(
+                f"Stopped early: {self.superseded} superseded messages, "
+                f"{cancelled['deadline']} past the {Config.AI_DEADLINE}s deadline, "
+                f"{cancelled['cancelled']} generations aborted"
+            )
+        queue = self.brain.scheduler.stats()
+        waiting = ', '.join(f"{lane['queued']} {name}" for name, lane in queue['lanes'].items() if lane['queued'])
+        lines.append(
+            f"Generating: {queue['in_flight']} of {queue['max_in_flight']} at once"
+            + (f", waiting: {waiting}" if waiting else "")
+        )
+        puller = self.brain.puller
+        if puller.pulling:
+            lines.append(f"⏳ Downloading {puller.current_model}: {puller.progress}% ({puller.status})")
+        elif puller.failed:
+            lines.append(f"❌ Failed to download: {', '.join(puller.failed)}")
+        lines += ["", "**Backends**"]
+        for backend in routing['backends']:
+            state = '🟢' if backend['healthy'] else '🔴'
+            label = 'this hub' if backend['local'] else 'external'
+            line = f"{state} {backend['url']} ({label})"
+            if backend['ewma_s_per_token'] is not None:
+                line += f" — {backend['ewma_s_per_token'] * 1000:.0f}ms/token"
+            if backend['last_error']:
+                line += f" — last error: {backend['last_error']}"
+            lines.append(line)
+
+        chosen = (routing['last_decision'] or {}).get('chosen')
+        if chosen:
+            lines.append("")
+            lines.append(f"Last answer came from: {chosen}")
+
+        await self.send_text(room_id, "\n".join(lines))
+
+    async def handle_ai_stats(self, room_id: str):
+        """
+        Per-task latency, speed and failures from the LLM call ledger (last
+        24h), plus what the inference pipeline (cache, queue, shared and
+        batched calls, model loads, prompt sizes) and the database pool have
+        done since the bot started.
+        """
+        rows = await self.brain.ledger.stats(hours=24)
+        if not rows:
+            lines = ["📊 No AI calls recorded in the last 24 hours."]
+        else:
+            lines = ["📊 **AI Usage (last 24h)**", ""]
+        for r in rows:
+            line = (
+                f"• **{r['task']}** — {r['calls']} calls, {r['p50_ms']}ms typical / {r['p95_ms']}ms slow, "
+                f"{r['tokens_per_s']} tokens/s, ~{r['avg_prompt_tokens']} prompt tokens"
+            )
+            if r['avg_queue_wait_ms']:
+                line += f", {r['avg_queue_wait_ms']}ms queued"
+            if r['failures']:
+                line += f", {r['failures']} failed or stopped"
+            lines.append(line)
+
+        if self.brain.cache is not None:
+            cache = self.brain.cache.stats()
+            lines += [
+                "", "**Response cache (since start)**",
+                f"• {cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate']:.0%} answered from cache), "
+                f"{cache['entries']} kept" + (", saved across restarts" if cache['persistent'] else ""),
+            ]
+
+        lines += self._inference_stats_lines()
+
+        db = self.memory.pool_stats()
+        wait, queries = db['acquire_wait'], db['queries']
+        lines += [
+            "", "**Database (since start)**",
+            f"• Connections: {db['in_use']} in use, peak {db['peak_in_use']}"
+            + (f", {db['size']} open of {db['max_size']}" if 'size' in db else ""),
+            f"• Waiting for a connection: {wait['p50_ms']}ms typical / {wait['p95_ms']}ms slow",
+            f"• Queries: {queries['count']}, {queries['p50_ms']}ms typical / {queries['p95_ms']}ms slow, "
+            f"{db['slow']} slow, {db['errors']} failed",
+        ]
+        await self.send_text(room_id, "\n".join(lines))
+
+    def _inference_stats_lines(self) -> List[str]:
+        """Queue waits, shared/batched calls, cold starts and prompt sizes since start."""
+        lines = ["", "**Inference (since start)**"]
+        for name, lane in self.brain.scheduler.stats()['lanes'].items():
+            if lane['served']:
+                lines.append(
+                    f"• Queue ({name}): {lane['served']} served, waited {lane['avg_wait_s']}s on average, "
+                    f"{lane['max_wait_s']}s at most"
+                )
+        flights = self.brain.flights.stats()
+        if flights['coalesced']:
+            lines.append(f"• Shared answers: {flights['coalesced']} requests joined one already running")
+        residency = self.brain.residency.stats()
+        if residency['requests']:
+            lines.append(
+                f"• Model loads: {residency['cold_starts']} cold starts in {residency['requests']} calls, "
+                f"last load {residency['last_load_s']}s (kept loaded for {residency['keep_alive']})"
+            )
+        if self.intent_batcher is not None:
+            batcher = self.intent_batcher.stats()
+            if batcher['batches'] or batcher['single_calls']:
+                lines.append(
+                    f"• Intent batching: {batcher['batched_messages']} messages in {batcher['batches']} batches, "
+                    f"{batcher['single_calls']} on their own"
+                )
+        for task, prompt in sorted(self.brain.prompt_eval_report().items()):
+            lines.append(
+                f"• Prompt **{task}**: ~{prompt['avg_prompt_tokens']:.0f} tokens, "
+                f"{prompt['avg_prompt_eval_ms']:.0f}ms to read ({prompt['calls']} calls)"
+            )
+        return lines if len(lines) > 2 else []
+
+    def _is_household_admin(self, user_id: str) -> bool:
+        """Whether `user_id` is an admin of the family room (PRIMARY_ROOM_ID)."""
+        room = self.client.rooms.get(Config.PRIMARY_ROOM_ID) if Config.PRIMARY_ROOM_ID else None
+        return room is not None and room.power_levels.get_user_level(user_id) >= ADMIN_POWER_LEVEL
+
+    async def handle_benchmark(self, room_id: str, sender: str, content: str):
+        """
+        Benchmark the local models. `/benchmark apply` switches to the last
+        run's recommendation, benchmarking first only if there isn't one.
+        Both tie up or change the AI for the whole household, so only admins
+        of the family room may run them.
+        """
+        if not self._is_household_admin(sender):
+            await self.send_text(
+                room_id,
+                "🔒 Only an admin of the family room can run `/benchmark`."
+                + ("" if Config.PRIMARY_ROOM_ID else " (Set PRIMARY_ROOM_ID to the family room first.)")
+            )
+            return
+        if self._benchmark_task is not None and not self._benchmark_task.done():
+            await self.send_text(room_id, "⏳ A benchmark is already running.")
+            return
+        apply = content.lower().replace('/benchmark', '').strip() == 'apply'
+
+        try:
+            models = await self.benchmark.local_models()
+        except Exception as e:
+            logger.error(f"Benchmark could not list models: {e}")
+            await self.send_text(room_id, "❌ Couldn't reach Ollama to list models.")
+            return
+        if not models:
+            await self.send_text(room_id, "No models are downloaded yet.")
+            return
+
+        if apply:
+            recommended = await self.benchmark.latest_recommendation()
+            if recommended in models:
+                self.benchmark.apply(recommended)
+                await self.send_text(room_id, self._benchmark_applied(recommended))
+                return
+
+        await self.send_text(
+            room_id,
+            f"⏱️ Benchmarking {len(models)} model(s) on {len(self.benchmark.cases)} test questions each. "
+            f"This can take a few minutes."
+        )
+        # Runs in the background so the bot keeps answering while it works
+        self._benchmark_task = asyncio.create_task(self._run_benchmark(room_id, models, apply))
+
+    async def _run_benchmark(self, room_id: str, models: List[str], apply: bool):
+        try:
+            results = await self.benchmark.run(models)
+        except Exception as e:
+            logger.error(f"Benchmark failed: {e}")
+            await self.send_text(room_id, "❌ Benchmark failed. Check the logs for details.")
+            return
+
+        recommended = self.benchmark.recommend(results)
+        await self.benchmark.persist(results, recommended)
+
+        lines = ["⏱️ **Model Benchmark**", ""]
+        for r in results:
+            mark = ' ⭐' if r['model'] == recommended else ''
+            lines.append(
+                f"• **{r['model']}**{mark} — {r['accuracy']:.0%} correct, "
+                f"{r['p50_ms']}ms typical / {r['p95_ms']}ms slowest, {r['tokens_per_s']} tokens/s"
+            )
+        lines.append("")
+        if recommended is None:
+            lines.append(
+                f"No model got {Config.BENCHMARK_MIN_ACCURACY:.0%} of the questions right; "
+                f"keeping {self.brain.model_for('intent')}."
+            )
+        elif apply:
+            self.benchmark.apply(recommended)
+            lines.append(self._benchmark_applied(recommended))
+        else:
+            lines.append(
+                f"Recommended for understanding messages: **{recommended}**. "
+                f"Send `/benchmark apply` to switch now."
+            )
+        await self.send_text(room_id, "\n".join(lines))
+
+    @staticmethod
+    def _benchmark_applied(model: str) -> str:
+        return (
+            f"✅ Now using **{model}** for understanding messages. "
+            f"Set `OLLAMA_SMALL_MODEL={model}` in .env to keep it after a restart."
+        )
+
     async def handle_private(self, room_id: str):
         """Explain what Memu already protects."""
-        await self.send_text(room_id, """🔒 **Your Privacy on Memu**
+        archive = ""
+        if Config.CHAT_ARCHIVE_ENABLED:
+            archive = (
+                "\n⚠️ **Chat archive is on.** So it can search past conversations, the Memu bot keeps a "
+                "plain-text copy of messages in rooms it's in, on the hub's database and its backups. "
+                "Whoever runs the hub can read that copy. Set `CHAT_ARCHIVE_ENABLED=false` to turn it off.\n"
+            )
+        await self.send_text(room_id, f"""🔒 **Your Privacy on Memu**
 
 **Chat — End-to-end encrypted**
-Your messages are encrypted on your device before they're sent. Not even the server admin can read them. This is the same level of encryption as Signal.
+Your messages are encrypted on your device before they're sent. Not even the server admin can read them in transit or on the chat server. This is the same level of encryption as Signal.
+{archive}
 
 **Photos — Separate per person**
 Each family member has their own Immich account and photo library. Your photos are only visible to you unless you choose to share them.
@@ -825,6 +1329,9 @@ All data stays on hardware your family owns. There are no cloud services, no sub
 • `/ai off` — Slash commands only (bot stays silent)
 • `/ai quiet` — Slash commands + @mentions
 • `/ai active` — Full natural language (default)
+• `/ai status` — Which AI machine is answering
+• `/ai stats` — Where the AI's time went today
+• `/benchmark` — Find the fastest AI model that still answers well here (family room admins)
 • `/private` — See what Memu protects
 • Current mode: {mode_display.get(current_mode, '🔊 Active')}
 
@@ -842,14 +1349,8 @@ In group chats, mention me by name so I know you're talking to me.
 """
         await self.send_text(room_id, help_text)
 
-    async def check_reminders_loop(self):
-        while True:
-            try:
-                reminders = await self.memory.get_due_reminders()
-                for rem in reminders:
-                    await self.send_text(rem['room_id'], f"🔔 REMINDER: {rem['content']}")
-                    await self.memory.mark_reminder_processed(rem['id'])
-            except Exception as e:
-                logger.error(f"Error checking reminders: {e}")
-
-            await asyncio.sleep(10)
+    async def send_reminder(self, reminder: Dict):
+        """Deliver a due reminder; raises so the scheduler retries if Matrix refused it."""
+        event_id = await self.send_text(reminder['room_id'], f"🔔 REMINDER: {reminder['content']}")
+        if not event_id:
+            raise RuntimeError(f"Matrix did not accept reminder {reminder['id']}")
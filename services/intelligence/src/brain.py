@@ -1,51 +1,348 @@
+import asyncio
 import logging
 import json
-import httpx
-from typing import Dict, Optional, Any
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Any
 from config import Config
+from llm_cache import ResponseCache
+from inference_scheduler import InferenceScheduler, Priority
+from singleflight import SingleFlight
+from residency import ModelResidency
+from model_pull import ModelPuller
+from inference_router import InferenceRouter
+from http_clients import clients
+from call_ledger import CallLedger, LLMCall
+from prompts import PROMPTS, PromptTemplate
+from profiles import get_profile
 
 logger = logging.getLogger("memu.brain")
 
+# Called with the accumulated response text each time a streamed chunk arrives
+ProgressCallback = Callable[[str], Awaitable[None]]
+# Called with every finished Ollama response (timing fields included) and its task
+ResponseObserver = Callable[[Dict[str, Any], Optional[str]], None]
+
+# Short JSON tasks that a sub-1B model handles well (OLLAMA_SMALL_MODEL)
+SMALL_MODEL_TASKS = ('intent', 'intent_batch', 'extract_reminder', 'extract_calendar_event')
+# Appended to a partial answer returned because the deadline passed
+TRUNCATED_MARKER = " … (cut short: this was taking too long)"
+
 class Brain:
     def __init__(self):
         self.ollama_url = Config.OLLAMA_HOST
         self.model = Config.OLLAMA_MODEL
         self.enabled = Config.AI_ENABLED
         self.timeout = Config.AI_TIMEOUT
-
-    async def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = False) -> str:
+        # task -> model; anything not listed runs on self.model
+        self.task_models: Dict[str, str] = {
+            task: Config.OLLAMA_SMALL_MODEL for task in SMALL_MODEL_TASKS
+        } if Config.OLLAMA_SMALL_MODEL else {}
+        self.task_models.update(Config.OLLAMA_TASK_MODELS)
+        self.escalations = 0
+        # Generations stopped before finishing: past the deadline / cancelled by the caller
+        self.cancellations: Dict[str, int] = {'deadline': 0, 'cancelled': 0}
+        self.cache = ResponseCache(
+            max_entries=Config.LLM_CACHE_SIZE,
+            ttl_seconds=Config.LLM_CACHE_TTL
+        ) if Config.LLM_CACHE_ENABLED else None
+        self.scheduler = InferenceScheduler(max_in_flight=Config.OLLAMA_MAX_PARALLEL)
+        self.flights = SingleFlight()
+        self.residency = ModelResidency(self)
+        self.puller = ModelPuller(self)
+        # OLLAMA_HOST is the local hub; OLLAMA_EXTERNAL_HOSTS are tried first when faster
+        self.router = InferenceRouter(self.ollama_url, Config.OLLAMA_EXTERNAL_HOSTS)
+        # task -> accumulated prompt-eval timings (PROMPT_METRICS_ENABLED)
+        self.prompt_stats: Dict[str, Dict[str, float]] = {}
+        self.observers: List[ResponseObserver] = []
+        # Embedding model for semantic recall (None = disabled)
+        self.embed_model: Optional[str] = Config.OLLAMA_EMBED_MODEL if Config.SEMANTIC_RECALL_ENABLED else None
+        self.ledger = CallLedger(max_entries=Config.LLM_LEDGER_SIZE, sample_rate=Config.LLM_LEDGER_SAMPLE_RATE)
+
+    async def generate(self, prompt: str, system_prompt: str = None, json_mode: bool = False,
+                       on_progress: Optional[ProgressCallback] = None, cache: bool = False,
+                       priority: Priority = Priority.INTERACTIVE, room_id: Optional[str] = None,
+                       options: Optional[Dict[str, Any]] = None, task: Optional[str] = None,
+                       model: Optional[str] = None, deadline: Optional[float] = None,
+                       keep_alive: Optional[Any] = None) -> str:
         """
         Generic generation method for Ollama.
+
+        When on_progress is given the response is streamed and the callback
+        receives the accumulated text as tokens arrive, so callers can show
+        partial output instead of waiting for the full generation.
+
+        cache=True marks the call as deterministic: identical requests are
+        answered from the response cache instead of re-running the model.
+
+        Every call waits for a slot from the inference scheduler; `priority`
+        picks the lane and `room_id` keeps queuing fair between rooms.
+        Identical concurrent requests share one generation (single-flight).
+
+        `task` names the prompt template (see prompts.py). It picks the
+        task's model unless `model` is given explicitly, and its generation
+        profile (see profiles.py), which `options` override. `keep_alive`
+        overrides how long Ollama keeps the model loaded afterwards (0 unloads
+        it straight away).
+
+        The call is cancellable: cancelling the awaiting task, or passing
+        `deadline` seconds (default AI_DEADLINE), closes the HTTP request so
+        Ollama stops generating. Past the deadline whatever text was streamed
+        so far is returned with TRUNCATED_MARKER appended (or "" for JSON,
+        which a partial response can't be).
         """
-        if not self.enabled:
+        model = model or self.model_for(task)
+        if not self.enabled or self.puller.is_loading(model):
             return ""
-
+        profile = get_profile(task)
         payload = {
-            'model': self.model,
+            'model': model,
             'prompt': prompt,
-            'stream': False,
-            'options': {'temperature': 0.7}
+            'stream': on_progress is not None,
+            'options': {**profile.options(), **(options or {})},
+            'keep_alive': self.residency.keep_alive if keep_alive is None else keep_alive
         }
 
         if system_prompt:
             payload['system'] = system_prompt
 
-        # Some Ollama versions support 'format': 'json'
-        if json_mode:
-            payload['format'] = 'json'
-
+        # A JSON schema when the task has one, otherwise Ollama's plain JSON mode
+        fmt = profile.format(json_mode)
+        if fmt:
+            payload['format'] = fmt
+
+        cache_key = None
+        if cache and self.cache is not None and on_progress is None:
+            self.cache.use_model(self.model)
+            cache_key = ResponseCache.make_key(model, prompt, system_prompt, payload.get('format'))
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def run(progress: ProgressCallback) -> str:
+            call = LLMCall(task=task or 'generate', model=model, priority=priority.name)
+            try:
+                async with self.scheduler.slot(priority, room_id) as wait:
+                    call.queue_wait_ms = round(wait * 1000)
+                    started = time.monotonic()
+                    try:
+                        if payload['stream']:
+                            return await self._generate_stream(payload, progress, task, call)
+                        return await self._generate_once(payload, task, call)
+                    finally:
+                        call.total_ms = round((time.monotonic() - started) * 1000)
+            except asyncio.CancelledError:
+                call.outcome = 'cancelled'
+                raise
+            finally:
+                self.ledger.record(call)
+
+        # Remember the latest streamed text so a deadline can return the partial answer
+        streamed = ""
+
+        async def track(text: str) -> None:
+            nonlocal streamed
+            streamed = text
+            await on_progress(text)
+
+        deadline = Config.AI_DEADLINE if deadline is None else deadline
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json=payload
+            text = await asyncio.wait_for(
+                self.flights.do(SingleFlight.make_key(payload), run, track if on_progress else None),
+                timeout=deadline or None
+            )
+        except asyncio.TimeoutError:
+            self.cancellations['deadline'] += 1
+            logger.warning(f"Generation{f' [{task}]' if task else ''} passed its {deadline}s deadline; aborted")
+            partial = streamed.strip()
+            if not partial or json_mode:
+                return ""
+            return f"{partial}{TRUNCATED_MARKER}"
+        except asyncio.CancelledError:
+            self.cancellations['cancelled'] += 1
+            logger.info(f"Generation{f' [{task}]' if task else ''} cancelled by caller")
+            raise
+
+        # Never cache failures or JSON the caller won't be able to parse
+        if cache_key and text and (not json_mode or self._extract_json(text)):
+            await self.cache.put(cache_key, model, text)
+        return text
+
+    async def _generate_once(self, payload: Dict[str, Any], task: Optional[str] = None,
+                             call: Optional[LLMCall] = None) -> str:
+        """Single non-streaming /api/generate request, failing over between backends."""
+        for backend in self.router.candidates():
+            started = time.monotonic()
+            try:
+                response = await clients.get('ollama').post(
+                    f"{backend.url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout
                 )
                 response.raise_for_status()
                 result = response.json()
-                return result.get('response', '').strip()
-        except Exception as e:
-            logger.error(f"Ollama generation failed: {e}")
-            return ""
+            except Exception as e:
+                logger.error(f"Ollama generation failed on {backend.url}: {e}")
+                self.router.record_failure(backend, e)
+                continue
+            self.router.record_success(backend, time.monotonic() - started, result.get('eval_count'))
+            self._observe(result, task)
+            if call is not None:
+                call.backend = backend.url
+                call.add_timings(result)
+            return result.get('response', '').strip()
+        if call is not None:
+            call.outcome = 'error'
+        return ""
+
+    async def _generate_stream(self, payload: Dict[str, Any], on_progress: ProgressCallback,
+                               task: Optional[str] = None, call: Optional[LLMCall] = None) -> str:
+        """
+        Consume Ollama's NDJSON stream, reporting progress per chunk.
+
+        A backend that fails before sending any text is skipped for the next
+        one. If the stream breaks midway, whatever text arrived is returned so
+        the user keeps the partial answer they have already seen.
+        """
+        text = ""
+        outcome = 'error'
+        for backend in self.router.candidates():
+            started = time.monotonic()
+            if call is not None:
+                call.backend = backend.url
+            try:
+                async with clients.get('ollama').stream(
+                    "POST",
+                    f"{backend.url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout
+                ) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get('error'):
+                            raise RuntimeError(chunk['error'])
+                        piece = chunk.get('response', '')
+                        if piece:
+                            text += piece
+                            await on_progress(text)
+                        if chunk.get('done'):
+                            # The final chunk carries the timing fields
+                            self.router.record_success(
+                                backend, time.monotonic() - started, chunk.get('eval_count')
+                            )
+                            self._observe(chunk, task)
+                            if call is not None:
+                                call.add_timings(chunk)
+                            break
+            except Exception as e:
+                logger.error(f"Ollama streaming generation failed on {backend.url}: {e}")
+                self.router.record_failure(backend, e)
+                if text:
+                    outcome = 'partial'
+                    break
+                continue
+            outcome = 'ok'
+            break
+        if call is not None:
+            call.outcome = outcome
+        return text.strip()
+
+    async def embed(self, texts: List[str], priority: Optional[Priority] = None) -> List[List[float]]:
+        """
+        Embed texts in one /api/embed call on the local hub.
+
+        Query embeddings skip the scheduler so recall isn't stuck behind a
+        long generation; pass `priority` (backfills) to take a slot instead.
+        Raises on failure.
+        """
+        if not texts or not self.embed_model:
+            return []
+        if self.puller.is_loading(self.embed_model):
+            raise RuntimeError(f"{self.embed_model} is still downloading")
+        payload = {'model': self.embed_model, 'input': texts, 'keep_alive': self.residency.keep_alive}
+        # Batches can take a while on CPU; a query should fail fast instead
+        timeout = Config.EMBED_TIMEOUT if priority is None else self.timeout
+
+        async def call() -> List[List[float]]:
+            response = await clients.get('ollama').post(
+                f"{self.ollama_url}/api/embed", json=payload, timeout=timeout
+            )
+            response.raise_for_status()
+            return response.json().get('embeddings', [])
+
+        if priority is None:
+            return await call()
+        async with self.scheduler.slot(priority):
+            return await call()
+
+    def model_for(self, task: Optional[str]) -> str:
+        """The model configured for a task (OLLAMA_SMALL_MODEL / OLLAMA_TASK_MODELS)."""
+        return self.task_models.get(task, self.model) if task else self.model
+
+    def active_models(self) -> List[str]:
+        """Every distinct model the Brain may call, primary model first."""
+        models = [self.model]
+        for model in self.task_models.values():
+            if model not in models:
+                models.append(model)
+        return models
+
+    async def _generate_json(self, template: PromptTemplate, room_id: Optional[str] = None,
+                             options: Optional[Dict[str, Any]] = None, **values: str) -> Dict[str, Any]:
+        """
+        Run a JSON task on its (usually small) model, escalating to the
+        primary model when the answer doesn't parse. An empty response (past
+        the deadline, no backend, model still loading) isn't escalated: the
+        primary model would only spend another full deadline on it.
+        """
+        model = self.model_for(template.name)
+        response = await self.generate(
+            template.render(**values), system_prompt=template.system,
+            json_mode=True, cache=True, room_id=room_id, task=template.name, model=model,
+            options=options
+        )
+        parsed = self._extract_json(response)
+        if response.strip() and not parsed and model != self.model:
+            self.escalations += 1
+            logger.info(f"{model} returned unparseable JSON for {template.name}; escalating to {self.model}")
+            response = await self.generate(
+                template.render(**values), system_prompt=template.system,
+                json_mode=True, cache=True, room_id=room_id, task=template.name, model=self.model,
+                options=options
+            )
+            parsed = self._extract_json(response)
+        return parsed
+
+    def _observe(self, result: Dict[str, Any], task: Optional[str]) -> None:
+        """Feed a finished response's timing fields to the metrics collectors."""
+        self.residency.observe(result)
+        for observer in list(self.observers):
+            try:
+                observer(result, task)
+            except Exception as e:
+                logger.warning(f"Response observer failed: {e}")
+        if Config.PROMPT_METRICS_ENABLED and task:
+            eval_count = result.get('prompt_eval_count') or 0
+            eval_ms = (result.get('prompt_eval_duration') or 0) / 1_000_000
+            stats = self.prompt_stats.setdefault(task, {'calls': 0, 'prompt_tokens': 0, 'prompt_eval_ms': 0.0})
+            stats['calls'] += 1
+            stats['prompt_tokens'] += eval_count
+            stats['prompt_eval_ms'] += eval_ms
+            logger.info(f"Prompt eval [{task}]: {eval_count} tokens in {eval_ms:.0f}ms")
+
+    def prompt_eval_report(self) -> Dict[str, Dict[str, float]]:
+        """Average prompt-eval tokens and time per template (measurement mode)."""
+        report = {}
+        for task, stats in self.prompt_stats.items():
+            calls = stats['calls'] or 1
+            report[task] = {
+                'calls': stats['calls'],
+                'avg_prompt_tokens': round(stats['prompt_tokens'] / calls, 1),
+                'avg_prompt_eval_ms': round(stats['prompt_eval_ms'] / calls, 1),
+            }
+        return report
 
     def _extract_json(self, text: str) -> Dict[str, Any]:
         """
@@ -69,188 +366,186 @@ class Brain:
                 
         return {}
 
-    async def extract_reminder(self, content: str) -> Dict[str, Any]:
+    async def extract_reminder(self, content: str, room_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract task and time from a reminder string using AI.
         """
-        prompt = f"""Extract the task and the time from this reminder request.
-Request: "{content}"
-Respond ONLY with valid JSON in this format:
-{{
-    "task": "what to do",
-    "time": "when to do it"
-}}
-"""
-        response = await self.generate(prompt, json_mode=True)
-        return self._extract_json(response)
-
-    async def analyze_intent(self, content: str) -> Dict[str, str]:
+        return await self._generate_json(PROMPTS['extract_reminder'], room_id=room_id, content=content)
+
+    async def analyze_intent(self, content: str, room_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze natural language message and classify intent.
 
-        Returns dict with 'intent' and 'content' keys.
+        Returns dict with 'intent', 'content' and 'slots' keys. For SCHEDULE
+        and REMINDER the model fills the slots (task/date/time/duration/location)
+        in the same pass, so handlers don't need a second extraction call.
         """
-        prompt = f"""Analyze this message and determine what the user wants.
-
-Message: "{content}"
-
-Respond with JSON only:
-{{"intent": "CALENDAR", "content": "the relevant extracted text"}}
-
-Valid intents:
-- CALENDAR: asking about schedule/events ("what's happening tomorrow?", "any events this week?")
-- SCHEDULE: wanting to ADD an event ("soccer practice Tuesday 5pm", "dentist appointment Friday")
-- LIST_ADD: adding items to shopping list ("we need milk and eggs", "add bread to the list")
-- LIST_SHOW: asking to see the list ("what's on the list?", "show shopping list")
-- REMINDER: setting a reminder ("remind me to call mom", "don't forget to pick up kids")
-- RECALL: searching for information ("what's the WiFi password?", "when is grandma's birthday?")
-- REMEMBER: storing a fact ("the WiFi password is ABC123", "grandma's birthday is March 15")
-- SUMMARIZE: requesting chat summary ("what did I miss?", "summarize today")
-- BRIEFING: requesting a briefing ("give me a briefing", "what's going on today?")
-- CHAT: general conversation that doesn't match above
-- NONE: unclear or irrelevant
-
-"content" = the extracted relevant text.
-- For LIST_ADD: return ONLY the items joined by commas (e.g., "milk, eggs, bread"). DO NOT include words like "added" or "item(s)".
-- For SCHEDULE: return the event details (e.g., "Soccer 5pm").
-- For REMINDER: return the task (e.g., "Call Mom 3pm").
-
-Respond with JSON only, no explanation. No conversational text."""
-
         try:
-            result = await self.generate(prompt, json_mode=True)
-            parsed = self._extract_json(result)
-            
-            return {
-                "intent": parsed.get("intent", "NONE").upper(),
-                "content": parsed.get("content", content)
-            }
+            parsed = await self._generate_json(PROMPTS['intent'], room_id=room_id, content=content)
+            return self._intent_result(parsed, content)
         except Exception as e:
             logger.warning(f"Intent analysis failed: {e}")
-            return {"intent": "NONE", "content": content}
+            return {"intent": "NONE", "content": content, "slots": {}}
 
-    async def summarize_chat(self, context: str) -> str:
+    async def analyze_intents(self, contents: List[str],
+                              room_id: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
         """
-        Summarize the provided chat context.
+        Classify several messages in one generation (see intent_batcher.py).
+
+        Returns one result per message, in order; None where the model left a
+        message out, so the caller can classify that one on its own.
+
+        Shares the single-message intent cache: cached messages aren't sent to
+        the model, and each batched answer is cached as if classified alone.
         """
-        system_prompt = """You are a helpful family assistant. Summarize conversations concisely, 
-focusing on: decisions made, action items, important information shared, and upcoming plans.
-Keep summaries brief (2-4 sentences) and family-friendly."""
+        results: List[Optional[Dict[str, Any]]] = [await self._cached_intent(c) for c in contents]
+        todo = [i for i, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+
+        template = PROMPTS['intent_batch']
+        messages = "\n".join(f'{n}. "{contents[i]}"' for n, i in enumerate(todo, 1))
+        per_message = get_profile(template.name).num_predict or 160
+        try:
+            parsed = await self._generate_json(
+                template, room_id=room_id, options={'num_predict': per_message * len(todo)},
+                messages=messages
+            )
+        except Exception as e:
+            logger.warning(f"Batched intent analysis failed: {e}")
+            return results
+
+        by_id = {}
+        items = parsed.get('results') if isinstance(parsed, dict) else None
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict) and isinstance(item.get('id'), int) and item.get('intent'):
+                by_id[item['id']] = item
+        for n, i in enumerate(todo, 1):
+            if n in by_id:
+                results[i] = self._intent_result(by_id[n], contents[i])
+                await self._cache_intent(contents[i], results[i])
+        return results
+
+    def _intent_cache_key(self, content: str) -> Optional[str]:
+        """The key analyze_intent's generation is cached under."""
+        if self.cache is None:
+            return None
+        template = PROMPTS['intent']
+        self.cache.use_model(self.model)
+        return ResponseCache.make_key(
+            self.model_for(template.name), template.render(content=content), template.system,
+            get_profile(template.name).format(True)
+        )
 
-        prompt = f"""Summarize this family chat in 2-3 sentences.
-Focus on: important events, decisions made, upcoming plans.
+    async def _cached_intent(self, content: str) -> Optional[Dict[str, Any]]:
+        key = self._intent_cache_key(content)
+        cached = await self.cache.get(key) if key else None
+        parsed = self._extract_json(cached) if cached else None
+        return self._intent_result(parsed, content) if parsed else None
+
+    async def _cache_intent(self, content: str, result: Dict[str, Any]) -> None:
+        key = self._intent_cache_key(content)
+        if key:
+            await self.cache.put(key, self.model_for('intent'), json.dumps(result))
+
+    @classmethod
+    def _intent_result(cls, parsed: Dict[str, Any], content: str) -> Dict[str, Any]:
+        return {
+            "intent": str(parsed.get("intent", "NONE")).upper(),
+            "content": parsed.get("content", content),
+            "slots": cls._clean_slots(parsed.get("slots"))
+        }
 
-{context}
+    @staticmethod
+    def _clean_slots(slots: Any) -> Dict[str, str]:
+        """Keep only the known slot keys that the model actually filled in."""
+        if not isinstance(slots, dict):
+            return {}
+        cleaned = {}
+        for key in ('task', 'date', 'time', 'duration', 'location'):
+            value = slots.get(key)
+            if isinstance(value, str) and value.strip() and value.strip().lower() not in ('null', 'none'):
+                cleaned[key] = value.strip()
+        return cleaned
+
+    async def chat(self, content: str, on_progress: Optional[ProgressCallback] = None,
+                   room_id: Optional[str] = None) -> str:
+        """
+        Free-form reply for messages classified as CHAT.
+        """
+        template = PROMPTS['chat']
+        return await self.generate(
+            template.render(content=content), system_prompt=template.system,
+            on_progress=on_progress, room_id=room_id, task=template.name
+        )
 
-Summary:"""
-        return await self.generate(prompt, system_prompt=system_prompt)
+    async def summarize_chat(self, context: str, on_progress: Optional[ProgressCallback] = None,
+                             room_id: Optional[str] = None) -> str:
+        """
+        Summarize the provided chat context.
+        """
+        template = PROMPTS['summarize_chat']
+        return await self.generate(
+            template.render(context=context), system_prompt=template.system, on_progress=on_progress,
+            priority=Priority.BACKGROUND, room_id=room_id, task=template.name
+        )
 
-    async def summarize_recall_results(self, query: str, raw_results: str) -> str:
+    async def summarize_recall_results(self, query: str, raw_results: str,
+                                       on_progress: Optional[ProgressCallback] = None,
+                                       room_id: Optional[str] = None) -> str:
         """
         Summarize recall results when they're too long to display directly.
         Helps distill relevant information from mixed facts + chat history.
         """
-        system_prompt = """You are a helpful family assistant with access to family memories and chat history.
-When asked to summarize search results, extract the most relevant information that answers the query.
-Be concise and direct. If there are contradictions, note the most recent information."""
-
-        prompt = f"""The user asked about: "{query}"
-
-Here's what I found in saved facts and chat history:
-
-{raw_results}
-
-Provide a brief, helpful summary (2-4 sentences) answering what the user wanted to know about "{query}":"""
-
-        return await self.generate(prompt, system_prompt=system_prompt)
+        template = PROMPTS['summarize_recall']
+        return await self.generate(
+            template.render(query=query, results=raw_results), system_prompt=template.system,
+            on_progress=on_progress, priority=Priority.RECALL, room_id=room_id, task=template.name
+        )
 
-    async def synthesise_cross_silo(self, query: str, context: str) -> str:
+    async def synthesise_cross_silo(self, query: str, context: str,
+                                    on_progress: Optional[ProgressCallback] = None,
+                                    room_id: Optional[str] = None) -> str:
         """
         Synthesise cross-silo search results into an insightful, unified response.
         This is the 'Chief of Staff' intelligence that connects dots across data sources.
         """
-        system_prompt = (
-            "You are the family's Chief of Staff -- an AI that knows the family's chat history, "
-            "calendar, saved facts, and photo library. When given search results from multiple sources, "
-            "synthesise them into a brief, insightful response that connects the dots.\n\n"
-            "Rules:\n"
-            "- Be concise (3-5 sentences max)\n"
-            "- Connect information across sources when possible\n"
-            "- Highlight actionable insights (upcoming deadlines, patterns, suggestions)\n"
-            "- Use a warm, helpful tone\n"
-            "- If results are sparse, say what you found without over-interpreting\n"
-            "- Never invent information not present in the data"
+        template = PROMPTS['synthesise_cross_silo']
+        return await self.generate(
+            template.render(query=query, context=context), system_prompt=template.system,
+            on_progress=on_progress, priority=Priority.RECALL, room_id=room_id, task=template.name
         )
 
-        prompt = f"""The family asked: "{query}"
-
-Here's what I found across their data:
-
-{context}
-
-Synthesise this into a brief, insightful response that connects the dots across these sources:"""
-
-        return await self.generate(prompt, system_prompt=system_prompt)
-
-    async def extract_calendar_event(self, content: str) -> Dict[str, Any]:
+    async def extract_calendar_event(self, content: str, room_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract event details from a natural language calendar request.
 
         Returns dict with keys: summary, date, time, duration, location
         """
-        prompt = f"""Extract calendar event details from this request.
-Request: "{content}"
-
-Respond ONLY with valid JSON in this format:
-{{
-    "summary": "short event title",
-    "date": "the date mentioned (e.g., 'Tuesday', 'tomorrow', 'March 15')",
-    "time": "the time mentioned (e.g., '5pm', '14:00', 'noon')",
-    "duration": "duration if mentioned (e.g., '1 hour', '30 minutes'), or null",
-    "location": "location if mentioned, or null"
-}}
-"""
-        response = await self.generate(prompt, json_mode=True)
-        return self._extract_json(response)
-
-    async def is_model_available(self) -> bool:
+        return await self._generate_json(PROMPTS['extract_calendar_event'], room_id=room_id, content=content)
+
+    async def is_model_available(self, model: Optional[str] = None) -> bool:
         """
-        Check if the configured model is available in Ollama.
+        Check if a model (default: the configured model) is available in Ollama.
         """
+        model = model or self.model
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                response = await client.get(f"{self.ollama_url}/api/tags")
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [m.get('name', '') for m in data.get('models', [])]
-                    # Check for exact match or match without tag
-                    model_base = self.model.split(':')[0]
-                    return any(self.model in m or model_base in m for m in models)
+            response = await clients.get('ollama').get(f"{self.ollama_url}/api/tags", timeout=5)
+            if response.status_code == 200:
+                data = response.json()
+                models = [m.get('name', '') for m in data.get('models', [])]
+                # Check for exact match or match without tag
+                model_base = model.split(':')[0]
+                return any(model in m or model_base in m for m in models)
         except Exception as e:
             logger.error(f"Failed to check model availability: {e}")
         return False
 
     async def pull_model_if_needed(self) -> bool:
         """
-        Pull the model if it's not already available.
-        Returns True if model is ready, False otherwise.
+        Pull every configured model (primary plus any per-task models) that
+        isn't already available. Meant to run as a background task; progress
+        is on self.puller while it does.
+        Returns True if all models are ready, False otherwise.
         """
-        if await self.is_model_available():
-            logger.info(f"Model {self.model} is available")
-            return True
-
-        logger.info(f"Pulling model {self.model}...")
-        try:
-            async with httpx.AsyncClient(timeout=300) as client:  # 5 min timeout for pull
-                response = await client.post(
-                    f"{self.ollama_url}/api/pull",
-                    json={"name": self.model, "stream": False}
-                )
-                if response.status_code == 200:
-                    logger.info(f"Successfully pulled model {self.model}")
-                    return True
-                else:
-                    logger.error(f"Failed to pull model: {response.text}")
-        except Exception as e:
-            logger.error(f"Error pulling model: {e}")
-        return False
+        return await self.puller.run()
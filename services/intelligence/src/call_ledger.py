@@ -0,0 +1,152 @@
+"""
+Ledger of every Ollama call.
+
+Each generation is recorded with its task, model, backend, outcome, time
+spent waiting for an inference slot, and the token counts and durations
+Ollama reports (load, prompt eval, eval). The most recent calls stay in an
+in-memory ring buffer; when a store is attached they are also written to
+the llm_calls table in batches, optionally sampled, so per-task p50/p95
+latency and tokens/s can be queried over days rather than minutes.
+"""
+
+import logging
+import math
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+logger = logging.getLogger("memu.call_ledger")
+
+NS_PER_MS = 1_000_000
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@dataclass
+class LLMCall:
+    """One Ollama generation, filled in as it runs."""
+    task: str
+    model: str
+    priority: str = ""
+    backend: Optional[str] = None
+    outcome: str = "ok"                     # ok / partial / error / cancelled
+    queue_wait_ms: Optional[int] = None
+    total_ms: Optional[int] = None          # wall time once a slot was granted
+    load_ms: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    prompt_eval_ms: Optional[int] = None
+    eval_tokens: Optional[int] = None
+    eval_ms: Optional[int] = None
+    created_at: datetime = field(default_factory=datetime.now)
+
+    def add_timings(self, result: Dict[str, Any]) -> None:
+        """Copy the counters from Ollama's final response (durations are in ns)."""
+        def ms(key: str) -> Optional[int]:
+            value = result.get(key)
+            return round(value / NS_PER_MS) if value is not None else None
+
+        self.load_ms = ms('load_duration')
+        self.prompt_tokens = result.get('prompt_eval_count')
+        self.prompt_eval_ms = ms('prompt_eval_duration')
+        self.eval_tokens = result.get('eval_count')
+        self.eval_ms = ms('eval_duration')
+
+
+def summarize(calls: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per-task call count, failures, p50/p95 latency, tokens/s and averages."""
+    by_task: Dict[str, List[Dict[str, Any]]] = {}
+    for call in calls:
+        by_task.setdefault(call['task'], []).append(call)
+
+    rows = []
+    for task, group in by_task.items():
+        latencies = [c['total_ms'] for c in group if c['total_ms'] is not None]
+        eval_tokens = sum(c['eval_tokens'] or 0 for c in group)
+        eval_ms = sum(c['eval_ms'] or 0 for c in group)
+        waits = [c['queue_wait_ms'] for c in group if c['queue_wait_ms'] is not None]
+        prompts = [c['prompt_tokens'] for c in group if c['prompt_tokens'] is not None]
+        rows.append({
+            'task': task,
+            'total_ms': sum(latencies),
+            'calls': len(group),
+            'failures': sum(1 for c in group if c['outcome'] != 'ok'),
+            'p50_ms': round(percentile(latencies, 50)),
+            'p95_ms': round(percentile(latencies, 95)),
+            'tokens_per_s': round(eval_tokens / (eval_ms / 1000), 1) if eval_ms else 0.0,
+            'avg_prompt_tokens': round(sum(prompts) / len(prompts)) if prompts else 0,
+            'avg_queue_wait_ms': round(sum(waits) / len(waits)) if waits else 0,
+        })
+    # Where the inference time goes: biggest total first
+    rows.sort(key=lambda r: r.pop('total_ms'), reverse=True)
+    return rows
+
+
+class CallLedger:
+    """
+    Ring buffer of recent calls with optional batched persistence.
+
+    The store is a MemoryStore; writes are best-effort and never fail a
+    generation. `sample_rate` thins out successful calls only; failures and
+    cancellations are always kept.
+    """
+
+    def __init__(self, max_entries: int = 500, sample_rate: float = 1.0):
+        self.calls: Deque[LLMCall] = deque(maxlen=max_entries)
+        self.sample_rate = sample_rate
+        self.store = None
+        self._unsaved: List[LLMCall] = []
+
+    def attach_store(self, store) -> None:
+        self.store = store
+
+    def record(self, call: LLMCall) -> None:
+        self.calls.append(call)
+        if self.store is not None and (call.outcome != 'ok' or random.random() < self.sample_rate):
+            self._unsaved.append(call)
+        logger.debug(
+            f"LLM call [{call.task}] {call.model} {call.outcome}: {call.total_ms}ms "
+            f"(queued {call.queue_wait_ms}ms, {call.prompt_tokens} prompt / {call.eval_tokens} eval tokens)"
+        )
+
+    async def flush(self) -> int:
+        """Write buffered calls to the store; returns how many were written."""
+        if self.store is None or not self._unsaved:
+            return 0
+        batch, self._unsaved = self._unsaved, []
+        try:
+            await self.store.record_llm_calls([asdict(c) for c in batch])
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(batch)} LLM calls: {e}")
+            return 0
+        return len(batch)
+
+    async def prune(self, days: int) -> None:
+        if self.store is None:
+            return
+        try:
+            removed = await self.store.prune_llm_calls(days)
+            if removed:
+                logger.info(f"Removed {removed} LLM call records older than {days} days")
+        except Exception as e:
+            logger.warning(f"Failed to prune LLM call records: {e}")
+
+    async def stats(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Per-task summary from the store when attached, else from the ring buffer."""
+        if self.store is not None:
+            await self.flush()
+            try:
+                return await self.store.get_llm_call_stats(hours)
+            except Exception as e:
+                logger.warning(f"Failed to load LLM call stats: {e}")
+        since = time.time() - hours * 3600
+        return summarize([asdict(c) for c in self.calls if c.created_at.timestamp() >= since])
@@ -14,13 +14,105 @@ class Config:
     DB_NAME = os.getenv("DB_NAME", "immich")
     DB_USER = os.getenv("DB_USER", "postgres")
     DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+    # Connection pool: the database is shared with Immich, so keep the footprint small
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))  # seconds before an idle connection closes
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))  # prepared statements per connection
+    # Client-side limit per query, and the server-side statement_timeout (seconds, 0 = none)
+    DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", "30"))
+    DB_STATEMENT_TIMEOUT = float(os.getenv("DB_STATEMENT_TIMEOUT", "15"))
+    DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "memu-intelligence")  # shown in pg_stat_activity
+    DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "500"))  # queries slower than this are logged
 
     # AI Configuration
     OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://ollama:11434")
+    # Extra Ollama backends (e.g. a gaming PC's GPU), comma-separated. The fastest healthy
+    # one is preferred and OLLAMA_HOST stays as the fallback.
+    OLLAMA_EXTERNAL_HOSTS = [h.strip() for h in os.getenv("OLLAMA_EXTERNAL_HOSTS", "").split(",") if h.strip()]
+    # Seconds between backend health probes
+    OLLAMA_PROBE_INTERVAL = int(os.getenv("OLLAMA_PROBE_INTERVAL", "30"))
     # Ministral-3B recommended by community for better quality at similar resource cost
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "ministral:3b")
+    # Optional small model (e.g. qwen2.5:0.5b) for intent classification and JSON extraction;
+    # unparseable answers are retried on OLLAMA_MODEL. Empty = OLLAMA_MODEL for everything.
+    OLLAMA_SMALL_MODEL = os.getenv("OLLAMA_SMALL_MODEL", "")
+    # Per-task overrides as task=model pairs, e.g. "briefing=llama3.1:8b,chat=llama3.2"
+    OLLAMA_TASK_MODELS = {
+        task.strip(): model.strip() for task, _, model in
+        (pair.partition("=") for pair in os.getenv("OLLAMA_TASK_MODELS", "").split(","))
+        if task.strip() and model.strip()
+    }
+    # Share of labelled cases a model must get right for /benchmark to recommend it
+    BENCHMARK_MIN_ACCURACY = float(os.getenv("BENCHMARK_MIN_ACCURACY", "0.8"))
     AI_ENABLED = os.getenv("AI_ENABLED", "true").lower() == "true"
     AI_TIMEOUT = int(os.getenv("AI_TIMEOUT", "120"))
+    # Wall-clock limit for a whole generation, queueing included (0 = none); the
+    # request to Ollama is aborted so it stops computing
+    AI_DEADLINE = int(os.getenv("AI_DEADLINE", "180"))
+    # Concurrent generations sent to Ollama; match OLLAMA_NUM_PARALLEL on the Ollama side
+    OLLAMA_MAX_PARALLEL = int(os.getenv("OLLAMA_MAX_PARALLEL", "1"))
+    # How long Ollama keeps the model loaded after each request (Ollama duration string)
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    # Minutes of idleness before a keep-alive ping re-touches the model (0 = off)
+    OLLAMA_KEEPALIVE_INTERVAL = int(os.getenv("OLLAMA_KEEPALIVE_INTERVAL", "20"))
+    MODEL_WARMUP_ENABLED = os.getenv("MODEL_WARMUP_ENABLED", "true").lower() == "true"
+    # Log and accumulate Ollama prompt-eval time per prompt template
+    PROMPT_METRICS_ENABLED = os.getenv("PROMPT_METRICS_ENABLED", "false").lower() == "true"
+    # Context window sent with every request (0 = Ollama's default). Keep it the same for
+    # tasks sharing a model, or Ollama reloads the model to resize it.
+    OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "0"))
+    # Constrain JSON tasks with a schema (needs Ollama 0.5+); false = plain JSON mode
+    STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+    # Per-task generation overrides as JSON, e.g. {"briefing": {"num_predict": 600}}
+    GENERATION_PROFILES = os.getenv("GENERATION_PROFILES", "")
+    # Stream long replies and edit the Matrix message as tokens arrive
+    STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
+    STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "2.0"))  # seconds between edits
+    # Classify obvious requests with patterns before asking the model
+    FAST_INTENT_ENABLED = os.getenv("FAST_INTENT_ENABLED", "true").lower() == "true"
+    # Classify messages that arrive together in one generation (off by default)
+    INTENT_BATCH_ENABLED = os.getenv("INTENT_BATCH_ENABLED", "false").lower() == "true"
+    INTENT_BATCH_WINDOW = float(os.getenv("INTENT_BATCH_WINDOW", "0.25"))  # seconds to wait for company
+    INTENT_BATCH_MAX = int(os.getenv("INTENT_BATCH_MAX", "4"))
+    # Semantic /recall: embed facts and chat with OLLAMA_EMBED_MODEL into pgvecto-rs.
+    # OLLAMA_EMBED_DIMENSIONS must match the model (nomic-embed-text: 768)
+    SEMANTIC_RECALL_ENABLED = os.getenv("SEMANTIC_RECALL_ENABLED", "true").lower() == "true"
+    OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+    OLLAMA_EMBED_DIMENSIONS = int(os.getenv("OLLAMA_EMBED_DIMENSIONS", "768"))
+    EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+    EMBED_BACKFILL_INTERVAL = int(os.getenv("EMBED_BACKFILL_INTERVAL", "5"))  # minutes
+    EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", "10"))  # seconds, query embeddings
+    # Cosine distance above which a vector match is treated as unrelated
+    SEMANTIC_MAX_DISTANCE = float(os.getenv("SEMANTIC_MAX_DISTANCE", "0.5"))
+    # Keep a searchable copy of room messages in Postgres (recall, /summarize);
+    # up to CHAT_ARCHIVE_BACKFILL older messages per room are fetched on join/startup.
+    # Opt-in: the copy is plaintext, even for end-to-end encrypted rooms
+    CHAT_ARCHIVE_ENABLED = os.getenv("CHAT_ARCHIVE_ENABLED", "false").lower() == "true"
+    CHAT_ARCHIVE_BACKFILL = int(os.getenv("CHAT_ARCHIVE_BACKFILL", "2000"))
+    # Reminders are delivered on time from an in-memory heap kept current by LISTEN/NOTIFY;
+    # it is also reloaded from the database every REMINDER_RESYNC_INTERVAL seconds
+    REMINDER_RESYNC_INTERVAL = float(os.getenv("REMINDER_RESYNC_INTERVAL", "3600"))
+    # Due reminders are claimed for REMINDER_LEASE seconds (so replicas never double-send)
+    # and sent up to REMINDER_CONCURRENCY at a time; a failed send is retried with backoff
+    # up to REMINDER_MAX_ATTEMPTS times
+    REMINDER_LEASE = float(os.getenv("REMINDER_LEASE", "120"))
+    REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "4"))
+    REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "5"))
+    # Record every Ollama call: the last LLM_LEDGER_SIZE in memory, and in Postgres
+    # (llm_calls) when persisting; successful calls are sampled at LLM_LEDGER_SAMPLE_RATE
+    LLM_LEDGER_SIZE = int(os.getenv("LLM_LEDGER_SIZE", "500"))
+    LLM_LEDGER_PERSIST = os.getenv("LLM_LEDGER_PERSIST", "true").lower() == "true"
+    LLM_LEDGER_SAMPLE_RATE = float(os.getenv("LLM_LEDGER_SAMPLE_RATE", "1.0"))
+    LLM_LEDGER_RETENTION_DAYS = int(os.getenv("LLM_LEDGER_RETENTION_DAYS", "30"))
+    # Cache intent/extraction results (LRU + TTL, optionally persisted to Postgres)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "512"))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))  # seconds
+    LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+    # Estimated-token budgets for the context sent to /summarize and cross-silo synthesis
+    SUMMARY_CONTEXT_TOKENS = int(os.getenv("SUMMARY_CONTEXT_TOKENS", "1500"))
+    RECALL_CONTEXT_TOKENS = int(os.getenv("RECALL_CONTEXT_TOKENS", "1200"))
 
     # Calendar Configuration (Baikal CalDAV)
     CALDAV_URL = os.getenv("CALDAV_URL", "http://calendar/dav.php")
@@ -32,6 +124,7 @@ class Config:
     BRIEFING_ENABLED = os.getenv("BRIEFING_ENABLED", "true").lower() == "true"
     BRIEFING_TIME = os.getenv("BRIEFING_TIME", "07:00")  # 24-hour format
     PRIMARY_ROOM_ID = os.getenv("PRIMARY_ROOM_ID", "")  # Matrix room for briefings
+    BRIEFING_PREWARM_MINUTES = int(os.getenv("BRIEFING_PREWARM_MINUTES", "5"))  # load model ahead of briefing
 
     # Weather API (OpenWeatherMap - free tier)
     WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
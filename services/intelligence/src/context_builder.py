@@ -0,0 +1,143 @@
+"""
+Token-budgeted context assembly for LLM prompts.
+
+On a CPU-only hub prompt-eval time grows linearly with the input, so the
+context handed to summaries and cross-silo synthesis is fitted to a token
+budget: each section gets a share, items are taken most-useful-first and
+over-long items are condensed, and whatever a section doesn't use is handed
+on to sections that had to drop items.
+"""
+
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger("memu.context")
+
+T = TypeVar("T")
+
+# Rough average for English text with Llama/Mistral-style BPE vocabularies
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; close enough for budgeting without a tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def condense(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, marking the cut."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 1].rstrip() + "…"
+
+
+def rank_by_query(items: Iterable[T], query: str, text: Callable[[T], str]) -> List[T]:
+    """
+    Order items by how many query words they mention (stable, so ties keep
+    their original order, e.g. newest first from the database).
+    """
+    terms = {w for w in re.findall(r"\w+", query.lower()) if len(w) > 2}
+    items = list(items)
+    if not terms:
+        return items
+
+    def score(item: T) -> int:
+        words = set(re.findall(r"\w+", text(item).lower()))
+        return len(terms & words)
+
+    return sorted(items, key=score, reverse=True)
+
+
+@dataclass
+class _Section:
+    title: Optional[str]
+    items: List[str]
+    weight: float
+    keep: str
+    kept: List[int] = field(default_factory=list)
+    tokens: int = 0
+
+    def candidates(self) -> List[int]:
+        """Item indices in the order they should be taken."""
+        order = list(range(len(self.items)))
+        return order if self.keep == 'first' else order[::-1]
+
+
+class ContextBuilder:
+    """
+    Collects sections of context and renders them within a token budget.
+
+    Items within a section are either in priority order (keep='first', the
+    tail is dropped) or chronological (keep='last', the oldest are dropped);
+    either way the kept items are rendered in their original order.
+    """
+
+    def __init__(self, max_tokens: int, name: str = "context"):
+        self.max_tokens = max_tokens
+        self.name = name
+        self.sections: List[_Section] = []
+        self.report: Dict[str, Any] = {}
+
+    def add_section(self, title: Optional[str], items: Iterable[str], weight: float = 1.0,
+                    max_item_tokens: Optional[int] = None, keep: str = 'first') -> None:
+        items = [condense(i, max_item_tokens) if max_item_tokens else i for i in items]
+        if items:
+            self.sections.append(_Section(title, items, weight, keep))
+
+    def build(self) -> str:
+        headers = sum(estimate_tokens(s.title) + 1 for s in self.sections if s.title)
+        available = max(self.max_tokens - headers, 0)
+        total_weight = sum(s.weight for s in self.sections) or 1.0
+
+        # First pass: every section fills its own share
+        for section in self.sections:
+            share = int(available * section.weight / total_weight)
+            self._fill(section, share)
+
+        # Second pass: hand unused budget to sections that had to drop items
+        spare = available - sum(s.tokens for s in self.sections)
+        for section in self.sections:
+            if spare <= 0:
+                break
+            before = section.tokens
+            self._fill(section, section.tokens + spare)
+            spare -= section.tokens - before
+
+        blocks = []
+        for section in self.sections:
+            if not section.kept:
+                continue
+            lines = [section.title] if section.title else []
+            lines.extend(section.items[i] for i in sorted(section.kept))
+            blocks.append("\n".join(lines))
+        text = "\n\n".join(blocks)
+
+        self.report = {
+            'budget': self.max_tokens,
+            'tokens': estimate_tokens(text),
+            'sections': {
+                (s.title or 'items'): f"{len(s.kept)}/{len(s.items)}" for s in self.sections
+            },
+        }
+        logger.info(
+            f"{self.name}: ~{self.report['tokens']} tokens (budget {self.max_tokens}); kept "
+            + ", ".join(f"{k.lstrip('# ')} {v}" for k, v in self.report['sections'].items())
+        )
+        return text
+
+    @staticmethod
+    def _fill(section: _Section, budget: int) -> None:
+        """Take more of the section's items, in order, while they fit the budget."""
+        taken = set(section.kept)
+        for index in section.candidates():
+            if index in taken:
+                continue
+            cost = estimate_tokens(section.items[index]) + 1  # +1 for the newline
+            if section.tokens + cost > budget:
+                break
+            section.kept.append(index)
+            section.tokens += cost
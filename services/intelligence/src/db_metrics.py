@@ -0,0 +1,118 @@
+"""
+Connection pool instrumentation for the shared Postgres.
+
+The database also serves Immich, whose ML jobs can hold it busy for long
+stretches. To make that contention visible, MemoryStore takes connections
+through PoolMetrics.acquire, which times the wait for a free connection
+and tracks how many are in use. Every pooled connection also reports each
+query's latency through asyncpg's query logger. Latencies go into
+fixed-bucket histograms (per SQL verb and overall), and queries slower
+than DB_SLOW_QUERY_MS are logged. `/ai stats` shows the snapshot.
+"""
+
+import bisect
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Sequence
+
+logger = logging.getLogger("memu.db_metrics")
+
+# Upper bounds (ms) of the histogram buckets; anything slower lands in the last, open bucket
+BUCKETS_MS: Sequence[float] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are bucket upper bounds."""
+
+    def __init__(self, bounds: Sequence[float] = BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (q in 0-100)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q / 100 * self.count))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count, 1) if self.count else 0.0,
+            'p50_ms': self.quantile(50),
+            'p95_ms': self.quantile(95),
+            'p99_ms': self.quantile(99),
+            'max_ms': round(self.max, 1),
+            'buckets': {str(b): n for b, n in zip(list(self.bounds) + ['+Inf'], self.counts)},
+        }
+
+
+class PoolMetrics:
+    """Acquire waits, connections in use and query latency for one asyncpg pool."""
+
+    def __init__(self, slow_query_ms: float = 500):
+        self.slow_query_ms = slow_query_ms
+        self.acquire_wait = Histogram()
+        self.queries = Histogram()
+        self.by_verb: Dict[str, Histogram] = {}
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.errors = 0
+        self.slow = 0
+
+    @asynccontextmanager
+    async def acquire(self, pool) -> AsyncIterator[Any]:
+        """pool.acquire(), timing the wait and counting the connection as in use."""
+        started = time.monotonic()
+        async with pool.acquire() as conn:
+            self.acquire_wait.observe((time.monotonic() - started) * 1000)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            try:
+                yield conn
+            finally:
+                self.in_use -= 1
+
+    def on_query(self, record) -> None:
+        """asyncpg query logger callback (Connection.add_query_logger)."""
+        ms = record.elapsed * 1000
+        query = ' '.join(record.query.split())
+        verb = query.split(' ', 1)[0].upper() if query else '?'
+        self.queries.observe(ms)
+        self.by_verb.setdefault(verb, Histogram()).observe(ms)
+        if record.exception is not None:
+            self.errors += 1
+        if ms >= self.slow_query_ms:
+            self.slow += 1
+            logger.warning(f"Slow query ({ms:.0f}ms): {query[:200]}")
+
+    def snapshot(self, pool=None) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'acquire_wait': self.acquire_wait.snapshot(),
+            'queries': self.queries.snapshot(),
+            'by_verb': {verb: h.snapshot() for verb, h in sorted(self.by_verb.items())},
+            'errors': self.errors,
+            'slow': self.slow,
+        }
+        if pool is not None:
+            stats['size'] = pool.get_size()
+            stats['idle'] = pool.get_idle_size()
+            stats['max_size'] = pool.get_max_size()
+        return stats
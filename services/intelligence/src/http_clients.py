@@ -0,0 +1,90 @@
+"""
+Shared HTTP clients, one per upstream.
+
+Every outbound request (Ollama, Immich, the Matrix search API, weather and
+RSS feeds) goes through a long-lived httpx.AsyncClient from this registry,
+so connections are pooled and kept alive between calls instead of paying a
+TCP (and TLS) handshake every time. Each upstream gets its own pool limits
+and default timeouts; callers can still pass a per-request `timeout`.
+
+HTTP/2 is used for HTTPS upstreams when the `h2` package is installed
+(httpx[http2]); plain-HTTP services on the hub stay on HTTP/1.1 keep-alive.
+The service closes the registry on shutdown (see main.py).
+"""
+
+import importlib.util
+import logging
+from dataclasses import dataclass
+from typing import Dict
+
+import httpx
+
+from config import Config
+
+logger = logging.getLogger("memu.http_clients")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """Pool and timeout settings for one upstream service."""
+    timeout: httpx.Timeout
+    limits: httpx.Limits
+
+
+UPSTREAMS: Dict[str, Upstream] = {
+    # Local hub and any OLLAMA_EXTERNAL_HOSTS; generations are long, so idle
+    # connections are kept for a while rather than re-opened per message
+    'ollama': Upstream(
+        timeout=httpx.Timeout(Config.AI_TIMEOUT, connect=5.0),
+        limits=httpx.Limits(max_connections=Config.OLLAMA_MAX_PARALLEL + 8,
+                            max_keepalive_connections=Config.OLLAMA_MAX_PARALLEL + 2,
+                            keepalive_expiry=60.0),
+    ),
+    'immich': Upstream(
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=30.0),
+    ),
+    'matrix': Upstream(
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=30.0),
+    ),
+    # Weather API and RSS feeds, used by the morning briefing
+    'web': Upstream(
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=15.0),
+    ),
+}
+
+
+class HttpClients:
+    """Lazily created, pooled clients keyed by upstream name."""
+
+    def __init__(self, upstreams: Dict[str, Upstream] = UPSTREAMS):
+        self.upstreams = upstreams
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            upstream = self.upstreams[name]
+            client = httpx.AsyncClient(
+                timeout=upstream.timeout,
+                limits=upstream.limits,
+                http2=HTTP2_AVAILABLE,
+            )
+            self._clients[name] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close every pool (service shutdown)."""
+        clients, self._clients = self._clients, {}
+        for name, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close {name} HTTP client: {e}")
+
+
+clients = HttpClients()
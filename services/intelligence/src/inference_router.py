@@ -0,0 +1,119 @@
+"""
+Latency-aware routing across several Ollama backends.
+
+A family may point Memu at a gaming PC's GPU as well as the hub's own
+Ollama. The router prefers whichever healthy backend has been fastest
+recently, and falls back to the local hub when the external one goes away.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from http_clients import clients
+
+logger = logging.getLogger("memu.router")
+
+
+class Backend:
+    """One Ollama endpoint and what we've learned about it."""
+
+    def __init__(self, url: str, local: bool = False):
+        self.url = url.rstrip('/')
+        self.local = local
+        self.healthy = True  # optimistic until a probe or request says otherwise
+        # EWMA of wall-clock seconds per generated token (None until first success)
+        self.ewma_latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_probe: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'url': self.url,
+            'local': self.local,
+            'healthy': self.healthy,
+            'ewma_s_per_token': round(self.ewma_latency, 4) if self.ewma_latency is not None else None,
+            'requests': self.requests,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+
+class InferenceRouter:
+    """
+    Orders backends for each request and learns from the outcome.
+
+    Healthy backends come first, fastest EWMA first; a backend we haven't
+    measured yet is tried before measured ones so it gets a chance to prove
+    itself. Unhealthy backends stay at the end as a last resort.
+    """
+
+    def __init__(self, local_url: str, external_urls: List[str] = None, alpha: float = 0.3):
+        self.alpha = alpha
+        self.backends: List[Backend] = [Backend(u) for u in (external_urls or []) if u.strip()]
+        self.backends.append(Backend(local_url, local=True))
+        self.last_decision: Optional[Dict[str, Any]] = None
+
+    @property
+    def local(self) -> Backend:
+        return self.backends[-1]
+
+    def candidates(self) -> List[Backend]:
+        def rank(indexed):
+            index, backend = indexed
+            return (
+                not backend.healthy,
+                backend.ewma_latency if backend.ewma_latency is not None else -1.0,
+                index,
+            )
+        ordered = [b for _, b in sorted(enumerate(self.backends), key=rank)]
+        self.last_decision = {
+            'at': time.time(),
+            'order': [b.url for b in ordered],
+        }
+        return ordered
+
+    def record_success(self, backend: Backend, seconds: float, tokens: Optional[int] = None) -> None:
+        per_token = seconds / max(tokens or 1, 1)
+        if backend.ewma_latency is None:
+            backend.ewma_latency = per_token
+        else:
+            backend.ewma_latency = self.alpha * per_token + (1 - self.alpha) * backend.ewma_latency
+        backend.requests += 1
+        if not backend.healthy:
+            logger.info(f"Inference backend {backend.url} is healthy again")
+        backend.healthy = True
+        backend.last_error = None
+        if self.last_decision is not None:
+            self.last_decision['chosen'] = backend.url
+
+    def record_failure(self, backend: Backend, error: Exception) -> None:
+        backend.failures += 1
+        backend.last_error = str(error) or error.__class__.__name__
+        if backend.healthy:
+            logger.warning(f"Inference backend {backend.url} failed, routing around it: {backend.last_error}")
+        backend.healthy = False
+
+    async def probe_all(self, timeout: float = 3.0) -> None:
+        """Health-check every backend via /api/tags (scheduled periodically)."""
+        client = clients.get('ollama')
+        for backend in self.backends:
+            backend.last_probe = time.time()
+            try:
+                response = await client.get(f"{backend.url}/api/tags", timeout=timeout)
+                response.raise_for_status()
+            except Exception as e:
+                self.record_failure(backend, e)
+                continue
+            if not backend.healthy:
+                logger.info(f"Inference backend {backend.url} is reachable again")
+            backend.healthy = True
+            backend.last_error = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'backends': [b.snapshot() for b in self.backends],
+            'last_decision': self.last_decision,
+        }
@@ -0,0 +1,155 @@
+"""
+Priority scheduler for Ollama traffic.
+
+Interactive replies, recall synthesis, the morning briefing and chat summaries
+all share one CPU-bound Ollama instance. Every generation takes a slot from
+this scheduler first, so a long briefing can't starve a quick "remind me".
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+logger = logging.getLogger("memu.scheduler")
+
+
+class Priority(IntEnum):
+    """Lower value = served first."""
+    INTERACTIVE = 0   # intent, extraction, chat replies
+    RECALL = 1        # cross-silo synthesis, recall summaries
+    BACKGROUND = 2    # morning briefing, chat summaries, warm-ups
+
+
+class _LaneStats:
+    def __init__(self):
+        self.served = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        self.served += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class InferenceScheduler:
+    """
+    Concurrency limiter with strict priority lanes and per-room fairness.
+
+    At most `max_in_flight` generations run at once (match Ollama's
+    OLLAMA_NUM_PARALLEL). Waiters are served from the highest-priority lane
+    first; within a lane, rooms take turns so one busy room can't monopolise
+    the model.
+    """
+
+    def __init__(self, max_in_flight: int = 1):
+        self.max_in_flight = max(1, max_in_flight)
+        self._in_flight = 0
+        # priority -> room -> queue of waiting futures (round-robin over rooms)
+        self._lanes: Dict[Priority, "OrderedDict[str, Deque[asyncio.Future]]"] = {
+            p: OrderedDict() for p in Priority
+        }
+        self._stats: Dict[Priority, _LaneStats] = {p: _LaneStats() for p in Priority}
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def queue_depth(self, priority: Optional[Priority] = None) -> int:
+        lanes = [self._lanes[priority]] if priority is not None else self._lanes.values()
+        return sum(len(q) for lane in lanes for q in lane.values())
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE,
+                   room_id: Optional[str] = None) -> AsyncIterator[float]:
+        """Hold an inference slot for the duration of the block; yields the wait time."""
+        wait = await self._acquire(priority, room_id or "")
+        try:
+            yield wait
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: Priority, room_key: str) -> float:
+        started = time.monotonic()
+
+        if self._in_flight < self.max_in_flight and self.queue_depth() == 0:
+            self._in_flight += 1
+            self._stats[priority].record(0.0)
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        lane = self._lanes[priority]
+        lane.setdefault(room_key, deque()).append(future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we were cancelled; hand it on
+                self._release()
+            else:
+                self._discard(priority, room_key, future)
+            raise
+
+        wait = time.monotonic() - started
+        self._stats[priority].record(wait)
+        if wait > 1.0:
+            logger.debug(f"Waited {wait:.1f}s for an inference slot ({priority.name})")
+        return wait
+
+    def _discard(self, priority: Priority, room_key: str, future: asyncio.Future) -> None:
+        queue = self._lanes[priority].get(room_key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            pass
+        if not queue:
+            del self._lanes[priority][room_key]
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.max_in_flight:
+            future = self._next_waiter()
+            if future is None:
+                return
+            self._in_flight += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in Priority:
+            lane = self._lanes[priority]
+            while lane:
+                room_key, queue = next(iter(lane.items()))
+                future = queue.popleft()
+                if queue:
+                    lane.move_to_end(room_key)  # next room's turn
+                else:
+                    del lane[room_key]
+                if not future.done():
+                    return future
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        lanes = {}
+        for priority in Priority:
+            s = self._stats[priority]
+            lanes[priority.name.lower()] = {
+                'queued': self.queue_depth(priority),
+                'served': s.served,
+                'avg_wait_s': round(s.total_wait / s.served, 3) if s.served else 0.0,
+                'max_wait_s': round(s.max_wait, 3),
+            }
+        return {
+            'max_in_flight': self.max_in_flight,
+            'in_flight': self._in_flight,
+            'lanes': lanes,
+        }
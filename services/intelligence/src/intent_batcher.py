@@ -0,0 +1,118 @@
+"""
+Micro-batching for intent classification.
+
+After a burst of messages (school run, a group-chat flurry) each one would
+otherwise queue for its own analyze_intent generation. The batcher holds
+messages for a short window and classifies everything that arrived in one
+structured prompt; a lone message is classified with a normal single call.
+
+A batch is split by room before it goes to the model, so each generation
+is queued under its own room and the scheduler's per-room fairness holds.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from brain import Brain
+
+logger = logging.getLogger("memu.intent_batcher")
+
+_Pending = Tuple[str, Optional[str], asyncio.Future]
+
+
+class IntentBatcher:
+    """Collects analyze_intent requests for `window_s` seconds, up to `max_batch` at a time."""
+
+    def __init__(self, brain: "Brain", window_s: float = 0.25, max_batch: int = 4):
+        self.brain = brain
+        self.window_s = window_s
+        self.max_batch = max(1, max_batch)
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_messages = 0
+        self.single_calls = 0
+
+    async def classify(self, content: str, room_id: Optional[str] = None) -> Dict[str, Any]:
+        """Same contract as Brain.analyze_intent, but may share a generation."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((content, room_id, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_s, self._flush)
+
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Superseded before the batch went out: don't classify it at all
+            self._pending = [p for p in self._pending if p[2] is not future]
+            raise
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [p for p in self._pending[:self.max_batch] if not p[2].done()]
+        self._pending = self._pending[self.max_batch:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.window_s, self._flush)
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        by_room: Dict[Optional[str], List[_Pending]] = {}
+        for pending in batch:
+            by_room.setdefault(pending[1], []).append(pending)
+        await asyncio.gather(*(self._run_room(room_batch) for room_batch in by_room.values()))
+
+    async def _run_room(self, batch: List[_Pending]) -> None:
+        """Classify messages from one room: a single call, or one batched generation."""
+        try:
+            if len(batch) == 1:
+                content, room_id, future = batch[0]
+                self.single_calls += 1
+                self._resolve(future, await self.brain.analyze_intent(content, room_id=room_id))
+                return
+
+            self.batches += 1
+            self.batched_messages += len(batch)
+            logger.info(f"Classifying {len(batch)} messages in one batch")
+            results = await self.brain.analyze_intents(
+                [content for content, _, _ in batch], room_id=batch[0][1]
+            )
+            missing = []
+            for (content, room_id, future), result in zip(batch, results):
+                if result is None:
+                    missing.append((content, room_id, future))
+                else:
+                    self._resolve(future, result)
+
+            # Anything the model skipped gets its own call
+            for content, room_id, future in missing:
+                if not future.done():
+                    self.single_calls += 1
+                    self._resolve(future, await self.brain.analyze_intent(content, room_id=room_id))
+        except Exception as e:
+            logger.warning(f"Batched intent classification failed: {e}")
+            for content, _, future in batch:
+                self._resolve(future, {"intent": "NONE", "content": content, "slots": {}})
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, result: Dict[str, Any]) -> None:
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._pending),
+            'batches': self.batches,
+            'batched_messages': self.batched_messages,
+            'single_calls': self.single_calls,
+        }
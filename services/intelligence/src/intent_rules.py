@@ -0,0 +1,124 @@
+"""
+Rule-based fast path for intent classification.
+
+Common household requests ("add milk to the list", "what's on the list?")
+are phrased predictably enough to classify with patterns, which saves a full
+LLM round-trip. Anything the rules aren't confident about returns None and
+falls back to Brain.analyze_intent.
+"""
+
+import logging
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("memu.intent_rules")
+
+# Leading/trailing ways people address the bot ("hey memu, ...", "..., memu")
+_ADDRESS_PREFIX = re.compile(r'^(?:(?:hey|hi|ok|okay)\s+)?@?memu(?:_bot)?(?::\S+)?\s*[,:]?\s*', re.IGNORECASE)
+_ADDRESS_SUFFIX = re.compile(r'[,\s]+@?memu(?:_bot)?(?::\S+)?\s*$', re.IGNORECASE)
+# "?" is kept: a question is never a fact to save or an item to add
+_TRAILING_PUNCT = re.compile(r'[\s!.]+$')
+_QUESTION = re.compile(r'\s*\?+$')
+
+_LIST = r"(?:the\s+|our\s+|my\s+)?(?:shopping\s+|grocery\s+)?list"
+_POLITE = r"(?:please\s+|can\s+you\s+|could\s+you\s+)?"
+_WHEN = r"(?P<c>today|tonight|tomorrow|this\s+week)"
+
+
+def _items(text: str) -> str:
+    """'milk and eggs & bread' -> 'milk, eggs, bread' (LIST_ADD content format)."""
+    parts = re.split(r',|\s+and\s+|\s*&\s*', text)
+    return ", ".join(p.strip() for p in parts if p.strip())
+
+
+def _calendar_range(text: str) -> str:
+    """Map a time phrase onto the argument handle_calendar understands."""
+    text = (text or "").lower()
+    if text == 'tomorrow':
+        return 'tomorrow'
+    if text.startswith('this'):
+        return 'week'
+    return ''
+
+
+def _same(text: str) -> str:
+    return text
+
+
+# (intent, pattern, content transform). Order matters: earlier rules win.
+# A pattern's (?P<c>...) group is the extracted content (empty if it didn't
+# participate); patterns without one pass the whole message through.
+RULES: List[Tuple[str, str, Callable[[str], str]]] = [
+    ('LIST_SHOW', rf"(?:what(?:'s|\s+is)\s+(?:on|in)|show(?:\s+me)?|check|read(?:\s+me)?)\s+{_LIST}", _same),
+    ('LIST_SHOW', r"what\s+do\s+we\s+need(?:\s+to\s+buy|\s+from\s+the\s+shops?)?", _same),
+    ('LIST_ADD', rf"{_POLITE}(?:add|put)\s+(?P<c>.+?)\s+(?:to|on)\s+{_LIST}", _items),
+    ('SCHEDULE', rf"{_POLITE}(?:add|put|schedule)\s+(?P<c>.+?)\s+(?:to|on|in)\s+(?:the\s+|our\s+)?(?:family\s+)?calendar", _same),
+    ('CALENDAR', rf"(?:what(?:'s|\s+is)|anything)\s+(?:happening|on|planned|scheduled)(?:\s+for)?\s+{_WHEN}", _calendar_range),
+    ('CALENDAR', rf"(?:what(?:'s|\s+is)\s+on\s+|show(?:\s+me)?\s+)(?:the\s+|our\s+)?(?:calendar|schedule)(?:\s+for)?(?:\s+{_WHEN})?", _calendar_range),
+    ('CALENDAR', rf"any\s+(?:events|plans)(?:\s+for)?\s+{_WHEN}", _calendar_range),
+    ('REMINDER', rf"{_POLITE}remind\s+(?:me|us)\s+(?:to\s+|about\s+|that\s+)?(?P<c>.+)", _same),
+    ('REMINDER', r"don'?t\s+(?:let\s+me\s+)?forget\s+(?:to\s+)?(?P<c>.+)", _same),
+    ('REMEMBER', r"(?:please\s+)?remember\s+(?:that\s+)?(?!to\b|when\b|what\b|where\b|who\b|how\b)(?P<c>.+)", _same),
+    ('REMEMBER', r"(?:make\s+a\s+)?note(?:\s+that)?\s*:\s*(?P<c>.+)", _same),
+    ('RECALL', r"(?:what\s+do\s+you\s+(?:know|remember)\s+about|do\s+you\s+remember)\s+(?P<c>.+)", _same),
+    ('SUMMARIZE', r"what\s+did\s+i\s+miss|catch\s+me\s+up", _same),
+    ('SUMMARIZE', rf"{_POLITE}(?:summari[sz]e|recap)(?:\s+(?:the\s+)?(?:chat|conversation|today|this))?", _same),
+    ('BRIEFING', r"(?:give\s+me\s+|can\s+i\s+(?:get|have)\s+|send\s+me\s+)?(?:a\s+|the\s+|my\s+|today'?s\s+)?(?:morning\s+|daily\s+)?briefing", _same),
+    ('BRIEFING', r"what(?:'s|\s+is)\s+going\s+on\s+today", _same),
+    ('CHAT', r"(?:hi|hello|hey|good\s+(?:morning|afternoon|evening)|thanks|thank\s+you|cheers)", _same),
+]
+
+
+# Intents that store what the user said; a question never takes these fast
+STATEMENT_INTENTS = frozenset({'REMEMBER', 'LIST_ADD'})
+
+
+class FastIntentClassifier:
+    """
+    Deterministic pre-classifier compiled from RULES into a single regex.
+
+    Returns the same {'intent', 'content'} shape as Brain.analyze_intent, or
+    None when no rule matches and the model should decide.
+    """
+
+    def __init__(self, rules: List[Tuple[str, str, Callable[[str], str]]] = None):
+        self.rules = rules if rules is not None else RULES
+        alternatives = []
+        for i, (_, pattern, _) in enumerate(self.rules):
+            # Give every rule's content group a unique name inside the combined pattern
+            pattern = pattern.replace('(?P<c>', f'(?P<r{i}c>')
+            alternatives.append(f'(?P<r{i}>{pattern})')
+        self._matcher = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    @staticmethod
+    def _normalize(content: str) -> str:
+        text = _ADDRESS_PREFIX.sub('', content.strip())
+        text = _TRAILING_PUNCT.sub('', text)
+        text = _ADDRESS_SUFFIX.sub('', text)
+        text = _TRAILING_PUNCT.sub('', text)
+        text = text.replace('’', "'")  # curly apostrophes from mobile keyboards
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def classify(self, content: str) -> Optional[Dict[str, str]]:
+        text = self._normalize(content)
+        if not text:
+            return None
+
+        question = bool(_QUESTION.search(text))
+        match = self._matcher.fullmatch(_QUESTION.sub('', text))
+        if not match:
+            return None
+
+        rule_index = int(match.lastgroup[1:])
+        intent, _, transform = self.rules[rule_index]
+        if question and intent in STATEMENT_INTENTS:
+            # "remember my locker code?" is asking, not telling
+            return None
+        group = f'r{rule_index}c'
+        extracted = match.group(group) if group in match.re.groupindex else match.group(0)
+        result = {
+            "intent": intent,
+            "content": transform((extracted or "").strip())
+        }
+        logger.debug(f"Fast-path intent {intent} for: {content}")
+        return result
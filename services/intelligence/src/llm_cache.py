@@ -0,0 +1,123 @@
+"""
+Response cache for deterministic Brain calls.
+
+Intent classification and JSON extraction are effectively pure functions of
+(model, prompt, system, format), and families repeat the same phrases many
+times a day. Results are kept in a bounded LRU with a TTL, optionally backed
+by Postgres so the cache survives restarts.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("memu.llm_cache")
+
+
+class ResponseCache:
+    """
+    In-process LRU/TTL cache keyed on a normalized prompt hash.
+
+    The optional store is a MemoryStore; persistence is best-effort and a
+    database error never fails a generation.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.store = None
+        self.model: Optional[str] = None
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system: Optional[str] = None, fmt: Any = None) -> str:
+        """
+        Hash the request with whitespace normalized away. Case is kept: cached
+        answers echo the user's text back, so "Xy7Q" must not get "xy7q"'s answer.
+        """
+        def norm(text: Optional[str]) -> str:
+            return re.sub(r'\s+', ' ', (text or '')).strip()
+
+        # "v2": keys from when case was folded must not match persisted rows
+        raw = "\x1f".join(['v2', model, norm(prompt), norm(system), repr(fmt)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    async def attach_store(self, store, models: List[str]) -> None:
+        """
+        Persist entries via `store`, dropping rows written by models that are
+        no longer configured. The first model is the primary one.
+        """
+        self.store = store
+        self.use_model(models[0])
+        try:
+            removed = await store.prune_llm_cache(models)
+            if removed:
+                logger.info(f"Dropped {removed} cached responses from previous models")
+        except Exception as e:
+            logger.warning(f"Failed to prune persisted LLM cache: {e}")
+
+    def use_model(self, model: str) -> None:
+        """Invalidate everything cached when the configured model changes."""
+        if self.model is not None and model != self.model:
+            logger.info(f"Model changed from {self.model} to {model}; clearing LLM cache")
+            self.invalidate()
+        self.model = model
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._entries[key]
+
+        if self.store is not None:
+            try:
+                response = await self.store.get_cached_response(key, self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                response = None
+            if response is not None:
+                self._remember(key, response)
+                self.hits += 1
+                return response
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, model: str, response: str) -> None:
+        self._remember(key, response)
+        if self.store is not None:
+            try:
+                await self.store.put_cached_response(key, model, response)
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
+
+    def _remember(self, key: str, response: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'persistent': self.store is not None,
+        }
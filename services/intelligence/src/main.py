@@ -7,6 +7,7 @@ Main entry point for the AI bot and scheduled agents
 import asyncio
 import logging
 import sys
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Add src to path if running from project root
@@ -14,11 +15,13 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from bot import MemuBot
 from config import Config
+from http_clients import clients
 from agents.briefing import MorningBriefingAgent
 
 # APScheduler for scheduled tasks
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
 # Configure logging
 logging.basicConfig(
@@ -55,6 +58,10 @@ def setup_scheduler(bot: MemuBot) -> AsyncIOScheduler:
 
     Currently includes:
     - Morning Briefing (default: 7:00 AM)
+    - Model pre-warm shortly before the briefing
+    - Model keep-alive pings
+    - LLM call ledger writes and pruning
+    - Embedding new facts and messages for semantic recall
     """
     scheduler = AsyncIOScheduler(timezone=Config.TIMEZONE)
 
@@ -81,6 +88,18 @@ def setup_scheduler(bot: MemuBot) -> AsyncIOScheduler:
 
         logger.info(f"Morning briefing scheduled for {hour:02d}:{minute:02d}")
 
+        # Load the model a few minutes early so the briefing doesn't pay a cold start
+        if Config.MODEL_WARMUP_ENABLED and Config.BRIEFING_PREWARM_MINUTES > 0:
+            prewarm_at = datetime(2000, 1, 1, hour, minute) - timedelta(minutes=Config.BRIEFING_PREWARM_MINUTES)
+            scheduler.add_job(
+                bot.brain.residency.warm_up,
+                trigger=CronTrigger(hour=prewarm_at.hour, minute=prewarm_at.minute),
+                kwargs={'reason': 'briefing pre-warm'},
+                id='briefing_prewarm',
+                name='Briefing Model Pre-warm',
+                replace_existing=True
+            )
+
         if not Config.PRIMARY_ROOM_ID:
             logger.warning(
                 "PRIMARY_ROOM_ID not set. Morning briefing won't be delivered. "
@@ -89,9 +108,64 @@ def setup_scheduler(bot: MemuBot) -> AsyncIOScheduler:
     else:
         logger.info("Morning briefing is disabled (BRIEFING_ENABLED=false)")
 
+    # Keep the model resident between conversations
+    if Config.AI_ENABLED and Config.OLLAMA_KEEPALIVE_INTERVAL > 0:
+        scheduler.add_job(
+            bot.brain.residency.keep_alive_ping,
+            trigger=IntervalTrigger(minutes=Config.OLLAMA_KEEPALIVE_INTERVAL),
+            id='model_keep_alive',
+            name='Model Keep-alive',
+            replace_existing=True
+        )
+
+    # Health-check the inference backends so routing notices outages and recoveries
+    if Config.AI_ENABLED and Config.OLLAMA_EXTERNAL_HOSTS:
+        scheduler.add_job(
+            bot.brain.router.probe_all,
+            trigger=IntervalTrigger(seconds=Config.OLLAMA_PROBE_INTERVAL),
+            id='inference_probe',
+            name='Inference Backend Probe',
+            replace_existing=True
+        )
+
+    # Write recorded LLM calls in batches, and drop old ones nightly
+    if Config.AI_ENABLED and Config.LLM_LEDGER_PERSIST:
+        scheduler.add_job(
+            bot.brain.ledger.flush,
+            trigger=IntervalTrigger(minutes=1),
+            id='llm_ledger_flush',
+            name='LLM Call Ledger Flush',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            bot.brain.ledger.prune,
+            trigger=CronTrigger(hour=3, minute=30),
+            kwargs={'days': Config.LLM_LEDGER_RETENTION_DAYS},
+            id='llm_ledger_prune',
+            name='LLM Call Ledger Prune',
+            replace_existing=True
+        )
+
+    # Embed facts and messages saved since the last run
+    if Config.AI_ENABLED and Config.SEMANTIC_RECALL_ENABLED:
+        scheduler.add_job(
+            bot.semantic.backfill,
+            trigger=IntervalTrigger(minutes=Config.EMBED_BACKFILL_INTERVAL),
+            id='semantic_backfill',
+            name='Semantic Recall Embeddings',
+            replace_existing=True
+        )
+
     return scheduler
 
 
+async def prepare_model(bot: MemuBot):
+    """Pull (if needed) and warm up the models without holding up the bot."""
+    await bot.brain.pull_model_if_needed()
+    if Config.MODEL_WARMUP_ENABLED:
+        await bot.brain.residency.warm_up(reason="startup")
+
+
 async def main():
     """Start the bot and scheduler"""
     logger.info("=== Memu Intelligence Service Starting ===")
@@ -99,6 +173,8 @@ async def main():
     logger.info(f"Bot User: {Config.MATRIX_BOT_USERNAME}")
     logger.info(f"AI Enabled: {Config.AI_ENABLED}")
     logger.info(f"Ollama Host: {Config.OLLAMA_HOST}")
+    if Config.OLLAMA_EXTERNAL_HOSTS:
+        logger.info(f"External Ollama Hosts: {', '.join(Config.OLLAMA_EXTERNAL_HOSTS)}")
     logger.info(f"Timezone: {Config.TIMEZONE}")
 
     if not validate_config():
@@ -115,9 +191,12 @@ async def main():
         scheduler.start()
         logger.info("Scheduler started")
 
+        # Models download in the background; slash commands work meanwhile
+        model_task = asyncio.create_task(prepare_model(bot))
+
         # Start the bot (this blocks until shutdown)
-        await bot.brain.pull_model_if_needed()
         await bot.start()
+        model_task.cancel()
 
     except KeyboardInterrupt:
         logger.info("Received shutdown signal")
@@ -128,6 +207,7 @@ async def main():
         # Clean shutdown
         scheduler.shutdown(wait=False)
         logger.info("Scheduler stopped")
+        await clients.aclose()
         logger.info("=== Memu Intelligence Service Stopped ===")
 
 
@@ -1,15 +1,40 @@
 import logging
 import asyncpg
-import aiohttp
-from typing import List, Dict, Any, Optional
+import json
+import re
+from typing import List, Dict, Any, Callable, Optional
 from datetime import datetime
 from config import Config
+from db_metrics import PoolMetrics
+from http_clients import clients
+from migrator import MigrationRunner
+from semantic_index import fuse
 
 logger = logging.getLogger("memu.memory")
 
+# FROM-clause item binding `q` to a tsquery matching any word of parameter $2:
+# plainto_tsquery ANDs the words, so its '&'s are swapped for '|' (ranking
+# then favours rows matching more of them). Shared by fact and archive search.
+_ANY_WORD_QUERY = "(SELECT replace(plainto_tsquery('english', $2)::text, ' & ', ' | ')::tsquery AS q) AS search"
+
+
 class MemoryStore:
+    # Tables with an embedding column:
+    # source -> (table, key column, text column, key type, newest-first column, extra filter)
+    EMBEDDED = {
+        'facts': ('household_memory', 'id', 'fact', 'int', 'id', ''),
+        # Short chatter ("ok", "lol") and commands aren't worth embedding
+        'chat': ('chat_archive', 'event_id', 'body', 'text', 'origin_ts',
+                 "AND length(body) >= 12 AND body NOT LIKE '/%'"),
+    }
+
     def __init__(self):
         self.pool = None
+        self.metrics = PoolMetrics(slow_query_ms=Config.DB_SLOW_QUERY_MS)
+        # Whether pg_trgm is installed (checked on first recall)
+        self._fuzzy: Optional[bool] = None
+        # Whether the embedding columns exist (checked on first archive edit)
+        self._embeddings: Optional[bool] = None
 
     async def connect(self):
         """Establish database connection pool."""
@@ -19,66 +44,80 @@ class MemoryStore:
                     host=Config.DB_HOST,
                     database=Config.DB_NAME,
                     user=Config.DB_USER,
-                    password=Config.DB_PASSWORD
+                    password=Config.DB_PASSWORD,
+                    min_size=Config.DB_POOL_MIN_SIZE,
+                    max_size=Config.DB_POOL_MAX_SIZE,
+                    max_inactive_connection_lifetime=Config.DB_POOL_MAX_IDLE,
+                    statement_cache_size=Config.DB_STATEMENT_CACHE_SIZE,
+                    command_timeout=Config.DB_COMMAND_TIMEOUT,
+                    server_settings=self._server_settings(),
+                    init=self._init_connection
+                )
+                logger.info(
+                    f"Database connection established (pool {Config.DB_POOL_MIN_SIZE}-{Config.DB_POOL_MAX_SIZE})"
                 )
-                logger.info("Database connection established")
             except Exception as e:
                 logger.error(f"Database connection failed: {e}")
                 raise
 
+    @staticmethod
+    def _server_settings(application_name: str = Config.DB_APPLICATION_NAME) -> Dict[str, str]:
+        """
+        Session settings sent when each connection opens. Unlike SETs issued
+        after connecting, these survive the RESET ALL the pool runs whenever a
+        connection is released.
+        """
+        return {
+            # pgvecto-rs installs its vector type in the "vectors" schema
+            'search_path': '"$user", public, vectors',
+            'application_name': application_name,
+            'statement_timeout': str(int(Config.DB_STATEMENT_TIMEOUT * 1000)),
+        }
+
+    async def _init_connection(self, conn: asyncpg.Connection) -> None:
+        """Pool init hook: report every query on the new connection to the metrics."""
+        conn.add_query_logger(self.metrics.on_query)
+
+    def acquire(self):
+        """A pooled connection, with the wait and usage recorded (see db_metrics.py)."""
+        return self.metrics.acquire(self.pool)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(self.pool)
+
     async def close(self):
         if self.pool:
             await self.pool.close()
 
+    async def listen(self, channel: str, on_notify: Callable[[str], None],
+                     on_lost: Optional[Callable[[], None]] = None) -> asyncpg.Connection:
+        """
+        LISTEN on `channel` over a dedicated connection (pooled connections
+        get reset). `on_notify(payload)` runs for each NOTIFY and `on_lost()`
+        when the connection goes away; close the returned connection to stop.
+        """
+        conn = await asyncpg.connect(
+            host=Config.DB_HOST,
+            database=Config.DB_NAME,
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD,
+            server_settings=self._server_settings(f"{Config.DB_APPLICATION_NAME}-listen")
+        )
+        await conn.add_listener(channel, lambda _conn, _pid, _channel, payload: on_notify(payload))
+        if on_lost is not None:
+            conn.add_termination_listener(lambda _conn: on_lost())
+        return conn
+
     async def init_db(self):
-        """Initialize database tables if they don't exist."""
-        sql = """
-        -- 1. Household Memory (Facts)
-        CREATE TABLE IF NOT EXISTS household_memory (
-            id SERIAL PRIMARY KEY,
-            room_id TEXT NOT NULL,
-            fact TEXT NOT NULL,
-            created_by TEXT NOT NULL,
-            created_at BIGINT NOT NULL
-        );
-        CREATE INDEX IF NOT EXISTS idx_memory_room ON household_memory(room_id);
-        CREATE INDEX IF NOT EXISTS idx_memory_fact ON household_memory(fact);
-
-        -- 2. Shared Lists (Shopping, Todo)
-        CREATE TABLE IF NOT EXISTS shared_lists (
-            id SERIAL PRIMARY KEY,
-            room_id TEXT NOT NULL,
-            item TEXT NOT NULL,
-            added_by TEXT NOT NULL,
-            added_at BIGINT NOT NULL,
-            completed BOOLEAN DEFAULT FALSE,
-            completed_at TIMESTAMP
-        );
-        CREATE INDEX IF NOT EXISTS idx_lists_room ON shared_lists(room_id);
-
-        -- 3. Reminders
-        CREATE TABLE IF NOT EXISTS reminders (
-            id SERIAL PRIMARY KEY,
-            room_id TEXT NOT NULL,
-            user_id TEXT NOT NULL,
-            content TEXT NOT NULL,
-            due_at TIMESTAMP NOT NULL,
-            created_at TIMESTAMP DEFAULT NOW(),
-            processed BOOLEAN DEFAULT FALSE
-        );
-        CREATE INDEX IF NOT EXISTS idx_reminders_due_processed ON reminders(due_at, processed);
-
-        -- 4. Room Settings (AI volume control, per-room preferences)
-        CREATE TABLE IF NOT EXISTS room_settings (
-            room_id TEXT PRIMARY KEY,
-            ai_mode TEXT NOT NULL DEFAULT 'active',
-            updated_at TIMESTAMP DEFAULT NOW()
-        );
         """
+        Bring the schema up to date by applying pending migrations
+        (see migrator.py). When there are none this is a single query.
+        """
+        runner = MigrationRunner(params={'embed_dimensions': int(Config.OLLAMA_EMBED_DIMENSIONS)})
         try:
-            async with self.pool.acquire() as conn:
-                await conn.execute(sql)
-            logger.info("Database tables initialized")
+            async with self.acquire() as conn:
+                applied = await runner.run(conn)
+            logger.info(f"Database schema up to date ({len(applied)} migrations applied)")
         except Exception as e:
             logger.error(f"Failed to initialize database: {e}")
             raise
@@ -87,63 +126,207 @@ class MemoryStore:
     # REMINDERS
     # =========================================================================
 
-    async def add_reminder(self, room_id: str, user_id: str, content: str, due_at: datetime):
-        async with self.pool.acquire() as conn:
-            await conn.execute("""
+    async def add_reminder(self, room_id: str, user_id: str, content: str, due_at: datetime) -> Dict:
+        """Save a reminder; returns the row for the reminder scheduler."""
+        async with self.acquire() as conn:
+            row = await conn.fetchrow("""
                 INSERT INTO reminders (room_id, user_id, content, due_at)
                 VALUES ($1, $2, $3, $4)
+                RETURNING id, room_id, user_id, content, due_at
             """, room_id, user_id, content, due_at)
+            return dict(row)
 
-    async def get_due_reminders(self) -> List[Dict]:
-        async with self.pool.acquire() as conn:
+    async def get_pending_reminders(self) -> List[Dict]:
+        """
+        Every reminder not yet delivered, soonest first. A reminder another
+        worker holds is due again when its lease runs out.
+        """
+        async with self.acquire() as conn:
             rows = await conn.fetch("""
-                SELECT id, room_id, user_id, content
+                SELECT id, room_id, user_id, content,
+                       GREATEST(due_at, COALESCE(claimed_until, due_at)) AS due_at
                 FROM reminders
-                WHERE due_at <= NOW() AND processed = FALSE
+                WHERE processed = FALSE
+                ORDER BY due_at
             """)
             return [dict(r) for r in rows]
 
+    async def claim_due_reminders(self, now: datetime, lease_until: datetime,
+                                  worker: str, limit: int = 20) -> List[Dict]:
+        """
+        Atomically claim up to `limit` due reminders until `lease_until`.
+        Rows locked or leased by another worker are skipped, so each reminder
+        is handed to one worker at a time. Times come from the caller so they
+        compare with due_at on the same clock.
+        """
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                UPDATE reminders
+                SET claimed_until = $2, claimed_by = $3, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM reminders
+                    WHERE processed = FALSE
+                    AND due_at <= $1
+                    AND (claimed_until IS NULL OR claimed_until <= $1)
+                    ORDER BY due_at
+                    LIMIT $4
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, room_id, user_id, content, due_at, attempts
+            """, now, lease_until, worker, limit)
+            return sorted((dict(r) for r in rows), key=lambda r: r['due_at'])
+
     async def mark_reminder_processed(self, reminder_id: int):
-        async with self.pool.acquire() as conn:
-            await conn.execute("UPDATE reminders SET processed = TRUE WHERE id = $1", reminder_id)
+        async with self.acquire() as conn:
+            await conn.execute("""
+                UPDATE reminders
+                SET processed = TRUE, delivered_at = NOW(), claimed_until = NULL
+                WHERE id = $1
+            """, reminder_id)
+
+    async def release_reminder(self, reminder_id: int, retry_at: Optional[datetime], error: str):
+        """
+        Record a failed delivery. The reminder is retried from `retry_at`, or
+        given up on (marked processed, undelivered) when `retry_at` is None.
+        """
+        async with self.acquire() as conn:
+            await conn.execute("""
+                UPDATE reminders
+                SET claimed_until = $2, last_error = $3, processed = ($2 IS NULL)
+                WHERE id = $1
+            """, reminder_id, retry_at, error[:500])
 
     # =========================================================================
     # FACTS (Explicit /remember)
     # =========================================================================
 
     async def remember_fact(self, room_id: str, sender: str, fact: str):
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             ts = int(datetime.now().timestamp() * 1000)
             await conn.execute("""
                 INSERT INTO household_memory (room_id, fact, created_by, created_at)
                 VALUES ($1, $2, $3, $4)
             """, room_id, fact, sender, ts)
 
-    async def recall_facts(self, room_id: str, query: str) -> List[Dict]:
-        """Search explicitly saved facts."""
-        async with self.pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT fact, created_at, created_by
-                FROM household_memory
+    async def recall_facts(self, room_id: str, query: str, limit: int = 5) -> List[Dict]:
+        """
+        Search explicitly saved facts, best match first.
+
+        Any query word may match (stemmed, so "birthdays" finds "birthday");
+        facts matching more of the words rank higher. With pg_trgm, typos
+        and partial words match too.
+        """
+        async with self.acquire() as conn:
+            if self._fuzzy is None:
+                self._fuzzy = bool(await conn.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+                ))
+            if self._fuzzy:
+                rows = await conn.fetch(f"""
+                    SELECT fact, created_at, created_by
+                    FROM household_memory,
+                         {_ANY_WORD_QUERY}
+                    WHERE room_id = $1
+                    AND (fact_tsv @@ q OR fact ILIKE $3 OR $2 <% fact)
+                    ORDER BY ts_rank(fact_tsv, q) + word_similarity($2, fact) DESC, created_at DESC
+                    LIMIT $4
+                """, room_id, query, f'%{query}%', limit)
+            else:
+                rows = await conn.fetch(f"""
+                    SELECT fact, created_at, created_by
+                    FROM household_memory,
+                         {_ANY_WORD_QUERY}
+                    WHERE room_id = $1
+                    AND fact_tsv @@ q
+                    ORDER BY ts_rank(fact_tsv, q) DESC, created_at DESC
+                    LIMIT $3
+                """, room_id, query, limit)
+            return [dict(r) for r in rows]
+
+    # =========================================================================
+    # CHAT ARCHIVE (local copy of room messages)
+    # =========================================================================
+
+    async def archive_messages(self, messages: List[Dict]) -> int:
+        """
+        Store text messages (event_id, room_id, sender, body, timestamp);
+        events already archived are skipped. Returns how many were new.
+        """
+        if not messages:
+            return 0
+        async with self.acquire() as conn:
+            result = await conn.execute("""
+                INSERT INTO chat_archive (event_id, room_id, sender, body, origin_ts)
+                SELECT * FROM unnest($1::text[], $2::text[], $3::text[], $4::text[], $5::bigint[])
+                ON CONFLICT (event_id) DO NOTHING
+            """, [m['event_id'] for m in messages], [m['room_id'] for m in messages],
+                [m['sender'] for m in messages], [m['body'] for m in messages],
+                [m['timestamp'] for m in messages])
+            # asyncpg returns the command tag, e.g. "INSERT 0 12"
+            return int(result.split()[-1]) if result else 0
+
+    async def update_archived_message(self, event_id: str, body: str) -> None:
+        """
+        Apply an edit (m.replace) to an archived message; the backfill re-embeds it.
+        Re-applying an edit already stored (e.g. on a later backfill) is a no-op.
+        """
+        async with self.acquire() as conn:
+            if await self._has_embeddings(conn):
+                await conn.execute(
+                    "UPDATE chat_archive SET body = $2, embedding = NULL "
+                    "WHERE event_id = $1 AND body IS DISTINCT FROM $2", event_id, body
+                )
+            else:
+                await conn.execute(
+                    "UPDATE chat_archive SET body = $2 WHERE event_id = $1 AND body IS DISTINCT FROM $2",
+                    event_id, body
+                )
+
+    async def search_archive(self, room_id: str, query: str, limit: int = 10) -> List[Dict]:
+        """Full-text search of the room's archived messages, best match first."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT sender, body, origin_ts AS timestamp, event_id, 'chat' AS source
+                FROM chat_archive,
+                     {_ANY_WORD_QUERY}
                 WHERE room_id = $1
-                AND fact ILIKE $2
-                ORDER BY created_at DESC
-                LIMIT 5
-            """, room_id, f'%{query}%')
+                AND body_tsv @@ q
+                ORDER BY ts_rank(body_tsv, q) DESC, origin_ts DESC
+                LIMIT $3
+            """, room_id, query, limit)
             return [dict(r) for r in rows]
 
+    async def get_recent_messages(self, room_id: str, limit: int = 50) -> List[Dict]:
+        """The room's latest archived messages, oldest first."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT sender, body, origin_ts AS timestamp, event_id
+                FROM chat_archive
+                WHERE room_id = $1
+                ORDER BY origin_ts DESC
+                LIMIT $2
+            """, room_id, limit)
+            return [dict(r) for r in reversed(rows)]
+
     # =========================================================================
     # MATRIX CHAT HISTORY SEARCH (NEW)
     # =========================================================================
 
     async def search_chat_history(self, room_id: str, query: str, limit: int = 10) -> List[Dict]:
         """
-        Search Matrix chat history using Synapse's search API.
+        Search chat history: the local archive when CHAT_ARCHIVE_ENABLED,
+        otherwise Synapse's search API.
         This searches actual conversation messages, not just /remember facts.
         
         Uses the Matrix Client-Server API:
         POST /_matrix/client/v3/search
         """
+        if Config.CHAT_ARCHIVE_ENABLED:
+            try:
+                return await self.search_archive(room_id, query, limit)
+            except Exception as e:
+                logger.error(f"Chat archive search failed, asking Synapse instead: {e}")
+
         if not Config.MATRIX_BOT_TOKEN:
             logger.warning("No bot token configured, cannot search chat history")
             return []
@@ -174,19 +357,16 @@ class MemoryStore:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(search_url, json=search_body, headers=headers, timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return self._parse_matrix_search_results(data, limit)
-                    elif resp.status == 404:
-                        # Search endpoint might not be available, try fallback
-                        logger.info("Matrix search API not available, using message fetch fallback")
-                        return await self._fallback_message_search(room_id, query, limit)
-                    else:
-                        error_text = await resp.text()
-                        logger.error(f"Matrix search failed ({resp.status}): {error_text}")
-                        return []
+            resp = await clients.get('matrix').post(search_url, json=search_body, headers=headers)
+            if resp.status_code == 200:
+                return self._parse_matrix_search_results(resp.json(), limit)
+            elif resp.status_code == 404:
+                # Search endpoint might not be available, try fallback
+                logger.info("Matrix search API not available, using message fetch fallback")
+                return await self._fallback_message_search(room_id, query, limit)
+            else:
+                logger.error(f"Matrix search failed ({resp.status_code}): {resp.text}")
+                return []
         except Exception as e:
             logger.error(f"Matrix search error: {e}")
             return []
@@ -234,14 +414,12 @@ class MemoryStore:
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(messages_url, params=params, headers=headers, timeout=10) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        return self._local_search_messages(data.get("chunk", []), query, limit)
-                    else:
-                        logger.error(f"Message fetch failed ({resp.status})")
-                        return []
+            resp = await clients.get('matrix').get(messages_url, params=params, headers=headers)
+            if resp.status_code == 200:
+                return self._local_search_messages(resp.json().get("chunk", []), query, limit)
+            else:
+                logger.error(f"Message fetch failed ({resp.status_code})")
+                return []
         except Exception as e:
             logger.error(f"Message fetch error: {e}")
             return []
@@ -271,16 +449,29 @@ class MemoryStore:
         
         return results
 
-    async def unified_recall(self, room_id: str, query: str) -> Dict[str, List[Dict]]:
+    async def unified_recall(self, room_id: str, query: str,
+                             query_vector: Optional[str] = None) -> Dict[str, List[Dict]]:
         """
         Unified recall: searches both saved facts AND chat history.
         Returns results grouped by source.
+
+        With `query_vector` (see SemanticIndex.query_vector) keyword and
+        nearest-neighbour matches are merged by reciprocal rank fusion.
         """
         # Search saved facts (explicit /remember)
         facts = await self.recall_facts(room_id, query)
         
         # Search chat history (actual conversations)
         chat_results = await self.search_chat_history(room_id, query, limit=5)
+
+        if query_vector is not None:
+            try:
+                facts = fuse(facts, await self.vector_search('facts', room_id, query_vector), key='fact')
+                chat_results = fuse(
+                    chat_results, await self.vector_search('chat', room_id, query_vector), key='event_id'
+                )
+            except Exception as e:
+                logger.warning(f"Vector search failed, keyword results only: {e}")
         
         return {
             "facts": facts,
@@ -293,7 +484,7 @@ class MemoryStore:
 
     async def add_to_list(self, room_id: str, sender: str, items: List[str]):
         ts = int(datetime.now().timestamp() * 1000)
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             async with conn.transaction():
                 for item in items:
                     if item.strip():
@@ -304,7 +495,7 @@ class MemoryStore:
                         """, room_id, item.strip(), sender, ts)
 
     async def get_list(self, room_id: str) -> List[Dict]:
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             rows = await conn.fetch("""
                 SELECT item, added_by, added_at, completed
                 FROM shared_lists
@@ -314,7 +505,7 @@ class MemoryStore:
             return [dict(r) for r in rows]
 
     async def mark_item_done(self, room_id: str, item_name: str) -> Optional[str]:
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             row = await conn.fetchrow("""
                 UPDATE shared_lists
                 SET completed = true, completed_at = NOW()
@@ -331,7 +522,7 @@ class MemoryStore:
 
     async def get_room_ai_mode(self, room_id: str) -> str:
         """Get the AI mode for a room. Returns 'active', 'quiet', or 'off'."""
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             row = await conn.fetchrow(
                 "SELECT ai_mode FROM room_settings WHERE room_id = $1",
                 room_id
@@ -340,10 +531,245 @@ class MemoryStore:
 
     async def set_room_ai_mode(self, room_id: str, mode: str) -> None:
         """Set the AI mode for a room. Valid modes: 'active', 'quiet', 'off'."""
-        async with self.pool.acquire() as conn:
+        async with self.acquire() as conn:
             await conn.execute("""
                 INSERT INTO room_settings (room_id, ai_mode, updated_at)
                 VALUES ($1, $2, NOW())
                 ON CONFLICT (room_id) DO UPDATE
                 SET ai_mode = $2, updated_at = NOW()
             """, room_id, mode)
+
+    # =========================================================================
+    # LLM RESPONSE CACHE
+    # =========================================================================
+
+    async def get_cached_response(self, cache_key: str, max_age_seconds: int) -> Optional[str]:
+        """Return a cached LLM response if it is younger than max_age_seconds."""
+        async with self.acquire() as conn:
+            return await conn.fetchval("""
+                SELECT response FROM llm_cache
+                WHERE cache_key = $1
+                AND created_at > NOW() - make_interval(secs => $2)
+            """, cache_key, max_age_seconds)
+
+    async def put_cached_response(self, cache_key: str, model: str, response: str) -> None:
+        async with self.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO llm_cache (cache_key, model, response, created_at)
+                VALUES ($1, $2, $3, NOW())
+                ON CONFLICT (cache_key) DO UPDATE
+                SET response = $3, model = $2, created_at = NOW()
+            """, cache_key, model, response)
+
+    async def prune_llm_cache(self, models: List[str]) -> int:
+        """Delete cached responses produced by any model not in `models`."""
+        async with self.acquire() as conn:
+            result = await conn.execute("DELETE FROM llm_cache WHERE NOT (model = ANY($1::text[]))", models)
+            # asyncpg returns the command tag, e.g. "DELETE 12"
+            return int(result.split()[-1]) if result else 0
+
+    # =========================================================================
+    # MODEL BENCHMARKS
+    # =========================================================================
+
+    async def record_model_benchmark(self, run_id: str, result: Dict[str, Any]) -> None:
+        async with self.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO model_benchmarks
+                    (run_id, model, cases, accuracy, task_accuracy, tokens_per_s, p50_ms, p95_ms, recommended)
+                VALUES ($1, $2, $3, $4, $5::jsonb, $6, $7, $8, $9)
+            """, run_id, result['model'], result['cases'], result['accuracy'],
+                json.dumps(result.get('task_accuracy', {})), result.get('tokens_per_s'),
+                result.get('p50_ms'), result.get('p95_ms'), result.get('recommended', False))
+
+    async def get_latest_benchmarks(self) -> List[Dict]:
+        """Results of the most recent benchmark run, fastest first."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT model, cases, accuracy, task_accuracy, tokens_per_s, p50_ms, p95_ms,
+                       recommended, created_at
+                FROM model_benchmarks
+                WHERE run_id = (SELECT run_id FROM model_benchmarks ORDER BY created_at DESC LIMIT 1)
+                ORDER BY p50_ms
+            """)
+            return [dict(r) for r in rows]
+
+    # =========================================================================
+    # LLM CALL LEDGER
+    # =========================================================================
+
+    async def record_llm_calls(self, calls: List[Dict[str, Any]]) -> None:
+        async with self.acquire() as conn:
+            await conn.executemany("""
+                INSERT INTO llm_calls
+                    (task, model, priority, backend, outcome, queue_wait_ms, total_ms, load_ms,
+                     prompt_tokens, prompt_eval_ms, eval_tokens, eval_ms, created_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+            """, [
+                (c['task'], c['model'], c['priority'], c['backend'], c['outcome'], c['queue_wait_ms'],
+                 c['total_ms'], c['load_ms'], c['prompt_tokens'], c['prompt_eval_ms'], c['eval_tokens'],
+                 c['eval_ms'], c['created_at'])
+                for c in calls
+            ])
+
+    async def get_llm_call_stats(self, hours: int = 24) -> List[Dict]:
+        """Per-task latency percentiles, tokens/s and averages over the last `hours`."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT task,
+                       COUNT(*) AS calls,
+                       COUNT(*) FILTER (WHERE outcome <> 'ok') AS failures,
+                       COALESCE(ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY total_ms)), 0)::int AS p50_ms,
+                       COALESCE(ROUND(percentile_cont(0.95) WITHIN GROUP (ORDER BY total_ms)), 0)::int AS p95_ms,
+                       COALESCE(ROUND((SUM(eval_tokens) * 1000.0 / NULLIF(SUM(eval_ms), 0))::numeric, 1), 0)::float
+                           AS tokens_per_s,
+                       COALESCE(ROUND(AVG(prompt_tokens)), 0)::int AS avg_prompt_tokens,
+                       COALESCE(ROUND(AVG(queue_wait_ms)), 0)::int AS avg_queue_wait_ms
+                FROM llm_calls
+                WHERE created_at > NOW() - make_interval(hours => $1)
+                GROUP BY task
+                ORDER BY SUM(total_ms) DESC NULLS LAST
+            """, hours)
+            return [dict(r) for r in rows]
+
+    async def prune_llm_calls(self, days: int) -> int:
+        """Delete call records older than `days`."""
+        async with self.acquire() as conn:
+            result = await conn.execute(
+                "DELETE FROM llm_calls WHERE created_at < NOW() - make_interval(days => $1)", days
+            )
+            return int(result.split()[-1]) if result else 0
+
+    # =========================================================================
+    # EMBEDDINGS (semantic recall)
+    # =========================================================================
+
+    async def embedding_dimensions(self) -> Dict[str, int]:
+        """Size of each embedding column (table -> dimensions); empty without pgvecto-rs."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT c.relname AS table_name, format_type(a.atttypid, a.atttypmod) AS type
+                FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid
+                WHERE c.relname = ANY($1::text[]) AND a.attname = 'embedding' AND NOT a.attisdropped
+            """, [t[0] for t in self.EMBEDDED.values()])
+        dims = {}
+        for r in rows:
+            match = re.search(r'\((\d+)\)', r['type'])
+            dims[r['table_name']] = int(match.group(1)) if match else 0
+        return dims
+
+    async def _has_embeddings(self, conn) -> bool:
+        """Whether init_db could add the embedding columns (pgvecto-rs installed; checked once)."""
+        if self._embeddings is None:
+            self._embeddings = bool(await conn.fetchval("""
+                SELECT EXISTS (
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'chat_archive' AND column_name = 'embedding'
+                )
+            """))
+        return self._embeddings
+
+    async def get_unembedded(self, source: str, limit: int) -> List[Dict]:
+        """Rows of `source` still waiting for an embedding, newest first, as {key, text}."""
+        table, key, text, _, newest, extra = self.EMBEDDED[source]
+        async with self.acquire() as conn:
+            # Served by the partial idx_*_unembedded indexes (migration 0010)
+            rows = await conn.fetch(f"""
+                SELECT {key} AS key, {text} AS text
+                FROM {table}
+                WHERE embedding IS NULL {extra}
+                ORDER BY {newest} DESC
+                LIMIT $1
+            """, limit)
+            return [dict(r) for r in rows]
+
+    async def set_embeddings(self, source: str, keys: List[Any], vectors: List[str]) -> None:
+        """Store embeddings (pgvector text form) for the given row keys."""
+        table, key, _, key_type, _, _ = self.EMBEDDED[source]
+        async with self.acquire() as conn:
+            await conn.execute(f"""
+                UPDATE {table} AS t
+                SET embedding = v.embedding::vector
+                FROM unnest($1::{key_type}[], $2::text[]) AS v(key, embedding)
+                WHERE t.{key} = v.key
+            """, keys, vectors)
+
+    async def vector_search(self, source: str, room_id: str, query_vector: str, limit: int = 5) -> List[Dict]:
+        """Nearest facts/messages in the room by cosine distance, within SEMANTIC_MAX_DISTANCE."""
+        if source == 'facts':
+            columns = "fact, created_at, created_by"
+        else:
+            columns = "sender, body, origin_ts AS timestamp, event_id, 'chat' AS source"
+        table = self.EMBEDDED[source][0]
+        async with self.acquire() as conn:
+            # Order by the operator itself so the HNSW index is used; filter by distance after
+            rows = await conn.fetch(f"""
+                SELECT * FROM (
+                    SELECT {columns}, embedding <=> $2::text::vector AS distance
+                    FROM {table}
+                    WHERE room_id = $1 AND embedding IS NOT NULL
+                    ORDER BY embedding <=> $2::text::vector
+                    LIMIT $3
+                ) nearest
+                WHERE distance <= $4
+            """, room_id, query_vector, limit, Config.SEMANTIC_MAX_DISTANCE)
+            return [{k: v for k, v in dict(r).items() if k != 'distance'} for r in rows]
+
+    # =========================================================================
+    # BACKUP HISTORY (written by scripts/backup-notify.sh)
+    # =========================================================================
+
+    async def record_backup(self, filename: str, size_bytes: int, status: str,
+                            duration_seconds: Optional[int] = None, error: Optional[str] = None):
+        async with self.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO backup_history (filename, size_bytes, status, duration_seconds, error)
+                VALUES ($1, $2, $3, $4, $5)
+            """, filename, size_bytes, status, duration_seconds, error)
+
+    async def get_latest_backup(self) -> Optional[Dict]:
+        async with self.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT id, filename, size_bytes, status, error, duration_seconds,
+                       usb_copied_at, notification_sent, created_at
+                FROM backup_history
+                ORDER BY created_at DESC
+                LIMIT 1
+            """)
+            return dict(row) if row else None
+
+    async def get_backup_count(self) -> int:
+        """Number of successful backups."""
+        async with self.acquire() as conn:
+            return await conn.fetchval("SELECT COUNT(*) FROM backup_history WHERE status = 'success'") or 0
+
+    async def get_total_backup_size(self) -> int:
+        """Total size of successful backups, in bytes."""
+        async with self.acquire() as conn:
+            total = await conn.fetchval(
+                "SELECT SUM(size_bytes) FROM backup_history WHERE status = 'success'"
+            )
+            return int(total) if total else 0
+
+    async def mark_usb_copied(self, backup_id: int):
+        async with self.acquire() as conn:
+            await conn.execute("UPDATE backup_history SET usb_copied_at = NOW() WHERE id = $1", backup_id)
+
+    async def get_unnotified_failures(self) -> List[Dict]:
+        """Failed backups nobody has been told about yet, oldest first."""
+        async with self.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT id, filename, error, created_at
+                FROM backup_history
+                WHERE status = 'failed' AND notification_sent = FALSE
+                ORDER BY created_at
+            """)
+            return [dict(r) for r in rows]
+
+    async def mark_notification_sent(self, backup_id: int):
+        async with self.acquire() as conn:
+            await conn.execute("UPDATE backup_history SET notification_sent = TRUE WHERE id = $1", backup_id)
+
+    async def get_last_usb_backup_time(self) -> Optional[datetime]:
+        async with self.acquire() as conn:
+            return await conn.fetchval("SELECT MAX(usb_copied_at) FROM backup_history")
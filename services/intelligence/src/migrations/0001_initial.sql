@@ -1,16 +1,11 @@
--- Memu Memory Initialization
--- This script creates the tables required for the Intelligence Service.
--- It is designed to be run against the database used by the Intelligence Service.
-
 -- 1. Household Memory (Facts)
 CREATE TABLE IF NOT EXISTS household_memory (
     id SERIAL PRIMARY KEY,
     room_id TEXT NOT NULL,
     fact TEXT NOT NULL,
     created_by TEXT NOT NULL,
-    created_at BIGINT NOT NULL -- Timestamp in milliseconds
+    created_at BIGINT NOT NULL
 );
-
 CREATE INDEX IF NOT EXISTS idx_memory_room ON household_memory(room_id);
 CREATE INDEX IF NOT EXISTS idx_memory_fact ON household_memory(fact);
 
@@ -24,7 +19,6 @@ CREATE TABLE IF NOT EXISTS shared_lists (
     completed BOOLEAN DEFAULT FALSE,
     completed_at TIMESTAMP
 );
-
 CREATE INDEX IF NOT EXISTS idx_lists_room ON shared_lists(room_id);
 
 -- 3. Reminders
@@ -37,5 +31,11 @@ CREATE TABLE IF NOT EXISTS reminders (
     created_at TIMESTAMP DEFAULT NOW(),
     processed BOOLEAN DEFAULT FALSE
 );
-
 CREATE INDEX IF NOT EXISTS idx_reminders_due_processed ON reminders(due_at, processed);
+
+-- 4. Room Settings (AI volume control, per-room preferences)
+CREATE TABLE IF NOT EXISTS room_settings (
+    room_id TEXT PRIMARY KEY,
+    ai_mode TEXT NOT NULL DEFAULT 'active',
+    updated_at TIMESTAMP DEFAULT NOW()
+);
@@ -0,0 +1,7 @@
+-- LLM Response Cache (deterministic intent/extraction results)
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
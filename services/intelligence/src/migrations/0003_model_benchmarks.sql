@@ -0,0 +1,15 @@
+-- Model Benchmarks (/benchmark runs, shown on the admin dashboard)
+CREATE TABLE IF NOT EXISTS model_benchmarks (
+    id SERIAL PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cases INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    task_accuracy JSONB,
+    tokens_per_s REAL,
+    p50_ms INTEGER,
+    p95_ms INTEGER,
+    recommended BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_model_benchmarks_created ON model_benchmarks(created_at DESC);
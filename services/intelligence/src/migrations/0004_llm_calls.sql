@@ -0,0 +1,18 @@
+-- LLM Call Ledger (one row per Ollama generation)
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id BIGSERIAL PRIMARY KEY,
+    task TEXT NOT NULL,
+    model TEXT NOT NULL,
+    priority TEXT,
+    backend TEXT,
+    outcome TEXT NOT NULL,
+    queue_wait_ms INTEGER,
+    total_ms INTEGER,
+    load_ms INTEGER,
+    prompt_tokens INTEGER,
+    prompt_eval_ms INTEGER,
+    eval_tokens INTEGER,
+    eval_ms INTEGER,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_created ON llm_calls(created_at);
@@ -0,0 +1,27 @@
+-- Full-text search: fact_tsv is kept in sync by trigger and GIN-indexed
+ALTER TABLE household_memory ADD COLUMN IF NOT EXISTS fact_tsv tsvector;
+CREATE OR REPLACE FUNCTION household_memory_tsv() RETURNS trigger AS $$
+BEGIN
+    NEW.fact_tsv := to_tsvector('english', NEW.fact);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS trg_household_memory_tsv ON household_memory;
+CREATE TRIGGER trg_household_memory_tsv
+    BEFORE INSERT OR UPDATE OF fact ON household_memory
+    FOR EACH ROW EXECUTE FUNCTION household_memory_tsv();
+UPDATE household_memory SET fact_tsv = to_tsvector('english', fact) WHERE fact_tsv IS NULL;
+CREATE INDEX IF NOT EXISTS idx_memory_fact_tsv ON household_memory USING GIN(fact_tsv);
+CREATE INDEX IF NOT EXISTS idx_memory_room_created ON household_memory(room_id, created_at DESC);
+-- A B-tree on the whole fact can't serve substring or word searches
+DROP INDEX IF EXISTS idx_memory_fact;
+
+-- Fuzzy matching (typos, partial words) when pg_trgm can be installed
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS idx_memory_fact_trgm ON household_memory USING GIN(fact gin_trgm_ops);
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'pg_trgm unavailable, fuzzy fact search disabled: %', SQLERRM;
+END
+$$;
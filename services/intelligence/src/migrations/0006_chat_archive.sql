@@ -0,0 +1,21 @@
+-- Chat Archive (every text message the bot sees, for local search/summaries)
+CREATE TABLE IF NOT EXISTS chat_archive (
+    event_id TEXT PRIMARY KEY,
+    room_id TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    body TEXT NOT NULL,
+    origin_ts BIGINT NOT NULL,
+    body_tsv tsvector
+);
+CREATE OR REPLACE FUNCTION chat_archive_tsv() RETURNS trigger AS $$
+BEGIN
+    NEW.body_tsv := to_tsvector('english', NEW.body);
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS trg_chat_archive_tsv ON chat_archive;
+CREATE TRIGGER trg_chat_archive_tsv
+    BEFORE INSERT OR UPDATE OF body ON chat_archive
+    FOR EACH ROW EXECUTE FUNCTION chat_archive_tsv();
+CREATE INDEX IF NOT EXISTS idx_chat_archive_tsv ON chat_archive USING GIN(body_tsv);
+CREATE INDEX IF NOT EXISTS idx_chat_archive_room_ts ON chat_archive(room_id, origin_ts DESC);
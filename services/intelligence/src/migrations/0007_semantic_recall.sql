@@ -0,0 +1,16 @@
+-- Semantic recall (pgvecto-rs): embeddings next to facts and chat.
+-- Skipped with a notice where the extension isn't available.
+-- The vector size is OLLAMA_EMBED_DIMENSIONS at the time this migration is applied.
+DO $vec$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS vectors;
+    ALTER TABLE household_memory ADD COLUMN IF NOT EXISTS embedding vector({{embed_dimensions}});
+    ALTER TABLE chat_archive ADD COLUMN IF NOT EXISTS embedding vector({{embed_dimensions}});
+    CREATE INDEX IF NOT EXISTS idx_memory_embedding ON household_memory
+        USING vectors (embedding vector_cos_ops) WITH (options = $opt$[indexing.hnsw]$opt$);
+    CREATE INDEX IF NOT EXISTS idx_chat_archive_embedding ON chat_archive
+        USING vectors (embedding vector_cos_ops) WITH (options = $opt$[indexing.hnsw]$opt$);
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'pgvecto-rs unavailable, semantic recall disabled: %', SQLERRM;
+END
+$vec$;
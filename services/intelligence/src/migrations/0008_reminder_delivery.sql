@@ -0,0 +1,20 @@
+-- Delivery bookkeeping: a worker claims due reminders for a lease before sending
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0;
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMP;
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claimed_by TEXT;
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS delivered_at TIMESTAMP;
+ALTER TABLE reminders ADD COLUMN IF NOT EXISTS last_error TEXT;
+-- Only pending reminders are ever looked up, so the index skips delivered ones
+CREATE INDEX IF NOT EXISTS idx_reminders_pending ON reminders(due_at) WHERE processed = FALSE;
+DROP INDEX IF EXISTS idx_reminders_due_processed;
+-- Tell listening schedulers (see reminder_scheduler.py) about new reminders
+CREATE OR REPLACE FUNCTION reminders_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('reminders_changed', NEW.id::text);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+DROP TRIGGER IF EXISTS trg_reminders_notify ON reminders;
+CREATE TRIGGER trg_reminders_notify
+    AFTER INSERT ON reminders
+    FOR EACH ROW EXECUTE FUNCTION reminders_notify();
@@ -0,0 +1,13 @@
+-- Backup History (written by scripts/backup-notify.sh, read by BackupManager)
+CREATE TABLE IF NOT EXISTS backup_history (
+    id SERIAL PRIMARY KEY,
+    filename TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    status TEXT NOT NULL,  -- 'success', 'failed', 'in_progress'
+    error TEXT,
+    duration_seconds INT,
+    usb_copied_at TIMESTAMP,
+    notification_sent BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_backup_created ON backup_history(created_at DESC);
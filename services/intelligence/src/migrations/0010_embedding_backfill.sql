@@ -0,0 +1,16 @@
+-- Backfill support for semantic recall: find the newest unembedded rows
+-- without scanning the whole table. Skipped where 0007 found no pgvecto-rs.
+DO $idx$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'household_memory' AND column_name = 'embedding') THEN
+        CREATE INDEX IF NOT EXISTS idx_memory_unembedded
+            ON household_memory (id DESC) WHERE embedding IS NULL;
+    END IF;
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'chat_archive' AND column_name = 'embedding') THEN
+        CREATE INDEX IF NOT EXISTS idx_chat_archive_unembedded
+            ON chat_archive (origin_ts DESC) WHERE embedding IS NULL;
+    END IF;
+END
+$idx$;
@@ -0,0 +1,152 @@
+"""
+Versioned schema migrations.
+
+Schema changes live in src/migrations as numbered SQL files
+(NNNN_description.sql) and are applied in order, once each, with the
+version, name and a checksum of the file recorded in `schema_migrations`.
+On a normal start the runner reads that table once and finds nothing to
+do. When there are pending migrations it takes a Postgres advisory lock,
+so concurrent starts don't race, re-reads the table, and applies
+everything pending as a single script, which Postgres runs in one
+transaction.
+
+An applied file that has since been edited fails the checksum check and
+stops startup: add a new migration instead of changing an old one.
+Files may use {{placeholders}} filled from `params` at apply time (the
+checksum covers the file as written).
+
+Migrations should stay idempotent (IF NOT EXISTS and friends): databases
+created before this runner existed apply them all once over the schema
+they already have.
+"""
+
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+
+logger = logging.getLogger("memu.migrator")
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# pg_advisory_lock key: "memu" in ASCII
+LOCK_ID = 0x6D656D75
+# Migrations may rewrite or index whole tables; allow them far longer than a query
+TIMEOUT = 3600.0
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMP DEFAULT NOW()
+);
+"""
+
+
+class MigrationError(RuntimeError):
+    """The database schema doesn't match the migration files."""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    def render(self, params: Dict[str, Any]) -> str:
+        sql = self.sql
+        for key, value in params.items():
+            sql = sql.replace('{{' + key + '}}', str(value))
+        return sql
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Migration files in version order; duplicate versions are an error."""
+    migrations: Dict[int, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            logger.warning(f"Ignoring {path.name}: not named NNNN_description.sql")
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Two migrations with version {version}: "
+                                 f"{migrations[version].name} and {match.group(2)}")
+        sql = path.read_text(encoding="utf-8").replace("\r\n", "\n")
+        migrations[version] = Migration(version, match.group(2), sql)
+    return [migrations[v] for v in sorted(migrations)]
+
+
+class MigrationRunner:
+    """Brings a database connection up to the latest migration."""
+
+    def __init__(self, migrations: Optional[List[Migration]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        self.migrations = load_migrations() if migrations is None else migrations
+        self.params = params or {}
+
+    async def applied(self, conn) -> Dict[int, str]:
+        """version -> checksum of everything applied so far (empty on a new database)."""
+        try:
+            rows = await conn.fetch("SELECT version, checksum FROM schema_migrations")
+        except asyncpg.UndefinedTableError:
+            return {}
+        return {r['version']: r['checksum'] for r in rows}
+
+    def pending(self, applied: Dict[int, str]) -> List[Migration]:
+        """Migrations not yet applied; raises if an applied one was edited."""
+        known = {m.version for m in self.migrations}
+        for migration in self.migrations:
+            checksum = applied.get(migration.version)
+            if checksum is not None and checksum != migration.checksum:
+                raise MigrationError(
+                    f"Migration {migration.version}_{migration.name} was changed after being applied"
+                )
+        newer = sorted(v for v in applied if v not in known)
+        if newer:
+            logger.warning(f"Database has migrations this version doesn't know about: {newer}")
+        return [m for m in self.migrations if m.version not in applied]
+
+    def script(self, pending: List[Migration]) -> str:
+        """One script applying `pending` and recording each in schema_migrations."""
+        parts = [CREATE_TABLE]
+        for m in pending:
+            parts.append(f"-- {m.version:04d}_{m.name}\n{m.render(self.params)}")
+            parts.append(
+                "INSERT INTO schema_migrations (version, name, checksum) "
+                f"VALUES ({m.version}, '{m.name}', '{m.checksum}');\n"
+            )
+        return "\n".join(parts)
+
+    async def run(self, conn) -> List[int]:
+        """Apply pending migrations; returns the versions applied."""
+        if not self.pending(await self.applied(conn)):
+            return []
+
+        # Lift the session's statement_timeout for the lock wait and the script
+        # (the pool's RESET ALL restores it when the connection is released)
+        await conn.fetchval("SELECT set_config('statement_timeout', '0', false)")
+        await conn.fetchval("SELECT pg_advisory_lock($1)", LOCK_ID, timeout=TIMEOUT)
+        try:
+            # Another instance may have migrated while we waited for the lock
+            pending = self.pending(await self.applied(conn))
+            if not pending:
+                return []
+            # Without parameters this is sent as one simple query: a single transaction
+            await conn.execute(self.script(pending), timeout=TIMEOUT)
+        finally:
+            await conn.fetchval("SELECT pg_advisory_unlock($1)", LOCK_ID)
+
+        versions = [m.version for m in pending]
+        logger.info(f"Applied migrations: {', '.join(f'{m.version:04d}_{m.name}' for m in pending)}")
+        return versions
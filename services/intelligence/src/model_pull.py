@@ -0,0 +1,123 @@
+"""
+Background model pulls with streamed progress.
+
+A fresh install (or a changed OLLAMA_MODEL) has to download gigabytes before
+the first generation. The pull runs as a background task so the bot can sync
+and answer slash commands meanwhile; progress is tracked from Ollama's
+streamed /api/pull status lines so users can be told how far along it is.
+
+State is per model: only work that needs a model still queued or
+downloading has to wait (is_loading), so fetching e.g. the embedding model
+doesn't hold up chat on an already installed main model.
+"""
+
+import json
+import logging
+from typing import Dict, List, Optional, Set, TYPE_CHECKING
+
+import httpx
+
+from http_clients import clients
+
+if TYPE_CHECKING:
+    from brain import Brain
+
+logger = logging.getLogger("memu.model_pull")
+
+
+class ModelPuller:
+    """Pulls every model the Brain needs and reports progress while it does."""
+
+    def __init__(self, brain: "Brain"):
+        self.brain = brain
+        # Missing models still to be pulled, including the one downloading now
+        self.waiting: Set[str] = set()
+        self.current_model: Optional[str] = None
+        self.status = ""
+        self.failed: List[str] = []
+        # layer digest -> (completed, total) bytes for the model being pulled
+        self._layers: Dict[str, tuple] = {}
+
+    @property
+    def pulling(self) -> bool:
+        """A download is in progress."""
+        return self.current_model is not None
+
+    def is_loading(self, model: Optional[str]) -> bool:
+        """`model` is missing and queued for (or in the middle of) a download."""
+        return model in self.waiting
+
+    @property
+    def progress(self) -> int:
+        """Percent of the current model's layers downloaded so far."""
+        total = sum(t for _, t in self._layers.values())
+        if not total:
+            return 0
+        return int(100 * sum(c for c, _ in self._layers.values()) / total)
+
+    def loading_message(self, model: Optional[str] = None) -> str:
+        if model is None or model == self.current_model:
+            state = f"still loading ({self.progress}%)"
+        else:
+            state = "waiting to download"
+        return (
+            f"⏳ My AI model is {state}. "
+            f"Slash commands like /showlist and /calendar work in the meantime."
+        )
+
+    async def run(self) -> bool:
+        """Pull any missing models. Returns True if all of them are ready."""
+        ready = True
+        models = self.brain.active_models()
+        if self.brain.embed_model and self.brain.embed_model not in models:
+            models = models + [self.brain.embed_model]
+        missing = []
+        for model in models:
+            if await self.brain.is_model_available(model):
+                logger.info(f"Model {model} is available")
+            else:
+                missing.append(model)
+        self.waiting.update(missing)
+        for model in missing:
+            if not await self._pull(model):
+                self.failed.append(model)
+                ready = False
+        return ready
+
+    async def _pull(self, model: str) -> bool:
+        logger.info(f"Pulling model {model}...")
+        self.current_model = model
+        self._layers = {}
+        last_logged = -10
+        try:
+            # No read timeout: large layers can go quiet for a long time between status lines
+            async with clients.get('ollama').stream(
+                "POST",
+                f"{self.brain.ollama_url}/api/pull",
+                json={"name": model, "stream": True},
+                timeout=httpx.Timeout(30, read=None)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    update = json.loads(line)
+                    if update.get('error'):
+                        raise RuntimeError(update['error'])
+                    self.status = update.get('status', '')
+                    if update.get('digest') and update.get('total'):
+                        self._layers[update['digest']] = (update.get('completed', 0), update['total'])
+                    if self.progress >= last_logged + 10:
+                        last_logged = self.progress
+                        logger.info(f"Pulling {model}: {self.progress}% ({self.status})")
+                    if self.status == 'success':
+                        logger.info(f"Successfully pulled model {model}")
+                        return True
+            logger.error(f"Pull of {model} ended without success (last status: {self.status})")
+        except Exception as e:
+            logger.error(f"Error pulling model {model}: {e}")
+        finally:
+            # A failed pull isn't retried; let calls reach Ollama and fail there
+            self.waiting.discard(model)
+            self.current_model = None
+        return False
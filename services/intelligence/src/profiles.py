@@ -0,0 +1,147 @@
+"""
+Generation profiles for every Brain task.
+
+A profile caps how much a task may generate and, for JSON tasks, hands
+Ollama a JSON schema as the structured-output `format`. The model is then
+grammar-constrained to emit exactly that object and stops as soon as it is
+closed, instead of rambling until `_extract_json` has to dig the answer out.
+
+Profiles are keyed by prompt template name (see prompts.py) and can be
+overridden with GENERATION_PROFILES, a JSON object such as
+    {"briefing": {"num_predict": 600}, "chat": {"temperature": 0.9}}
+
+num_ctx is left to Ollama unless set: Ollama reloads the model whenever a
+request asks for a different context size than the loaded one, so per-task
+values only make sense for tasks that run on their own model.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional, Union
+
+from config import Config
+
+logger = logging.getLogger("memu.profiles")
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Ollama generation options for one task."""
+    name: str
+    temperature: float = 0.7
+    num_predict: Optional[int] = None   # max tokens to generate
+    num_ctx: Optional[int] = None       # context window; None = OLLAMA_NUM_CTX / Ollama default
+    schema: Optional[Dict[str, Any]] = None  # JSON schema for structured output
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {'temperature': self.temperature}
+        if self.num_predict:
+            options['num_predict'] = self.num_predict
+        num_ctx = self.num_ctx or Config.OLLAMA_NUM_CTX
+        if num_ctx:
+            options['num_ctx'] = num_ctx
+        return options
+
+    def format(self, json_mode: bool) -> Optional[Union[str, Dict[str, Any]]]:
+        """Ollama `format` value: the schema when structured output is on, else plain JSON mode."""
+        if not json_mode:
+            return None
+        if self.schema and Config.STRUCTURED_OUTPUT_ENABLED:
+            return self.schema
+        return 'json'
+
+
+def _object(properties: Dict[str, Any], required: list) -> Dict[str, Any]:
+    return {'type': 'object', 'properties': properties, 'required': required}
+
+
+_STRING = {'type': 'string'}
+_NULLABLE = {'type': ['string', 'null']}
+
+INTENT_SCHEMA = _object({
+    'intent': {
+        'type': 'string',
+        'enum': ['CALENDAR', 'SCHEDULE', 'LIST_ADD', 'LIST_SHOW', 'REMINDER', 'RECALL',
+                 'REMEMBER', 'SUMMARIZE', 'BRIEFING', 'CHAT', 'NONE'],
+    },
+    'content': _STRING,
+    'slots': {
+        'type': 'object',
+        'properties': {
+            'task': _NULLABLE,
+            'date': _NULLABLE,
+            'time': _NULLABLE,
+            'duration': _NULLABLE,
+            'location': _NULLABLE,
+        },
+    },
+}, ['intent', 'content', 'slots'])
+
+INTENT_BATCH_SCHEMA = _object({
+    'results': {
+        'type': 'array',
+        'items': _object(
+            {'id': {'type': 'integer'}, **INTENT_SCHEMA['properties']},
+            ['id'] + INTENT_SCHEMA['required']
+        ),
+    },
+}, ['results'])
+
+REMINDER_SCHEMA = _object({'task': _STRING, 'time': _STRING}, ['task', 'time'])
+
+CALENDAR_EVENT_SCHEMA = _object({
+    'summary': _STRING,
+    'date': _NULLABLE,
+    'time': _NULLABLE,
+    'duration': _NULLABLE,
+    'location': _NULLABLE,
+}, ['summary', 'date', 'time', 'duration', 'location'])
+
+DEFAULT = GenerationProfile(name="default")
+
+_BUILTIN = (
+    GenerationProfile(name="intent", temperature=0.0, num_predict=160, schema=INTENT_SCHEMA),
+    # num_predict is scaled by batch size at call time
+    GenerationProfile(name="intent_batch", temperature=0.0, num_predict=160, schema=INTENT_BATCH_SCHEMA),
+    GenerationProfile(name="extract_reminder", temperature=0.0, num_predict=64, schema=REMINDER_SCHEMA),
+    GenerationProfile(name="extract_calendar_event", temperature=0.0, num_predict=128,
+                      schema=CALENDAR_EVENT_SCHEMA),
+    GenerationProfile(name="summarize_chat", temperature=0.3, num_predict=200),
+    GenerationProfile(name="summarize_recall", temperature=0.3, num_predict=200),
+    GenerationProfile(name="synthesise_cross_silo", temperature=0.5, num_predict=300),
+    GenerationProfile(name="chat", temperature=0.7, num_predict=256),
+    # "under 200 words" plus headline bullets
+    GenerationProfile(name="briefing", temperature=0.5, num_predict=450),
+)
+
+
+def _apply_overrides(profiles: Dict[str, GenerationProfile], raw: str) -> Dict[str, GenerationProfile]:
+    if not raw.strip():
+        return profiles
+    try:
+        overrides = json.loads(raw)
+    except json.JSONDecodeError as e:
+        logger.error(f"Ignoring GENERATION_PROFILES, not valid JSON: {e}")
+        return profiles
+
+    allowed = {f.name for f in fields(GenerationProfile)} - {'name'}
+    for task, values in overrides.items():
+        if not isinstance(values, dict):
+            logger.error(f"Ignoring GENERATION_PROFILES entry for {task}: expected an object")
+            continue
+        unknown = set(values) - allowed
+        if unknown:
+            logger.warning(f"Ignoring unknown profile settings for {task}: {', '.join(sorted(unknown))}")
+        base = profiles.get(task, replace(DEFAULT, name=task))
+        profiles[task] = replace(base, **{k: v for k, v in values.items() if k in allowed})
+    return profiles
+
+
+PROFILES: Dict[str, GenerationProfile] = _apply_overrides(
+    {p.name: p for p in _BUILTIN}, Config.GENERATION_PROFILES
+)
+
+
+def get_profile(task: Optional[str]) -> GenerationProfile:
+    return PROFILES.get(task, DEFAULT) if task else DEFAULT
@@ -0,0 +1,190 @@
+"""
+Prompt templates for every Brain task.
+
+Each template keeps its instructions in a fixed system prefix and puts the
+variable user content at the very end. Ollama can then reuse the KV cache
+for the prefix across calls instead of re-evaluating the whole instruction
+block every time, which is the dominant prompt-eval cost on CPU.
+
+Keep the system text byte-for-byte stable: anything interpolated into it
+defeats the prefix cache.
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A task's fixed system prefix plus a format string for the variable tail."""
+    name: str
+    system: str
+    user: str
+
+    def render(self, **values: str) -> str:
+        return self.user.format(**values)
+
+
+INTENT = PromptTemplate(
+    name="intent",
+    system="""Analyze the user's message and determine what they want.
+
+Respond with JSON only:
+{"intent": "CALENDAR", "content": "the relevant extracted text", "slots": {}}
+
+Valid intents:
+- CALENDAR: asking about schedule/events ("what's happening tomorrow?", "any events this week?")
+- SCHEDULE: wanting to ADD an event ("soccer practice Tuesday 5pm", "dentist appointment Friday")
+- LIST_ADD: adding items to shopping list ("we need milk and eggs", "add bread to the list")
+- LIST_SHOW: asking to see the list ("what's on the list?", "show shopping list")
+- REMINDER: setting a reminder ("remind me to call mom", "don't forget to pick up kids")
+- RECALL: searching for information ("what's the WiFi password?", "when is grandma's birthday?")
+- REMEMBER: storing a fact ("the WiFi password is ABC123", "grandma's birthday is March 15")
+- SUMMARIZE: requesting chat summary ("what did I miss?", "summarize today")
+- BRIEFING: requesting a briefing ("give me a briefing", "what's going on today?")
+- CHAT: general conversation that doesn't match above
+- NONE: unclear or irrelevant
+
+"content" = the extracted relevant text.
+- For LIST_ADD: return ONLY the items joined by commas (e.g., "milk, eggs, bread"). DO NOT include words like "added" or "item(s)".
+- For SCHEDULE: return the event details (e.g., "Soccer 5pm").
+- For REMINDER: return the task (e.g., "Call Mom 3pm").
+
+"slots" = details for SCHEDULE and REMINDER only (use {} for other intents):
+{"task": "short event title or what to do", "date": "the date mentioned (e.g., 'Tuesday', 'tomorrow', 'March 15') or null", "time": "the time mentioned (e.g., '5pm', '14:00') or null", "duration": "duration if mentioned (e.g., '1 hour') or null", "location": "location if mentioned or null"}
+
+Respond with JSON only, no explanation. No conversational text.""",
+    user='Message: "{content}"',
+)
+
+INTENT_BATCH = PromptTemplate(
+    name="intent_batch",
+    system=INTENT.system + """
+
+You will be given several numbered messages from different people. Classify each one
+independently and respond with JSON only:
+{"results": [{"id": 1, "intent": "CALENDAR", "content": "...", "slots": {}}, ...]}
+Include exactly one result per message, using the message's number as "id".""",
+    user="""Messages:
+{messages}""",
+)
+
+EXTRACT_REMINDER = PromptTemplate(
+    name="extract_reminder",
+    system="""Extract the task and the time from the user's reminder request.
+Respond ONLY with valid JSON in this format:
+{
+    "task": "what to do",
+    "time": "when to do it"
+}""",
+    user='Request: "{content}"',
+)
+
+EXTRACT_CALENDAR_EVENT = PromptTemplate(
+    name="extract_calendar_event",
+    system="""Extract calendar event details from the user's request.
+
+Respond ONLY with valid JSON in this format:
+{
+    "summary": "short event title",
+    "date": "the date mentioned (e.g., 'Tuesday', 'tomorrow', 'March 15')",
+    "time": "the time mentioned (e.g., '5pm', '14:00', 'noon')",
+    "duration": "duration if mentioned (e.g., '1 hour', '30 minutes'), or null",
+    "location": "location if mentioned, or null"
+}""",
+    user='Request: "{content}"',
+)
+
+SUMMARIZE_CHAT = PromptTemplate(
+    name="summarize_chat",
+    system="""You are a helpful family assistant. Summarize conversations concisely,
+focusing on: decisions made, action items, important information shared, and upcoming plans.
+Keep summaries brief (2-4 sentences) and family-friendly.
+
+Summarize the family chat you are given in 2-3 sentences.
+Focus on: important events, decisions made, upcoming plans.""",
+    user="""{context}
+
+Summary:""",
+)
+
+SUMMARIZE_RECALL = PromptTemplate(
+    name="summarize_recall",
+    system="""You are a helpful family assistant with access to family memories and chat history.
+When asked to summarize search results, extract the most relevant information that answers the query.
+Be concise and direct. If there are contradictions, note the most recent information.
+
+You will be given what was found in saved facts and chat history, followed by what the user asked about.
+Provide a brief, helpful summary (2-4 sentences) answering what the user wanted to know.""",
+    user="""Here's what I found in saved facts and chat history:
+
+{results}
+
+The user asked about: "{query}"
+Summary:""",
+)
+
+SYNTHESISE_CROSS_SILO = PromptTemplate(
+    name="synthesise_cross_silo",
+    system=(
+        "You are the family's Chief of Staff -- an AI that knows the family's chat history, "
+        "calendar, saved facts, and photo library. When given search results from multiple sources, "
+        "synthesise them into a brief, insightful response that connects the dots.\n\n"
+        "Rules:\n"
+        "- Be concise (3-5 sentences max)\n"
+        "- Connect information across sources when possible\n"
+        "- Highlight actionable insights (upcoming deadlines, patterns, suggestions)\n"
+        "- Use a warm, helpful tone\n"
+        "- If results are sparse, say what you found without over-interpreting\n"
+        "- Never invent information not present in the data"
+    ),
+    user="""Here's what I found across their data:
+
+{context}
+
+The family asked: "{query}"
+Synthesise this into a brief, insightful response that connects the dots across these sources:""",
+)
+
+CHAT = PromptTemplate(
+    name="chat",
+    system=(
+        "You are Memu, a helpful and intelligent family assistant. Be concise, capable, and mature.\n"
+        "Respond helpfully and briefly as a family assistant to what the user said."
+    ),
+    user='The user said: "{content}"',
+)
+
+BRIEFING = PromptTemplate(
+    name="briefing",
+    system="""You are a warm Family Chief of Staff writing a concise morning briefing.
+
+Rules:
+- Start with a ONE sentence greeting including the weather (use EXACT data: temperature, description, city).
+- If there are calendar events, list them briefly.
+- If news headlines are provided, list ALL of them as bullet points under "Headlines:". Do NOT skip any.
+- If photo memories are mentioned, include them. If NO photo memories are in the data, do NOT mention photos at all.
+- If there are shopping list items, mention them briefly.
+- Do NOT invent, fabricate, or imagine ANY information not explicitly provided in the data.
+- Do NOT add filler text, lifestyle suggestions, or motivational padding.
+- Keep the entire briefing under 200 words.
+
+Based on the information you are given, write a warm morning briefing.""",
+    user="""{context}
+
+Morning briefing:""",
+)
+
+PROMPTS: Dict[str, PromptTemplate] = {
+    t.name: t for t in (
+        INTENT,
+        INTENT_BATCH,
+        EXTRACT_REMINDER,
+        EXTRACT_CALENDAR_EVENT,
+        SUMMARIZE_CHAT,
+        SUMMARIZE_RECALL,
+        SYNTHESISE_CROSS_SILO,
+        CHAT,
+        BRIEFING,
+    )
+}
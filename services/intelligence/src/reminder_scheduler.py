@@ -0,0 +1,219 @@
+"""
+Event-driven reminder delivery.
+
+Instead of polling the reminders table, pending reminders are held in an
+in-process min-heap ordered by due time and the scheduler sleeps until the
+earliest one. New reminders are pushed in directly by the bot (add) and,
+for rows inserted elsewhere (another replica, the admin dashboard), via
+Postgres LISTEN/NOTIFY on the `reminders_changed` channel. Whenever the
+listening connection drops the heap is reloaded from the database once it
+is back, and a periodic resync (REMINDER_RESYNC_INTERVAL) guards against
+anything missed.
+
+When reminders fall due they are claimed in the database first
+(claim_due_reminders: UPDATE ... FOR UPDATE SKIP LOCKED with a lease), so
+several replicas can run this scheduler without double-sending, and a
+worker that dies mid-send only holds its reminders until the lease ends.
+Claimed reminders are sent concurrently (REMINDER_CONCURRENCY at a time);
+failed sends are retried with exponential backoff up to
+REMINDER_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger("memu.reminder_scheduler")
+
+CHANNEL = 'reminders_changed'
+# Pause before retrying a lost database connection, and the first send retry
+RETRY_DELAY = 30.0
+MAX_RETRY_DELAY = 15 * 60.0
+CLAIM_BATCH = 20
+
+_Entry = Tuple[datetime, int]
+
+
+class ReminderScheduler:
+    """Delivers each pending reminder at its due time via `deliver(reminder)`."""
+
+    def __init__(self, store, deliver: Callable[[Dict[str, Any]], Awaitable[None]],
+                 resync_interval: Optional[float] = None):
+        self.store = store
+        self.deliver = deliver
+        self.resync_interval = resync_interval or Config.REMINDER_RESYNC_INTERVAL
+        self._heap: List[_Entry] = []
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._listener = None
+        self._needs_sync = True
+        self.lease = Config.REMINDER_LEASE
+        self.max_attempts = Config.REMINDER_MAX_ATTEMPTS
+        self._sending = asyncio.Semaphore(max(1, Config.REMINDER_CONCURRENCY))
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.delivered = 0
+        self.failed = 0
+        self.syncs = 0
+
+    # -------------------------------------------------------------------------
+    # Keeping the heap in step with the database
+    # -------------------------------------------------------------------------
+
+    def add(self, reminder: Dict[str, Any]) -> None:
+        """Schedule a reminder (a row with id, room_id, user_id, content, due_at)."""
+        self._pending[reminder['id']] = reminder
+        heapq.heappush(self._heap, (reminder['due_at'], reminder['id']))
+        if self._heap[0][1] == reminder['id']:
+            self._wakeup.set()
+
+    async def sync(self) -> None:
+        """Reload every unprocessed reminder from the database."""
+        rows = await self.store.get_pending_reminders()
+        self._pending = {r['id']: r for r in rows}
+        self._heap = [(r['due_at'], r['id']) for r in rows]
+        heapq.heapify(self._heap)
+        self._needs_sync = False
+        self.syncs += 1
+        logger.debug(f"Reminder heap loaded: {len(rows)} pending")
+
+    def _on_notify(self, payload: str) -> None:
+        try:
+            reminder_id = int(payload)
+        except ValueError:
+            reminder_id = None
+        # Our own inserts are already scheduled; anything else means reload
+        if reminder_id not in self._pending:
+            self._needs_sync = True
+            self._wakeup.set()
+
+    def _on_connection_lost(self) -> None:
+        logger.warning("Reminder LISTEN connection lost; will reconnect and resync")
+        self._listener = None
+        self._needs_sync = True
+        self._wakeup.set()
+
+    async def _ensure_listening(self) -> None:
+        if self._listener is None:
+            self._listener = await self.store.listen(CHANNEL, self._on_notify, self._on_connection_lost)
+            # Anything inserted while we weren't listening is picked up by the resync
+            self._needs_sync = True
+
+    # -------------------------------------------------------------------------
+    # Main loop
+    # -------------------------------------------------------------------------
+
+    def next_due(self) -> Optional[datetime]:
+        """Due time of the earliest pending reminder, skipping stale heap entries."""
+        while self._heap:
+            due_at, reminder_id = self._heap[0]
+            reminder = self._pending.get(reminder_id)
+            if reminder is not None and reminder['due_at'] == due_at:
+                return due_at
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: datetime) -> List[Dict[str, Any]]:
+        due = []
+        while self.next_due() is not None and self._heap[0][0] <= now:
+            _, reminder_id = heapq.heappop(self._heap)
+            due.append(self._pending.pop(reminder_id))
+        return due
+
+    async def run(self) -> None:
+        """Run until cancelled; database errors are retried after RETRY_DELAY."""
+        while True:
+            try:
+                await self._ensure_listening()
+                if self._needs_sync:
+                    await self.sync()
+                await self._sleep_until_due()
+                await self.deliver_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {e}")
+                self._needs_sync = True
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _sleep_until_due(self) -> None:
+        if self._needs_sync:
+            # A notification or reconnect arrived while delivering
+            return
+        timeout = self.resync_interval
+        due_at = self.next_due()
+        if due_at is not None:
+            timeout = min(timeout, max(0.0, (due_at - datetime.now()).total_seconds()))
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            # Periodic safety net in case a notification was missed
+            if due_at is None or timeout >= self.resync_interval:
+                self._needs_sync = True
+
+    async def deliver_due(self) -> None:
+        """Claim everything due (in batches) and send the claimed reminders concurrently."""
+        now = datetime.now()
+        expected = {r['id'] for r in self._pop_due(now)}
+        if not expected:
+            return
+        claimed: List[Dict[str, Any]] = []
+        while True:
+            batch = await self.store.claim_due_reminders(
+                now, now + timedelta(seconds=self.lease), self.worker, CLAIM_BATCH
+            )
+            claimed.extend(batch)
+            if len(batch) < CLAIM_BATCH:
+                break
+        if expected - {r['id'] for r in claimed}:
+            # Held by another worker (or already sent): reload to learn when its lease ends
+            self._needs_sync = True
+        await asyncio.gather(*(self._deliver(r) for r in claimed))
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** max(0, attempts - 1))
+
+    async def _deliver(self, reminder: Dict[str, Any]) -> None:
+        async with self._sending:
+            try:
+                await self.deliver(reminder)
+            except Exception as e:
+                await self._failed(reminder, e)
+                return
+        self.delivered += 1
+        try:
+            await self.store.mark_reminder_processed(reminder['id'])
+        except Exception as e:
+            # It will be sent again once the lease runs out: better twice than never
+            logger.error(f"Sent reminder {reminder['id']} but could not mark it processed: {e}")
+            self._needs_sync = True
+
+    async def _failed(self, reminder: Dict[str, Any], error: Exception) -> None:
+        attempts = reminder.get('attempts') or 1
+        if attempts >= self.max_attempts:
+            self.failed += 1
+            logger.error(f"Giving up on reminder {reminder['id']} after {attempts} attempts: {error}")
+            retry_at = None
+        else:
+            retry_at = datetime.now() + timedelta(seconds=self.retry_delay(attempts))
+            logger.warning(f"Failed to deliver reminder {reminder['id']} (attempt {attempts}), "
+                           f"retrying at {retry_at:%H:%M:%S}: {error}")
+            self.add({**reminder, 'due_at': retry_at})
+        try:
+            await self.store.release_reminder(reminder['id'], retry_at, str(error))
+        except Exception as e:
+            logger.error(f"Could not record failed delivery of reminder {reminder['id']}: {e}")
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            try:
+                await listener.close()
+            except Exception as e:
+                logger.warning(f"Failed to close reminder listener: {e}")
@@ -0,0 +1,99 @@
+"""
+Model residency manager.
+
+Ollama unloads an idle model after its keep_alive expires, and the next
+request pays a multi-second load penalty. This keeps the model resident at
+the moments that matter (startup, just before the morning briefing, during
+the day) and tracks load time against eval time so cold starts are visible.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from config import Config
+from inference_scheduler import Priority
+
+if TYPE_CHECKING:
+    from brain import Brain
+
+logger = logging.getLogger("memu.residency")
+
+# A load_duration above this means the model had to be loaded from disk
+COLD_LOAD_THRESHOLD_S = 0.5
+NS_PER_S = 1_000_000_000
+
+
+class ModelResidency:
+    """Warm-up, keep-alive and cold-start accounting for the Brain's model."""
+
+    def __init__(self, brain: "Brain"):
+        self.brain = brain
+        self.keep_alive = Config.OLLAMA_KEEP_ALIVE
+        self.ping_interval_s = Config.OLLAMA_KEEPALIVE_INTERVAL * 60
+        self.last_used: Optional[float] = None
+        self.requests = 0
+        self.cold_starts = 0
+        self.warmups = 0
+        self.total_load_s = 0.0
+        self.total_eval_s = 0.0
+        self.last_load_s = 0.0
+
+    def observe(self, result: Dict[str, Any]) -> None:
+        """Record timings from a completed Ollama response (durations are in ns)."""
+        load_s = (result.get('load_duration') or 0) / NS_PER_S
+        eval_s = (result.get('eval_duration') or 0) / NS_PER_S
+
+        self.requests += 1
+        self.total_load_s += load_s
+        self.total_eval_s += eval_s
+        self.last_load_s = load_s
+        self.last_used = time.monotonic()
+
+        if load_s > COLD_LOAD_THRESHOLD_S:
+            self.cold_starts += 1
+            logger.info(
+                f"Cold start: {result.get('model', self.brain.model)} took {load_s:.1f}s to load "
+                f"(eval {eval_s:.1f}s)"
+            )
+
+    async def warm_up(self, reason: str = "startup") -> bool:
+        """Run a one-token generation per model so each is loaded before anyone needs it."""
+        if not self.brain.enabled:
+            return False
+
+        started = time.monotonic()
+        response = ""
+        for model in self.brain.active_models():
+            response = await self.brain.generate(
+                "Hi",
+                priority=Priority.BACKGROUND,
+                options={'num_predict': 1},
+                model=model
+            ) or response
+        self.warmups += 1
+        logger.info(
+            f"Model warm-up ({reason}) finished in {time.monotonic() - started:.1f}s "
+            f"(load {self.last_load_s:.1f}s)"
+        )
+        return bool(response)
+
+    async def keep_alive_ping(self) -> None:
+        """
+        Periodic job: re-touch the model if it has been idle for a whole
+        ping interval, so it never sits long enough for Ollama to evict it.
+        """
+        if self.last_used is not None and time.monotonic() - self.last_used < self.ping_interval_s:
+            return
+        await self.warm_up(reason="keep-alive")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'keep_alive': self.keep_alive,
+            'requests': self.requests,
+            'cold_starts': self.cold_starts,
+            'warmups': self.warmups,
+            'avg_load_s': round(self.total_load_s / self.requests, 3) if self.requests else 0.0,
+            'avg_eval_s': round(self.total_eval_s / self.requests, 3) if self.requests else 0.0,
+            'last_load_s': round(self.last_load_s, 3),
+        }
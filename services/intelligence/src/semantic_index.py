@@ -0,0 +1,128 @@
+"""
+Semantic recall over saved facts and archived chat.
+
+Facts and chat messages are embedded with OLLAMA_EMBED_MODEL (Ollama's
+/api/embed, in batches) and stored in pgvecto-rs vector columns next to the
+text, with an HNSW index. A scheduled backfill embeds whatever is new; at
+query time the question is embedded once and unified_recall merges the
+nearest neighbours with the keyword matches (reciprocal rank fusion), so
+"when is nan's birthday" finds "grandma's birthday is March 15".
+
+Without the pgvecto-rs extension (e.g. the plain Postgres dev database) or
+with SEMANTIC_RECALL_ENABLED=false, recall stays keyword-only.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+
+from config import Config
+from inference_scheduler import Priority
+
+if TYPE_CHECKING:
+    from brain import Brain
+
+logger = logging.getLogger("memu.semantic_index")
+
+# Sources with an embedding column (see MemoryStore.EMBEDDED)
+SOURCES = ('facts', 'chat')
+
+
+def fuse(*ranked: Sequence[Dict[str, Any]], key: str, limit: int = 5, k: int = 60) -> List[Dict[str, Any]]:
+    """
+    Reciprocal rank fusion: merge ranked result lists, scoring each item by
+    sum(1 / (k + rank)) over the lists it appears in.
+    """
+    scores: Dict[Any, float] = {}
+    items: Dict[Any, Dict[str, Any]] = {}
+    for results in ranked:
+        for rank, item in enumerate(results):
+            item_key = item[key]
+            scores[item_key] = scores.get(item_key, 0.0) + 1.0 / (k + rank + 1)
+            items.setdefault(item_key, item)
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [items[item_key] for item_key in ordered[:limit]]
+
+
+def to_pgvector(values: Sequence[float]) -> str:
+    """pgvecto-rs text input format, e.g. '[0.1,0.2]'."""
+    return '[' + ','.join(repr(float(v)) for v in values) + ']'
+
+
+class SemanticIndex:
+    """Keeps embeddings up to date and embeds recall queries."""
+
+    def __init__(self, brain: "Brain", store):
+        self.brain = brain
+        self.store = store
+        self.enabled = Config.SEMANTIC_RECALL_ENABLED
+        self.batch_size = Config.EMBED_BATCH_SIZE
+        self._available: Optional[bool] = None
+        self.embedded = 0
+
+    async def available(self) -> bool:
+        """Enabled, the embedding model is installed, and the database has the vector columns (checked once)."""
+        if not self.enabled:
+            return False
+        if self._available is None:
+            try:
+                dims = await self.store.embedding_dimensions()
+            except Exception as e:
+                logger.warning(f"Could not check for pgvecto-rs: {e}")
+                return False
+            self._available = self._check_dimensions(dims)
+        return self._available and not self.brain.puller.is_loading(self.brain.embed_model)
+
+    def _check_dimensions(self, dims: Dict[str, int]) -> bool:
+        """The columns are sized once, by migration 0007; a later config change can't fit them."""
+        if not dims:
+            logger.info("pgvecto-rs not available; recall stays keyword-only")
+            return False
+        expected = Config.OLLAMA_EMBED_DIMENSIONS
+        wrong = {table: size for table, size in dims.items() if size != expected}
+        if wrong:
+            sizes = ', '.join(f"{table}.embedding is vector({size})" for table, size in sorted(wrong.items()))
+            logger.error(
+                f"Semantic recall disabled: {sizes} but OLLAMA_EMBED_DIMENSIONS={expected} "
+                f"({self.brain.embed_model}). Set OLLAMA_EMBED_DIMENSIONS and OLLAMA_EMBED_MODEL "
+                f"back to match, or resize the columns (see .env.example)."
+            )
+            return False
+        return True
+
+    async def backfill(self, max_batches: int = 10) -> int:
+        """Embed up to `max_batches` batches of unembedded rows per source (scheduled)."""
+        if not await self.available():
+            return 0
+        done = 0
+        for source in SOURCES:
+            for _ in range(max_batches):
+                rows = await self.store.get_unembedded(source, self.batch_size)
+                if not rows:
+                    break
+                try:
+                    vectors = await self.brain.embed([r['text'] for r in rows], priority=Priority.BACKGROUND)
+                except Exception as e:
+                    logger.warning(f"Embedding {source} failed, will retry later: {e}")
+                    return done
+                if len(vectors) != len(rows):
+                    logger.warning(f"Embedding {source}: got {len(vectors)} vectors for {len(rows)} texts")
+                    return done
+                await self.store.set_embeddings(
+                    source, [r['key'] for r in rows], [to_pgvector(v) for v in vectors]
+                )
+                done += len(rows)
+        if done:
+            self.embedded += done
+            logger.info(f"Embedded {done} facts/messages for semantic recall")
+        return done
+
+    async def query_vector(self, query: str) -> Optional[str]:
+        """The query's embedding in pgvector text form, or None to search by keyword only."""
+        if not query.strip() or not await self.available():
+            return None
+        try:
+            vectors = await self.brain.embed([query])
+        except Exception as e:
+            logger.warning(f"Query embedding failed, keyword recall only: {e}")
+            return None
+        return to_pgvector(vectors[0]) if vectors else None
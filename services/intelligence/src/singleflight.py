@@ -0,0 +1,106 @@
+"""
+Single-flight coalescing for identical in-flight generations.
+
+When the same prompt is requested again while the first generation is still
+running (the briefing fired twice, two rooms asking "what's happening
+today?"), the later callers share the first call's result instead of
+starting a duplicate generation on the same CPU.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("memu.singleflight")
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+class _Flight:
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.listeners: List[ProgressCallback] = []
+        self.latest = ""
+        self.waiters = 0
+
+    async def publish(self, text: str) -> None:
+        """Fan streamed progress out to every caller sharing this flight."""
+        self.latest = text
+        for listener in list(self.listeners):
+            try:
+                await listener(text)
+            except Exception as e:
+                logger.warning(f"Progress listener failed: {e}")
+
+
+class SingleFlight:
+    """
+    Runs at most one generation per key; concurrent callers await the same task.
+
+    The shared task is only cancelled once every caller waiting on it has
+    been cancelled, so one impatient caller can't kill another's answer.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Identify a request by everything except whether it streams."""
+        request = {k: v for k, v in payload.items() if k != 'stream'}
+        raw = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[ProgressCallback], Awaitable[Any]],
+                 on_progress: Optional[ProgressCallback] = None) -> Any:
+        """
+        Return fn's result, sharing it with any identical call already running.
+
+        fn receives a progress callback; whatever it reports reaches the
+        on_progress of every caller on this flight.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.create_task(fn(flight.publish))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _t, k=key, f=flight: self._finish(k, f))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Joining identical in-flight generation")
+            if on_progress is not None and flight.latest:
+                # Catch up with what the first caller has already seen
+                await on_progress(flight.latest)
+
+        if on_progress is not None:
+            flight.listeners.append(on_progress)
+        flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if on_progress is not None and on_progress in flight.listeners:
+                flight.listeners.remove(on_progress)
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+            raise
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'in_flight': self.in_flight(),
+            'started': self.started,
+            'coalesced': self.coalesced,
+        }
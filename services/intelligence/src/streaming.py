@@ -0,0 +1,99 @@
+"""
+Progressive Matrix replies for streamed AI output.
+
+Posts the first chunk of an answer as soon as it arrives, then edits that
+message in place (m.replace) at a throttled cadence as more text streams in.
+"""
+
+import logging
+import time
+from typing import Optional, TYPE_CHECKING
+
+from config import Config
+
+if TYPE_CHECKING:
+    from bot import MemuBot
+
+logger = logging.getLogger("memu.streaming")
+
+# Appended while the answer is still being written
+TYPING_MARKER = " …"
+# Replaces the marker when the generation was cancelled part-way
+STOPPED_MARKER = " … (stopped)"
+
+
+class StreamingReply:
+    """
+    A single bot reply that grows as the model generates it.
+
+    Pass `update` as the on_progress callback to a Brain method, then call
+    `finish` with the final text. If nothing was streamed (streaming disabled,
+    or the Brain returned without progress) `finish` simply sends the message.
+
+    Used as an async context manager, a reply whose generation is cancelled
+    or fails part-way is closed off instead of being left "still typing".
+    """
+
+    def __init__(self, bot: "MemuBot", room_id: str, header: str = ""):
+        self.bot = bot
+        self.room_id = room_id
+        self.header = header
+        self.enabled = Config.STREAMING_ENABLED
+        self.interval = Config.STREAM_EDIT_INTERVAL
+        self.event_id: Optional[str] = None
+        self._last_sent = ""
+        self._last_edit_at = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self.event_id is not None
+
+    async def __aenter__(self) -> "StreamingReply":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            await self.abandon()
+        return False
+
+    async def update(self, text: str) -> None:
+        """Progress callback: post or edit the reply, at most once per interval."""
+        if not self.enabled or not text.strip():
+            return
+
+        now = time.monotonic()
+        if self.started and now - self._last_edit_at < self.interval:
+            return
+
+        body = f"{self.header}{text.strip()}{TYPING_MARKER}"
+        try:
+            if not self.started:
+                self.event_id = await self.bot.send_text(self.room_id, body)
+                self.bot.reply_started()
+            else:
+                await self.bot.edit_text(self.room_id, self.event_id, body)
+            self._last_sent = body
+            self._last_edit_at = now
+        except Exception as e:
+            # A failed edit shouldn't abort the generation; finish() retries
+            logger.warning(f"Streaming update failed: {e}")
+
+    async def finish(self, text: str) -> None:
+        """Send the final text, replacing the in-progress message if there is one."""
+        body = f"{self.header}{text}"
+        if not self.started:
+            await self.bot.send_text(self.room_id, body)
+        elif body != self._last_sent:
+            await self.bot.edit_text(self.room_id, self.event_id, body)
+        self._last_sent = body
+
+    async def abandon(self) -> None:
+        """Mark a partially streamed reply as stopped (generation cancelled)."""
+        if not self.started or not self._last_sent.endswith(TYPING_MARKER):
+            return
+        body = self._last_sent[:-len(TYPING_MARKER)] + STOPPED_MARKER
+        try:
+            await self.bot.edit_text(self.room_id, self.event_id, body)
+            self._last_sent = body
+        except Exception as e:
+            logger.warning(f"Failed to close off cancelled reply: {e}")
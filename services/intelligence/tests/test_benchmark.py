@@ -0,0 +1,129 @@
+"""
+Tests for the local model benchmark.
+"""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from benchmark import BenchmarkCase, ModelBenchmark, percentile, score
+from brain import Brain, SMALL_MODEL_TASKS
+
+CASES = (
+    BenchmarkCase('intent', "what's on tomorrow", {'intent': 'CALENDAR'}),
+    BenchmarkCase('extract_reminder', "remind me to call mum at 5pm", {'task': 'call mum', 'time': '5'}),
+)
+
+
+def _fake_brain(answers):
+    """A Brain stand-in whose generate() answers per model and reports timings to observers."""
+    brain = MagicMock()
+    brain.observers = []
+    brain.task_models = {}
+    brain._extract_json = Brain._extract_json.__get__(brain)
+
+    async def generate(prompt, model=None, task=None, **kwargs):
+        if task is None:
+            return "Hi"  # warm-up
+        for observer in brain.observers:
+            observer({'model': model, 'eval_count': 10, 'eval_duration': 500_000_000}, task)
+        return json.dumps(answers[model][task])
+
+    brain.generate = AsyncMock(side_effect=generate)
+    return brain
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([30, 10, 20], 50) == 20
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_score_checks_every_expected_field():
+    case = CASES[1]
+    assert score(case, {'task': 'Call Mum', 'time': '5pm'})
+    assert not score(case, {'task': 'call mum', 'time': None})
+    assert not score(case, "not a dict")
+    assert score(CASES[0], {'intent': 'calendar '})
+    assert not score(CASES[0], {'intent': 'SCHEDULE'})
+
+
+@pytest.mark.asyncio
+async def test_run_measures_accuracy_and_speed():
+    brain = _fake_brain({
+        'good': {'intent': {'intent': 'CALENDAR'}, 'extract_reminder': {'task': 'call mum', 'time': '5pm'}},
+        'bad': {'intent': {'intent': 'CHAT'}, 'extract_reminder': {'task': 'call mum', 'time': '5pm'}},
+    })
+    bench = ModelBenchmark(brain, cases=CASES)
+
+    results = {r['model']: r for r in await bench.run(['good', 'bad'])}
+
+    assert results['good']['accuracy'] == 1.0
+    assert results['bad']['accuracy'] == 0.5
+    assert results['bad']['task_accuracy'] == {'intent': 0.0, 'extract_reminder': 1.0}
+    assert results['good']['tokens_per_s'] == 20.0
+    assert results['good']['cases'] == 2
+    assert brain.observers == []  # collector removed afterwards
+
+
+@pytest.mark.asyncio
+async def test_run_unloads_models_the_brain_does_not_use():
+    answers = {'intent': {'intent': 'CALENDAR'}, 'extract_reminder': {'task': 'call mum', 'time': '5pm'}}
+    brain = _fake_brain({'active': answers, 'spare': answers})
+    brain.active_models = MagicMock(return_value=['active'])
+
+    await ModelBenchmark(brain, cases=CASES).run(['active', 'spare'])
+
+    keep_alive = {}
+    for c in brain.generate.call_args_list:
+        keep_alive.setdefault(c.kwargs['model'], []).append(c.kwargs.get('keep_alive'))
+    # Warm-up and every case but the last keep the model loaded
+    assert keep_alive['spare'] == [None, None, 0]
+    assert keep_alive['active'] == [None, None, None]
+
+
+@pytest.mark.asyncio
+async def test_latest_recommendation_comes_from_last_run():
+    store = AsyncMock()
+    store.get_latest_benchmarks.return_value = [
+        {'model': 'a', 'recommended': False}, {'model': 'b', 'recommended': True},
+    ]
+    bench = ModelBenchmark(MagicMock(), store=store)
+
+    assert await bench.latest_recommendation() == 'b'
+
+    await bench.persist([{'model': 'a'}], recommended='a')
+    assert await bench.latest_recommendation() == 'a'
+
+
+def test_recommend_picks_fastest_adequate_model():
+    results = [
+        {'model': 'tiny', 'accuracy': 0.5, 'p50_ms': 100},
+        {'model': 'small', 'accuracy': 0.9, 'p50_ms': 300},
+        {'model': 'big', 'accuracy': 1.0, 'p50_ms': 900},
+    ]
+
+    assert ModelBenchmark.recommend(results, min_accuracy=0.8) == 'small'
+    assert ModelBenchmark.recommend(results, min_accuracy=1.0) == 'big'
+    assert ModelBenchmark.recommend(results[:1], min_accuracy=0.8) is None
+
+
+def test_apply_sets_small_model_tasks():
+    brain = MagicMock(task_models={'briefing': 'big'})
+
+    ModelBenchmark(brain).apply('small')
+
+    assert all(brain.task_models[t] == 'small' for t in SMALL_MODEL_TASKS)
+    assert brain.task_models['briefing'] == 'big'
+
+
+@pytest.mark.asyncio
+async def test_persist_marks_recommended_model():
+    store = AsyncMock()
+    bench = ModelBenchmark(MagicMock(), store=store)
+
+    run_id = await bench.persist([{'model': 'a'}, {'model': 'b'}], recommended='b')
+
+    assert run_id
+    stored = [c.args[1] for c in store.record_model_benchmark.call_args_list]
+    assert [r['recommended'] for r in stored] == [False, True]
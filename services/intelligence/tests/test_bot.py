@@ -1,6 +1,12 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from bot import MemuBot
+from db_metrics import PoolMetrics
+from inference_scheduler import InferenceScheduler, Priority
+from llm_cache import ResponseCache
+from residency import ModelResidency
+from singleflight import SingleFlight
 from nio import RoomMessageText, MatrixRoom, InviteMemberEvent
 from datetime import datetime
 
@@ -18,7 +24,19 @@ def mock_bot():
                 # Mock next_batch for summarize test
                 bot.client.next_batch = "s12345"
                 bot.memory = AsyncMock()
+                bot.memory.pool_stats = MagicMock(return_value=PoolMetrics().snapshot())
                 bot.brain = AsyncMock()
+                bot.brain.puller = MagicMock(pulling=False)
+                bot.brain.puller.is_loading = MagicMock(return_value=False)
+                bot.brain.model = "test-model"
+                bot.brain.model_for = MagicMock(return_value="test-model")
+                bot.brain.cache = None
+                bot.brain.scheduler = InferenceScheduler(max_in_flight=1)
+                bot.brain.flights = SingleFlight()
+                bot.brain.residency = ModelResidency(bot.brain)
+                bot.brain.prompt_eval_report = MagicMock(return_value={})
+                bot.semantic = MagicMock()
+                bot.semantic.query_vector = AsyncMock(return_value=None)
                 return bot
 
 @pytest.mark.asyncio
@@ -135,7 +153,7 @@ async def test_handle_recall_integration(mock_bot):
         await mock_bot.handle_recall("room1", "/recall blue")
 
         # Verify all silos were queried
-        mock_bot.memory.unified_recall.assert_called_with("room1", "blue")
+        mock_bot.memory.unified_recall.assert_called_with("room1", "blue", query_vector=None)
         mock_bot.calendar.search_events.assert_called_with("blue")
         mock_photos.assert_called_with("blue")
         
@@ -185,3 +203,477 @@ async def test_cross_silo_search_partial_failure(mock_bot):
         assert "Event 1" in context_str
         assert "Photos" not in context_str
 
+
+
+@pytest.mark.asyncio
+async def test_fast_path_skips_llm_intent(mock_bot):
+    """Obvious list requests are dispatched without an LLM round-trip."""
+    await mock_bot.process_message("room1", "@user:test", "add milk and eggs to the list")
+
+    mock_bot.brain.analyze_intent.assert_not_called()
+    mock_bot.memory.add_to_list.assert_called_with("room1", "@user:test", ["milk", "eggs"])
+
+
+@pytest.mark.asyncio
+async def test_ambiguous_message_uses_llm_intent(mock_bot):
+    """Messages the rules can't classify fall back to the model."""
+    mock_bot.brain.analyze_intent.return_value = {"intent": "NONE", "content": ""}
+
+    await mock_bot.process_message("room1", "@user:test", "soccer practice Tuesday 5pm")
+
+    mock_bot.brain.analyze_intent.assert_called_once_with("soccer practice Tuesday 5pm", room_id="room1")
+
+
+@pytest.mark.asyncio
+async def test_schedule_reuses_intent_slots(mock_bot):
+    """SCHEDULE slots from intent analysis avoid a second extraction call."""
+    mock_bot.brain.analyze_intent.return_value = {
+        "intent": "SCHEDULE",
+        "content": "Soccer Tuesday 5pm",
+        "slots": {"task": "Soccer", "date": "Tuesday", "time": "5pm"},
+    }
+    mock_bot.calendar.is_available = AsyncMock(return_value=True)
+    mock_bot.calendar.add_event = AsyncMock(return_value="uid-1")
+
+    await mock_bot.process_message("room1", "@user:test", "soccer practice Tuesday 5pm")
+
+    mock_bot.brain.extract_calendar_event.assert_not_called()
+    assert mock_bot.calendar.add_event.call_args.kwargs['summary'] == "Soccer"
+
+
+@pytest.mark.asyncio
+async def test_remind_reuses_intent_slots(mock_bot):
+    """REMINDER slots from intent analysis avoid a second extraction call."""
+    future_date = datetime(2030, 1, 1, 15, 0, 0)
+
+    with patch("bot.dateparser.parse", return_value=future_date) as mock_parse:
+        await mock_bot.handle_remind(
+            "room1", "@user:test", "/remind call mom",
+            slots={"task": "call mom", "date": "tomorrow", "time": "3pm"}
+        )
+
+    mock_bot.brain.extract_reminder.assert_not_called()
+    assert mock_parse.call_args[0][0] == "tomorrow 3pm"
+    mock_bot.memory.add_reminder.assert_called_with("room1", "@user:test", "call mom", future_date)
+
+
+@pytest.mark.asyncio
+async def test_ai_status_shows_backends(mock_bot):
+    from inference_router import InferenceRouter
+    router = InferenceRouter("http://ollama:11434", ["http://gaming-pc:11434"])
+    router.record_failure(router.backends[0], Exception("connection refused"))
+    mock_bot.brain.router = router
+    mock_bot.brain.model = "test-model"
+    mock_bot.brain.task_models = {"intent": "tiny-model"}
+    mock_bot.brain.escalations = 0
+    mock_bot.brain.cancellations = {'deadline': 0, 'cancelled': 0}
+
+    await mock_bot.process_message("room1", "@user:test", "/ai status")
+
+    mock_bot.memory.set_room_ai_mode.assert_not_called()
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "🔴 http://gaming-pc:11434 (external)" in sent
+    assert "connection refused" in sent
+    assert "🟢 http://ollama:11434 (this hub)" in sent
+    assert "• intent: tiny-model" in sent
+    assert "Generating: 0 of 1 at once" in sent
+
+
+@pytest.mark.asyncio
+async def test_summarize_keeps_newest_messages_within_budget(mock_bot):
+    mock_response = MagicMock()
+    mock_response.chunk = []
+    for i in reversed(range(50)):  # room_messages returns newest first
+        msg = MagicMock(spec=RoomMessageText)
+        msg.sender = "@user:test"
+        msg.body = f"message number {i} " + "x" * 60
+        mock_response.chunk.append(msg)
+    mock_bot.client.room_messages = AsyncMock(return_value=mock_response)
+    mock_bot.brain.summarize_chat.return_value = "Summary"
+
+    with patch("bot.Config.SUMMARY_CONTEXT_TOKENS", 200):
+        await mock_bot.handle_summarize("room1")
+
+    context = mock_bot.brain.summarize_chat.call_args.args[0]
+    lines = context.splitlines()
+    assert lines[-1].startswith("user: message number 49 ")
+    assert "message number 0 " not in context
+    assert len(context) <= 200 * 4
+
+
+@pytest.mark.asyncio
+async def test_natural_language_while_model_loading(mock_bot):
+    mock_bot.brain.puller = MagicMock(pulling=True)
+    mock_bot.brain.puller.is_loading = MagicMock(return_value=True)
+    mock_bot.brain.puller.loading_message.return_value = "⏳ My AI model is still loading (42%)."
+
+    await mock_bot.process_message("room1", "@user:test", "what's the plan for the weekend then")
+
+    mock_bot.brain.analyze_intent.assert_not_called()
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "42%" in sent
+
+
+@pytest.mark.asyncio
+async def test_model_free_intents_work_while_model_loading(mock_bot):
+    mock_bot.brain.puller = MagicMock(pulling=True)
+    mock_bot.brain.puller.is_loading = MagicMock(return_value=True)
+
+    await mock_bot.process_message("room1", "@user:test", "add milk to the shopping list")
+
+    mock_bot.memory.add_to_list.assert_called_with("room1", "@user:test", ["milk"])
+    mock_bot.brain.puller.loading_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_natural_language_works_while_another_model_downloads(mock_bot):
+    mock_bot.brain.puller = MagicMock(pulling=True)
+    mock_bot.brain.puller.is_loading = MagicMock(side_effect=lambda m: m == "nomic-embed-text")
+    mock_bot.brain.analyze_intent.return_value = {"intent": "CHAT", "content": "hello there"}
+    mock_bot.brain.chat.return_value = "Hi!"
+
+    await mock_bot.process_message("room1", "@user:test", "what's the plan for the weekend then")
+
+    mock_bot.brain.chat.assert_awaited_once()
+    mock_bot.brain.puller.loading_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_newer_message_supersedes_in_flight_chat(mock_bot):
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_chat(content, on_progress=None, room_id=None):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(content)
+            raise
+        return "answer"
+
+    mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "CHAT", "content": "x"})
+    mock_bot.brain.chat = AsyncMock(side_effect=slow_chat)
+
+    first = mock_bot._start_conversation("room1", "@user:test", "is soccer on thursday")
+    await started.wait()
+    mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "NONE", "content": "x"})
+    second = mock_bot._start_conversation("room1", "@user:test", "sorry, friday")
+    await asyncio.gather(first, second)
+
+    assert cancelled == ["is soccer on thursday"]
+    assert mock_bot.superseded == 1
+    sent = [c.kwargs["content"]["body"] for c in mock_bot.client.room_send.call_args_list]
+    assert sent == ["(stopped — replaced by your newer message)"]
+    assert mock_bot._conversations == {}
+    assert mock_bot._supersedable == set()
+    assert mock_bot._superseded == set()
+
+
+@pytest.mark.asyncio
+async def test_superseded_streamed_reply_gets_no_extra_note(mock_bot):
+    started = asyncio.Event()
+
+    async def streaming_chat(content, on_progress=None, room_id=None):
+        await on_progress("Soccer is on")
+        started.set()
+        await asyncio.sleep(10)
+
+    mock_bot.client.room_send.return_value = MagicMock(event_id="$reply")
+    mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "CHAT", "content": "x"})
+    mock_bot.brain.chat = AsyncMock(side_effect=streaming_chat)
+
+    with patch("streaming.Config.STREAMING_ENABLED", True):
+        first = mock_bot._start_conversation("room1", "@user:test", "is soccer on thursday")
+        await started.wait()
+        mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "NONE", "content": "x"})
+        second = mock_bot._start_conversation("room1", "@user:test", "sorry, friday")
+        await asyncio.gather(first, second)
+
+    bodies = [c.kwargs["content"]["body"] for c in mock_bot.client.room_send.call_args_list]
+    assert bodies[-1].endswith("(stopped)")
+    assert "(stopped — replaced by your newer message)" not in bodies
+
+
+@pytest.mark.asyncio
+async def test_cancel_without_newer_message_propagates(mock_bot):
+    started = asyncio.Event()
+
+    async def slow_chat(content, on_progress=None, room_id=None):
+        started.set()
+        await asyncio.sleep(10)
+
+    mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "CHAT", "content": "x"})
+    mock_bot.brain.chat = AsyncMock(side_effect=slow_chat)
+
+    task = mock_bot._start_conversation("room1", "@user:test", "is soccer on thursday")
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    mock_bot.client.room_send.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_newer_message_does_not_cancel_pending_write(mock_bot):
+    started = asyncio.Event()
+
+    async def slow_intent(content, room_id=None):
+        if content == "we need milk":
+            started.set()
+            await asyncio.sleep(0.05)
+            return {"intent": "LIST_ADD", "content": "milk"}
+        return {"intent": "NONE", "content": content}
+
+    mock_bot.brain.analyze_intent = AsyncMock(side_effect=slow_intent)
+
+    first = mock_bot._start_conversation("room1", "@user:test", "we need milk")
+    await started.wait()
+    second = mock_bot._start_conversation("room1", "@user:test", "oh and one more thing")
+    await asyncio.gather(first, second)
+
+    assert mock_bot.superseded == 0
+    mock_bot.memory.add_to_list.assert_called_with("room1", "@user:test", ["milk"])
+
+
+@pytest.mark.asyncio
+async def test_other_senders_do_not_supersede(mock_bot):
+    mock_bot.brain.analyze_intent = AsyncMock(return_value={"intent": "NONE", "content": "x"})
+
+    a = mock_bot._start_conversation("room1", "@alice:test", "what's for dinner then")
+    b = mock_bot._start_conversation("room1", "@bob:test", "what's for lunch then")
+    await asyncio.gather(a, b)
+
+    assert mock_bot.superseded == 0
+    assert mock_bot.brain.analyze_intent.call_count == 2
+
+
+def _family_room(mock_bot, admins):
+    room = MagicMock()
+    room.power_levels.get_user_level = lambda user_id: 100 if user_id in admins else 0
+    mock_bot.client.rooms = {"!family:test": room}
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.PRIMARY_ROOM_ID", "!family:test")
+async def test_benchmark_refused_for_non_admins(mock_bot):
+    _family_room(mock_bot, admins=["@parent:test"])
+    mock_bot.benchmark = MagicMock()
+
+    await mock_bot.process_message("room1", "@kid:test", "/benchmark apply")
+
+    mock_bot.benchmark.apply.assert_not_called()
+    assert mock_bot._benchmark_task is None
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "Only an admin of the family room" in sent
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.PRIMARY_ROOM_ID", "!family:test")
+async def test_benchmark_apply_switches_to_recommended_model(mock_bot):
+    _family_room(mock_bot, admins=["@user:test"])
+    mock_bot.benchmark = MagicMock()
+    mock_bot.benchmark.cases = [1, 2, 3]
+    mock_bot.benchmark.local_models = AsyncMock(return_value=["tiny", "big"])
+    mock_bot.benchmark.run = AsyncMock(return_value=[
+        {'model': 'tiny', 'accuracy': 0.9, 'p50_ms': 120, 'p95_ms': 200, 'tokens_per_s': 80.0},
+        {'model': 'big', 'accuracy': 1.0, 'p50_ms': 900, 'p95_ms': 1400, 'tokens_per_s': 15.0},
+    ])
+    mock_bot.benchmark.recommend.return_value = "tiny"
+    mock_bot.benchmark.persist = AsyncMock()
+    mock_bot.benchmark.latest_recommendation = AsyncMock(return_value=None)
+
+    await mock_bot.process_message("room1", "@user:test", "/benchmark apply")
+    await mock_bot._benchmark_task
+
+    mock_bot.benchmark.apply.assert_called_once_with("tiny")
+    mock_bot.benchmark.persist.assert_awaited_once()
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "**tiny** ⭐" in sent
+    assert "OLLAMA_SMALL_MODEL=tiny" in sent
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.PRIMARY_ROOM_ID", "!family:test")
+async def test_benchmark_apply_uses_last_recommendation(mock_bot):
+    _family_room(mock_bot, admins=["@user:test"])
+    mock_bot.benchmark = MagicMock()
+    mock_bot.benchmark.local_models = AsyncMock(return_value=["tiny", "big"])
+    mock_bot.benchmark.latest_recommendation = AsyncMock(return_value="tiny")
+    mock_bot.benchmark.run = AsyncMock()
+
+    await mock_bot.process_message("room1", "@user:test", "/benchmark apply")
+
+    mock_bot.benchmark.run.assert_not_called()
+    mock_bot.benchmark.apply.assert_called_once_with("tiny")
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "Now using **tiny**" in sent
+
+
+@pytest.mark.asyncio
+async def test_ai_stats_lists_tasks(mock_bot):
+    mock_bot.brain.ledger = MagicMock()
+    mock_bot.brain.ledger.stats = AsyncMock(return_value=[{
+        'task': 'briefing', 'calls': 2, 'failures': 1, 'p50_ms': 4000, 'p95_ms': 9000,
+        'tokens_per_s': 6.5, 'avg_prompt_tokens': 900, 'avg_queue_wait_ms': 0,
+    }])
+    mock_bot.brain.cache = ResponseCache()
+    mock_bot.brain.cache.hits, mock_bot.brain.cache.misses = 3, 1
+    async with mock_bot.brain.scheduler.slot(Priority.INTERACTIVE):
+        pass
+    mock_bot.brain.residency.requests, mock_bot.brain.residency.cold_starts = 4, 1
+    mock_bot.brain.prompt_eval_report.return_value = {
+        'intent': {'calls': 2, 'avg_prompt_tokens': 310.0, 'avg_prompt_eval_ms': 850.0},
+    }
+
+    await mock_bot.process_message("room1", "@user:test", "/ai stats")
+
+    mock_bot.memory.set_room_ai_mode.assert_not_called()
+    sent = mock_bot.client.room_send.call_args.kwargs['content']['body']
+    assert "**briefing** — 2 calls, 4000ms typical / 9000ms slow" in sent
+    assert "1 failed or stopped" in sent
+    assert "3 hits / 1 misses (75% answered from cache)" in sent
+    assert "• Queue (interactive): 1 served" in sent
+    assert "1 cold starts in 4 calls" in sent
+    assert "Prompt **intent**: ~310 tokens, 850ms to read (2 calls)" in sent
+    assert "**Database (since start)**" in sent
+
+
+def _text_event(event_id, body, sender="@user:test", content=None):
+    event = MagicMock(spec=RoomMessageText)
+    event.event_id = event_id
+    event.sender = sender
+    event.body = body
+    event.server_timestamp = 1_700_000_000_000
+    event.source = {"content": content or {"msgtype": "m.text", "body": body}}
+    return event
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.CHAT_ARCHIVE_ENABLED", True)
+async def test_messages_are_archived_including_edits(mock_bot):
+    await mock_bot._archive("room1", _text_event("$1", "swimming at 10"))
+    rows = mock_bot.memory.archive_messages.call_args.args[0]
+    assert rows == [{'event_id': "$1", 'room_id': "room1", 'sender': "@user:test",
+                     'body': "swimming at 10", 'timestamp': 1_700_000_000_000}]
+
+    edit = _text_event("$2", "* swimming at 11", content={
+        "body": "* swimming at 11",
+        "m.new_content": {"body": "swimming at 11"},
+        "m.relates_to": {"rel_type": "m.replace", "event_id": "$1"},
+    })
+    await mock_bot._archive("room1", edit)
+    mock_bot.memory.update_archived_message.assert_called_once_with("$1", "swimming at 11")
+
+
+def _edit_event(event_id, original_id, body, sender="@user:test"):
+    return _text_event(event_id, f"* {body}", sender=sender, content={
+        "body": f"* {body}",
+        "m.new_content": {"body": body},
+        "m.relates_to": {"rel_type": "m.replace", "event_id": original_id},
+    })
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.CHAT_ARCHIVE_ENABLED", True)
+async def test_streaming_edits_archive_only_the_final_body(mock_bot):
+    await mock_bot._archive("room1", _edit_event("$2", "$1", "Swimming is at …", sender="@bot:test"))
+    await mock_bot._archive("room1", _edit_event("$3", "$1", "Swimming is at 10 …", sender="@bot:test"))
+    mock_bot.memory.update_archived_message.assert_not_called()
+
+    await mock_bot._archive("room1", _edit_event("$4", "$1", "Swimming is at 10.", sender="@bot:test"))
+    mock_bot.memory.update_archived_message.assert_called_once_with("$1", "Swimming is at 10.")
+
+    # A person's message that happens to trail off is still their edit
+    await mock_bot._archive("room1", _edit_event("$6", "$5", "well …"))
+    mock_bot.memory.update_archived_message.assert_called_with("$5", "well …")
+
+
+@pytest.mark.asyncio
+async def test_backfill_applies_latest_edit_to_original(mock_bot):
+    pages = [
+        MagicMock(chunk=[
+            _edit_event("$5", "$1", "swimming at 11"),
+            _edit_event("$4", "$3", "Done …", sender="@bot:test"),
+            _edit_event("$2", "$1", "swimming at 10:30"),
+        ], end="t2"),
+        MagicMock(chunk=[_text_event("$1", "swimming at 10")], end=None),
+    ]
+    mock_bot.client.room_messages = AsyncMock(side_effect=pages)
+    mock_bot.memory.archive_messages = AsyncMock(side_effect=[0, 1])
+
+    assert await mock_bot.backfill_room("room1") == 1
+    rows = mock_bot.memory.archive_messages.call_args_list[1].args[0]
+    assert [r['event_id'] for r in rows] == ["$1"]
+    mock_bot.memory.update_archived_message.assert_called_once_with("$1", "swimming at 11")
+
+
+@pytest.mark.asyncio
+async def test_backfill_stops_at_already_archived_history(mock_bot):
+    pages = [
+        MagicMock(chunk=[_text_event("$3", "new"), _text_event("$2", "also new")], end="t2"),
+        MagicMock(chunk=[_text_event("$1", "old")], end="t3"),
+        MagicMock(chunk=[_text_event("$0", "older")], end="t4"),
+    ]
+    mock_bot.client.room_messages = AsyncMock(side_effect=pages)
+    mock_bot.memory.archive_messages = AsyncMock(side_effect=[2, 0, 1])
+
+    assert await mock_bot.backfill_room("room1") == 2
+    assert mock_bot.client.room_messages.call_count == 2
+    assert mock_bot.client.room_messages.call_args_list[1].kwargs['start'] == "t2"
+
+
+@pytest.mark.asyncio
+@patch("bot.Config.CHAT_ARCHIVE_ENABLED", True)
+async def test_summarize_reads_local_archive(mock_bot):
+    mock_bot.memory.get_recent_messages.return_value = [
+        {'sender': "@alice:test", 'body': "pick up at 3", 'timestamp': 1, 'event_id': "$1"},
+    ]
+    mock_bot.brain.summarize_chat.return_value = "Summary"
+
+    await mock_bot.process_message("room1", "@user:test", "/summarize")
+
+    mock_bot.client.room_messages.assert_not_called()
+    context = mock_bot.brain.summarize_chat.call_args.args[0]
+    assert "alice: pick up at 3" in context
+
+
+@pytest.mark.asyncio
+async def test_cross_silo_search_passes_query_vector(mock_bot):
+    mock_bot.semantic.query_vector = AsyncMock(return_value="[0.1,0.2]")
+    mock_bot.memory.unified_recall = AsyncMock(return_value={"facts": [], "chat": []})
+    mock_bot.calendar.is_available = AsyncMock(return_value=False)
+
+    with patch.object(mock_bot, '_search_photos', new_callable=AsyncMock, return_value=[]):
+        await mock_bot._cross_silo_search("room1", "nan's birthday")
+
+    mock_bot.semantic.query_vector.assert_awaited_once_with("nan's birthday")
+    mock_bot.memory.unified_recall.assert_called_with("room1", "nan's birthday", query_vector="[0.1,0.2]")
+
+
+@pytest.mark.asyncio
+async def test_private_discloses_chat_archive(mock_bot):
+    with patch("bot.Config.CHAT_ARCHIVE_ENABLED", True):
+        await mock_bot.handle_private("room1")
+    assert "plain-text copy" in mock_bot.client.room_send.call_args.kwargs['content']['body']
+
+    with patch("bot.Config.CHAT_ARCHIVE_ENABLED", False):
+        await mock_bot.handle_private("room1")
+    assert "plain-text copy" not in mock_bot.client.room_send.call_args.kwargs['content']['body']
+
+
+@pytest.mark.asyncio
+async def test_shutdown_flushes_ledger_before_closing_database(mock_bot):
+    order = []
+    mock_bot.semantic.available = AsyncMock(return_value=False)
+    mock_bot.reminders = MagicMock(run=AsyncMock(), close=AsyncMock())
+    mock_bot.client.add_event_callback = MagicMock()
+    mock_bot.brain.ledger.attach_store = MagicMock()
+    mock_bot.client.sync.side_effect = Exception("connection refused")
+    mock_bot.brain.ledger.flush = AsyncMock(side_effect=lambda: order.append("flush"))
+    mock_bot.memory.close = AsyncMock(side_effect=lambda: order.append("close"))
+
+    await mock_bot.start()
+
+    assert order == ["flush", "close"]
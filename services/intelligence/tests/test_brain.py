@@ -1,12 +1,15 @@
+import asyncio
 import pytest
+import httpx
 from unittest.mock import AsyncMock, patch, MagicMock
-from brain import Brain
+from brain import Brain, TRUNCATED_MARKER
+from llm_cache import ResponseCache
 
 @pytest.mark.asyncio
 async def test_brain_generate_success():
     brain = Brain()
     # Mock httpx response
-    with patch("httpx.AsyncClient") as mock_client:
+    with patch("http_clients.clients.get") as mock_client:
         # Create the mock response object
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -16,17 +19,12 @@ async def test_brain_generate_success():
         # Create the post method mock (must be async)
         mock_post = AsyncMock(return_value=mock_response)
 
-        # Mock the context manager __aenter__ to return an object with the .post method
+        # The shared Ollama client whose .post method we control
         mock_context = AsyncMock()
         mock_context.post = mock_post
 
-        # Wire it up: Client() returns the context manager that has __aenter__
-        mock_client_instance = MagicMock()
-        mock_client_instance.__aenter__.return_value = mock_context
-        mock_client_instance.__aexit__.return_value = None
-
-        # When httpx.AsyncClient() is called, return the instance
-        mock_client.return_value = mock_client_instance
+        # clients.get('ollama') returns it
+        mock_client.return_value = mock_context
 
         response = await brain.generate("Test prompt")
         assert response == "Test AI Response"
@@ -96,3 +94,371 @@ async def test_synthesise_cross_silo():
     
     assert "Context extracted from silos" in prompt
     assert "Chief of Staff" in system
+
+
+@pytest.mark.asyncio
+async def test_brain_generate_streaming_reports_progress():
+    """Streaming mode should consume NDJSON chunks and report accumulated text."""
+    brain = Brain()
+
+    lines = [
+        '{"response": "Hello", "done": false}',
+        '{"response": " there", "done": false}',
+        '{"response": "", "done": true}',
+    ]
+
+    async def aiter_lines():
+        for line in lines:
+            yield line
+
+    mock_response = MagicMock()
+    mock_response.raise_for_status = MagicMock()
+    mock_response.aiter_lines = aiter_lines
+
+    stream_ctx = MagicMock()
+    stream_ctx.__aenter__ = AsyncMock(return_value=mock_response)
+    stream_ctx.__aexit__ = AsyncMock(return_value=None)
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = MagicMock()
+        mock_context.stream = MagicMock(return_value=stream_ctx)
+        mock_client.return_value = mock_context
+
+        progress = []
+
+        async def on_progress(text):
+            progress.append(text)
+
+        response = await brain.generate("Test prompt", on_progress=on_progress)
+
+    assert response == "Hello there"
+    assert progress == ["Hello", "Hello there"]
+    payload = mock_context.stream.call_args.kwargs['json']
+    assert payload['stream'] is True
+
+
+@pytest.mark.asyncio
+async def test_analyze_intent_returns_slots():
+    """Intent analysis fills schedule/reminder slots in the same call."""
+    brain = Brain()
+    brain.generate = AsyncMock(return_value=(
+        '{"intent": "SCHEDULE", "content": "Soccer Tuesday 5pm", '
+        '"slots": {"task": "Soccer", "date": "Tuesday", "time": "5pm", "duration": null, "location": ""}}'
+    ))
+
+    result = await brain.analyze_intent("soccer practice Tuesday 5pm")
+
+    assert result['intent'] == "SCHEDULE"
+    assert result['slots'] == {"task": "Soccer", "date": "Tuesday", "time": "5pm"}
+    brain.generate.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_generate_cache_skips_repeat_calls():
+    """Cacheable calls are served from the cache the second time."""
+    brain = Brain()
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"response": '{"intent": "LIST_SHOW"}'}
+    mock_response.raise_for_status = MagicMock()
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = AsyncMock()
+        mock_context.post = AsyncMock(return_value=mock_response)
+        mock_client.return_value = mock_context
+
+        first = await brain.generate("same prompt", json_mode=True, cache=True)
+        second = await brain.generate("same prompt", json_mode=True, cache=True)
+
+    assert first == second == '{"intent": "LIST_SHOW"}'
+    assert mock_context.post.call_count == 1
+    assert brain.cache.stats()['hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_coalesces_identical_concurrent_calls():
+    """Two identical in-flight prompts share a single Ollama request."""
+
+    brain = Brain()
+    gate = asyncio.Event()
+    calls = 0
+
+    async def fake_once(payload, task=None, call=None):
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "shared"
+
+    brain._generate_once = fake_once
+    first = asyncio.create_task(brain.generate("what's happening today?"))
+    second = asyncio.create_task(brain.generate("what's happening today?"))
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await asyncio.gather(first, second) == ["shared", "shared"]
+    assert calls == 1
+    assert brain.flights.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_generate_fails_over_to_local_hub():
+    """A dead external backend should not cost the user their answer."""
+    with patch("brain.Config.OLLAMA_EXTERNAL_HOSTS", ["http://gaming-pc:11434"]):
+        brain = Brain()
+
+    ok = MagicMock()
+    ok.raise_for_status = MagicMock()
+    ok.json.return_value = {"response": "From the hub", "eval_count": 5}
+
+    async def fake_post(url, json, timeout=None):
+        if url.startswith("http://gaming-pc"):
+            raise httpx.ConnectError("connection refused")
+        return ok
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = MagicMock()
+        mock_context.post = AsyncMock(side_effect=fake_post)
+        mock_client.return_value = mock_context
+
+        response = await brain.generate("Test prompt")
+
+    assert response == "From the hub"
+    gpu, local = brain.router.backends
+    assert gpu.healthy is False
+    assert local.ewma_latency is not None
+    assert brain.router.snapshot()['last_decision']['chosen'] == brain.ollama_url
+
+
+@pytest.mark.asyncio
+async def test_generate_records_call_in_ledger():
+    brain = Brain()
+    result = {
+        "response": "Hello", "load_duration": 2_000_000, "prompt_eval_count": 42,
+        "prompt_eval_duration": 30_000_000, "eval_count": 7, "eval_duration": 70_000_000,
+    }
+
+    async def once(payload, task=None, call=None):
+        call.backend = brain.ollama_url
+        call.add_timings(result)
+        return "Hello"
+
+    brain._generate_once = once
+    await brain.generate("Test prompt", task="chat")
+
+    call = brain.ledger.calls[-1]
+    assert (call.task, call.model, call.outcome) == ("chat", brain.model, "ok")
+    assert (call.load_ms, call.prompt_tokens, call.prompt_eval_ms) == (2, 42, 30)
+    assert (call.eval_tokens, call.eval_ms) == (7, 70)
+    assert call.queue_wait_ms == 0
+    assert call.total_ms is not None
+
+
+@pytest.mark.asyncio
+async def test_small_model_handles_json_tasks():
+    with patch("brain.Config.OLLAMA_SMALL_MODEL", "tiny-model"):
+        brain = Brain()
+    brain.generate = AsyncMock(return_value='{"intent": "CALENDAR", "content": "tomorrow"}')
+
+    result = await brain.analyze_intent("what's on tomorrow?")
+
+    assert result['intent'] == "CALENDAR"
+    assert brain.generate.call_args.kwargs['model'] == "tiny-model"
+    assert brain.model_for("synthesise_cross_silo") == brain.model
+    assert brain.active_models() == [brain.model, "tiny-model"]
+    assert brain.escalations == 0
+
+
+@pytest.mark.asyncio
+async def test_unparseable_small_model_answer_escalates():
+    with patch("brain.Config.OLLAMA_SMALL_MODEL", "tiny-model"):
+        brain = Brain()
+    brain.generate = AsyncMock(side_effect=[
+        "Sure! The task is milk",
+        '{"task": "buy milk", "time": "tomorrow"}',
+    ])
+
+    result = await brain.extract_reminder("remind me to buy milk tomorrow")
+
+    assert result == {"task": "buy milk", "time": "tomorrow"}
+    models = [c.kwargs['model'] for c in brain.generate.call_args_list]
+    assert models == ["tiny-model", brain.model]
+    assert brain.escalations == 1
+
+
+@pytest.mark.asyncio
+async def test_empty_small_model_answer_does_not_escalate():
+    with patch("brain.Config.OLLAMA_SMALL_MODEL", "tiny-model"):
+        brain = Brain()
+    # What generate returns past the deadline or with every backend down
+    brain.generate = AsyncMock(return_value="")
+
+    assert await brain.extract_reminder("remind me to buy milk tomorrow") == {}
+
+    brain.generate.assert_awaited_once()
+    assert brain.escalations == 0
+
+
+def test_task_model_overrides():
+    with patch("brain.Config.OLLAMA_TASK_MODELS", {"briefing": "big-model"}):
+        brain = Brain()
+
+    assert brain.model_for("briefing") == "big-model"
+    assert brain.model_for("intent") == brain.model
+
+
+@pytest.mark.asyncio
+async def test_generate_applies_task_profile():
+    brain = Brain()
+    brain._generate_once = AsyncMock(return_value='{"task": "x", "time": "y"}')
+
+    with patch("profiles.Config.STRUCTURED_OUTPUT_ENABLED", True):
+        await brain.generate("prompt", json_mode=True, task="extract_reminder",
+                             options={'num_predict': 32})
+
+    payload = brain._generate_once.call_args.args[0]
+    assert payload['options']['temperature'] == 0.0
+    assert payload['options']['num_predict'] == 32  # explicit options win
+    assert payload['format']['required'] == ['task', 'time']
+
+
+@pytest.mark.asyncio
+async def test_generate_deadline_aborts_request():
+    brain = Brain()
+    aborted = asyncio.Event()
+
+    async def hang(payload, task=None, call=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            aborted.set()
+            raise
+
+    brain._generate_once = hang
+
+    assert await brain.generate("Test prompt", deadline=0.05) == ""
+    await asyncio.wait_for(aborted.wait(), 1)
+    assert brain.cancellations['deadline'] == 1
+    assert brain.scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_generate_deadline_returns_streamed_text():
+    brain = Brain()
+
+    async def slow_stream(payload, on_progress, task=None, call=None):
+        await on_progress("Partial answer")
+        await asyncio.sleep(10)
+
+    brain._generate_stream = slow_stream
+
+    async def on_progress(text):
+        pass
+
+    result = await brain.generate("Test prompt", on_progress=on_progress, deadline=0.05)
+    assert result == f"Partial answer{TRUNCATED_MARKER}"
+
+
+@pytest.mark.asyncio
+async def test_cancelling_caller_cancels_generation():
+    brain = Brain()
+    aborted = asyncio.Event()
+
+    async def hang(payload, task=None, call=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            aborted.set()
+            raise
+
+    brain._generate_once = hang
+
+    caller = asyncio.create_task(brain.generate("Test prompt"))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+
+    await asyncio.wait_for(aborted.wait(), 1)
+    assert brain.cancellations['cancelled'] == 1
+    assert brain.ledger.calls[-1].outcome == 'cancelled'
+
+
+@pytest.mark.asyncio
+async def test_analyze_intents_maps_results_by_id():
+    brain = Brain()
+    brain.generate = AsyncMock(return_value=(
+        '{"results": [{"id": 2, "intent": "list_show", "content": "list", "slots": {}},'
+        ' {"id": 1, "intent": "CALENDAR", "content": "tomorrow", "slots": {}}]}'
+    ))
+
+    results = await brain.analyze_intents(["what's on tomorrow", "show the list", "hmm"])
+
+    assert results[0]["intent"] == "CALENDAR"
+    assert results[1]["intent"] == "LIST_SHOW"
+    assert results[2] is None
+    kwargs = brain.generate.call_args.kwargs
+    assert kwargs["task"] == "intent_batch"
+    assert kwargs["options"]["num_predict"] == 3 * 160
+    assert '3. "hmm"' in brain.generate.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_analyze_intents_shares_the_single_intent_cache():
+    brain = Brain()
+    brain.cache = ResponseCache()
+    calls = []
+
+    async def fake_generate(prompt, **kwargs):
+        calls.append(kwargs["task"])
+        if kwargs["task"] == "intent":
+            return '{"intent": "CALENDAR", "content": "tomorrow", "slots": {}}'
+        return '{"results": [{"id": 1, "intent": "LIST_SHOW", "content": "list", "slots": {}}]}'
+
+    brain.generate = AsyncMock(side_effect=fake_generate)
+    # generate() is mocked, so fill the cache the way a real single call would
+    await brain.cache.put(brain._intent_cache_key("what's on tomorrow"), brain.model,
+                          '{"intent": "CALENDAR", "content": "tomorrow", "slots": {}}')
+
+    results = await brain.analyze_intents(["what's on tomorrow", "show the list"])
+
+    assert [r["intent"] for r in results] == ["CALENDAR", "LIST_SHOW"]
+    assert calls == ["intent_batch"]
+    assert '1. "show the list"' in brain.generate.call_args.args[0]
+    assert "tomorrow" not in brain.generate.call_args.args[0]
+    # The batched answer is now a cache hit for a lone message too
+    assert (await brain._cached_intent("show the list"))["intent"] == "LIST_SHOW"
+
+
+@pytest.mark.asyncio
+async def test_embed_posts_batch_to_embed_endpoint():
+    brain = Brain()
+    brain.embed_model = "nomic-embed-text"
+
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.json.return_value = {"embeddings": [[0.1, 0.2], [0.3, 0.4]]}
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = MagicMock()
+        mock_context.post = AsyncMock(return_value=response)
+        mock_client.return_value = mock_context
+
+        vectors = await brain.embed(["bins on tuesday", "nan's birthday"])
+
+    assert vectors == [[0.1, 0.2], [0.3, 0.4]]
+    url = mock_context.post.call_args[0][0]
+    payload = mock_context.post.call_args[1]['json']
+    assert url.endswith("/api/embed")
+    assert payload['model'] == "nomic-embed-text"
+    assert payload['input'] == ["bins on tuesday", "nan's birthday"]
+
+
+@pytest.mark.asyncio
+async def test_generate_waits_only_for_its_own_model():
+    brain = Brain()
+    brain.model = "main-model"
+    brain.task_models = {"intent": "small-model"}
+    brain.puller.waiting = {"small-model"}
+    brain._generate_once = AsyncMock(return_value="ok")
+
+    assert await brain.generate("Test prompt", task="intent") == ""
+    assert await brain.generate("Test prompt", task="chat") == "ok"
@@ -115,10 +115,10 @@ class TestGatherWeather:
             }
             mock_response.raise_for_status = MagicMock()
 
-            with patch('httpx.AsyncClient') as mock_client:
+            with patch('http_clients.clients.get') as mock_client:
                 mock_context = AsyncMock()
                 mock_context.get = AsyncMock(return_value=mock_response)
-                mock_client.return_value.__aenter__.return_value = mock_context
+                mock_client.return_value = mock_context
 
                 result = await agent.gather_weather()
 
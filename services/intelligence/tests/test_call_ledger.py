@@ -0,0 +1,93 @@
+"""
+Tests for the LLM call ledger.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from call_ledger import CallLedger, LLMCall, percentile, summarize
+
+
+def _call(task="intent", total_ms=100, outcome="ok", eval_tokens=10, eval_ms=200, **kwargs):
+    return LLMCall(task=task, model="m", outcome=outcome, total_ms=total_ms,
+                   eval_tokens=eval_tokens, eval_ms=eval_ms, queue_wait_ms=0, **kwargs)
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 50) == 0.0
+    assert percentile([30, 10, 20], 50) == 20
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_add_timings_converts_nanoseconds():
+    call = LLMCall(task="chat", model="m")
+    call.add_timings({"load_duration": 1_500_000, "prompt_eval_count": 12, "eval_count": 3})
+
+    assert call.load_ms == 2
+    assert call.prompt_tokens == 12
+    assert call.eval_tokens == 3
+    assert call.eval_ms is None
+
+
+def test_summarize_per_task():
+    ledger = CallLedger()
+    for ms in (100, 200, 300, 400):
+        ledger.record(_call("intent", total_ms=ms))
+    ledger.record(_call("briefing", total_ms=5000, eval_tokens=100, eval_ms=10000))
+    ledger.record(_call("briefing", total_ms=None, outcome="cancelled", eval_tokens=None, eval_ms=None))
+
+    from dataclasses import asdict
+    rows = summarize([asdict(c) for c in ledger.calls])
+
+    assert [r['task'] for r in rows] == ["briefing", "intent"]  # most total time first
+    intent = rows[1]
+    assert (intent['calls'], intent['p50_ms'], intent['p95_ms']) == (4, 200, 400)
+    assert intent['tokens_per_s'] == 50.0
+    assert rows[0]['failures'] == 1
+    assert rows[0]['tokens_per_s'] == 10.0
+
+
+def test_ring_buffer_is_bounded():
+    ledger = CallLedger(max_entries=3)
+    for i in range(5):
+        ledger.record(_call(total_ms=i))
+
+    assert [c.total_ms for c in ledger.calls] == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_sampled_calls_and_all_failures():
+    store = AsyncMock()
+    ledger = CallLedger(sample_rate=0.0)
+    ledger.attach_store(store)
+    ledger.record(_call(outcome="ok"))
+    ledger.record(_call(outcome="error"))
+
+    assert await ledger.flush() == 1
+    written = store.record_llm_calls.call_args.args[0]
+    assert [c['outcome'] for c in written] == ["error"]
+    assert await ledger.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_flush_failure_does_not_raise():
+    store = AsyncMock()
+    store.record_llm_calls.side_effect = Exception("db down")
+    ledger = CallLedger()
+    ledger.attach_store(store)
+    ledger.record(_call())
+
+    assert await ledger.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_uses_ring_buffer_without_store():
+    ledger = CallLedger()
+    ledger.record(_call(total_ms=100))
+    ledger.record(_call(total_ms=900, created_at=datetime.now() - timedelta(days=2)))
+
+    rows = await ledger.stats(hours=24)
+
+    assert rows[0]['calls'] == 1
+    assert rows[0]['p95_ms'] == 100
@@ -0,0 +1,72 @@
+"""
+Tests for token-budgeted context assembly.
+"""
+
+from context_builder import ContextBuilder, condense, estimate_tokens, rank_by_query
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_condense_marks_the_cut():
+    assert condense("short", 10) == "short"
+    condensed = condense("x" * 100, 5)
+    assert condensed.endswith("…")
+    assert len(condensed) == 20
+
+
+def test_everything_fits_under_a_generous_budget():
+    builder = ContextBuilder(1000)
+    builder.add_section("## Facts", ["- a", "- b"])
+    builder.add_section("## Chat", ["- c"])
+
+    assert builder.build() == "## Facts\n- a\n- b\n\n## Chat\n- c"
+    assert builder.report['sections'] == {"## Facts": "2/2", "## Chat": "1/1"}
+
+
+def test_keep_last_drops_oldest_and_preserves_order():
+    builder = ContextBuilder(12)
+    builder.add_section(None, [f"message {i:02d}" for i in range(10)], keep='last')
+
+    text = builder.build()
+
+    assert text.splitlines() == ["message 07", "message 08", "message 09"]
+
+
+def test_keep_first_drops_least_relevant():
+    builder = ContextBuilder(12)
+    builder.add_section(None, ["best match", "second one", "third item", "fourth item"])
+
+    assert builder.build().splitlines() == ["best match", "second one", "third item"]
+
+
+def test_unused_share_goes_to_sections_that_dropped_items():
+    builder = ContextBuilder(40)
+    builder.add_section("## A", ["tiny"])
+    builder.add_section("## B", [f"item number {i}" for i in range(20)])
+
+    builder.build()
+
+    a, b = builder.sections
+    assert len(a.kept) == 1
+    # B's half share holds 3 items; A's leftovers buy several more
+    assert len(b.kept) > 3
+    assert builder.report['tokens'] <= 40
+
+
+def test_long_items_are_condensed():
+    builder = ContextBuilder(1000)
+    builder.add_section(None, ["y" * 1000], max_item_tokens=10)
+
+    assert estimate_tokens(builder.build()) <= 10
+
+
+def test_rank_by_query_is_stable():
+    items = ["dentist on friday", "wifi password is abc", "the wifi router moved", "pizza night"]
+
+    ranked = rank_by_query(items, "what's the wifi password?", lambda s: s)
+
+    assert ranked == ["wifi password is abc", "the wifi router moved", "dentist on friday", "pizza night"]
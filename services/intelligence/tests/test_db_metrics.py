@@ -0,0 +1,61 @@
+"""
+Tests for connection pool instrumentation.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from db_metrics import Histogram, PoolMetrics
+
+
+def _query(sql, ms, exception=None):
+    # Shaped like asyncpg's LoggedQuery
+    return SimpleNamespace(query=sql, args=(), timeout=None, elapsed=ms / 1000, exception=exception)
+
+
+def test_histogram_quantiles_are_bucket_bounds():
+    h = Histogram(bounds=(10, 100))
+    for ms in (1, 2, 3, 50, 500):
+        h.observe(ms)
+
+    assert h.quantile(50) == 10
+    assert h.quantile(80) == 100
+    assert h.quantile(100) == 500  # open bucket reports the max seen
+    assert h.snapshot()['buckets'] == {'10': 3, '100': 1, '+Inf': 1}
+
+
+def test_query_logger_records_latency_by_verb_and_slow_queries():
+    metrics = PoolMetrics(slow_query_ms=100)
+
+    metrics.on_query(_query("\n  SELECT fact FROM household_memory", 3))
+    metrics.on_query(_query("UPDATE reminders SET processed = TRUE", 250))
+    metrics.on_query(_query("SELECT 1", 1, exception=Exception("timeout")))
+
+    stats = metrics.snapshot()
+    assert stats['queries']['count'] == 3
+    assert stats['by_verb']['SELECT']['count'] == 2
+    assert stats['slow'] == 1
+    assert stats['errors'] == 1
+
+
+@pytest.mark.asyncio
+async def test_acquire_tracks_connections_in_use():
+    conn = AsyncMock()
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
+    pool.get_size.return_value = 3
+    pool.get_idle_size.return_value = 2
+    pool.get_max_size.return_value = 10
+    metrics = PoolMetrics()
+
+    async with metrics.acquire(pool) as got:
+        assert got is conn
+        assert metrics.in_use == 1
+
+    stats = metrics.snapshot(pool)
+    assert stats['in_use'] == 0
+    assert stats['peak_in_use'] == 1
+    assert stats['acquire_wait']['count'] == 1
+    assert (stats['size'], stats['idle'], stats['max_size']) == (3, 2, 10)
@@ -0,0 +1,37 @@
+"""
+Tests for the shared HTTP client registry.
+"""
+
+import pytest
+
+from http_clients import HttpClients, UPSTREAMS
+
+
+@pytest.mark.asyncio
+async def test_clients_are_reused_per_upstream():
+    registry = HttpClients()
+
+    ollama = registry.get('ollama')
+
+    assert registry.get('ollama') is ollama
+    assert registry.get('immich') is not ollama
+    assert ollama.timeout == UPSTREAMS['ollama'].timeout
+    await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_closes_pools_and_later_get_reopens():
+    registry = HttpClients()
+    web = registry.get('web')
+
+    await registry.aclose()
+
+    assert web.is_closed
+    fresh = registry.get('web')
+    assert fresh is not web and not fresh.is_closed
+    await registry.aclose()
+
+
+def test_unknown_upstream_is_an_error():
+    with pytest.raises(KeyError):
+        HttpClients().get('nowhere')
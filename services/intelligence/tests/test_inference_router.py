@@ -0,0 +1,95 @@
+"""
+Tests for the multi-backend inference router.
+"""
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from inference_router import InferenceRouter
+
+LOCAL = "http://ollama:11434"
+GPU = "http://192.168.1.50:11434"
+
+
+def test_local_hub_is_always_a_candidate():
+    router = InferenceRouter(LOCAL)
+
+    assert [b.url for b in router.candidates()] == [LOCAL]
+    assert router.local.local is True
+
+
+def test_unmeasured_external_backend_is_tried_first():
+    router = InferenceRouter(LOCAL, [GPU])
+
+    assert [b.url for b in router.candidates()] == [GPU, LOCAL]
+
+
+def test_prefers_fastest_healthy_backend():
+    router = InferenceRouter(LOCAL, [GPU])
+    gpu, local = router.backends
+
+    router.record_success(gpu, 10.0, tokens=100)    # 0.1 s/token
+    router.record_success(local, 2.0, tokens=100)   # 0.02 s/token
+
+    assert [b.url for b in router.candidates()] == [LOCAL, GPU]
+
+
+def test_ewma_smooths_latency():
+    router = InferenceRouter(LOCAL, alpha=0.5)
+    local = router.local
+
+    router.record_success(local, 1.0, tokens=10)
+    router.record_success(local, 3.0, tokens=10)
+
+    assert local.ewma_latency == pytest.approx(0.2)
+
+
+def test_failed_backend_moves_to_the_back():
+    router = InferenceRouter(LOCAL, [GPU])
+    gpu, local = router.backends
+    router.record_success(gpu, 0.1, tokens=100)
+    router.record_success(local, 5.0, tokens=100)
+
+    router.record_failure(gpu, httpx.ConnectError("unreachable"))
+
+    assert [b.url for b in router.candidates()] == [LOCAL, GPU]
+    assert gpu.healthy is False
+    assert gpu.last_error == "unreachable"
+
+
+def test_snapshot_reports_last_decision():
+    router = InferenceRouter(LOCAL, [GPU])
+    backend = router.candidates()[0]
+    router.record_success(backend, 1.0, tokens=10)
+
+    snapshot = router.snapshot()
+
+    assert snapshot['last_decision']['order'] == [GPU, LOCAL]
+    assert snapshot['last_decision']['chosen'] == GPU
+    assert snapshot['backends'][0]['requests'] == 1
+
+
+@pytest.mark.asyncio
+async def test_probe_marks_backends_up_and_down():
+    router = InferenceRouter(LOCAL, [GPU])
+    gpu, local = router.backends
+    local.healthy = False
+
+    ok = MagicMock()
+    ok.raise_for_status = MagicMock()
+
+    async def fake_get(url, timeout=None):
+        if url.startswith(GPU):
+            raise httpx.ConnectError("no route to host")
+        return ok
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = MagicMock()
+        mock_context.get = AsyncMock(side_effect=fake_get)
+        mock_client.return_value = mock_context
+
+        await router.probe_all()
+
+    assert gpu.healthy is False
+    assert local.healthy is True
@@ -0,0 +1,112 @@
+"""
+Tests for the priority inference scheduler.
+"""
+
+import asyncio
+import pytest
+
+from inference_scheduler import InferenceScheduler, Priority
+
+
+async def _hold(scheduler, priority, room, order, release):
+    async with scheduler.slot(priority, room):
+        order.append((priority, room))
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency():
+    scheduler = InferenceScheduler(max_in_flight=1)
+    release = asyncio.Event()
+    order = []
+
+    tasks = [asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, "r", order, release)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert scheduler.in_flight == 1
+    assert scheduler.queue_depth() == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.in_flight == 0
+    assert len(order) == 3
+
+
+@pytest.mark.asyncio
+async def test_interactive_jumps_background_queue():
+    scheduler = InferenceScheduler(max_in_flight=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def run(priority, room):
+        async with scheduler.slot(priority, room):
+            order.append(priority)
+            await gate.wait()
+
+    first = asyncio.create_task(run(Priority.BACKGROUND, "a"))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.create_task(run(Priority.BACKGROUND, "a")),
+        asyncio.create_task(run(Priority.RECALL, "a")),
+        asyncio.create_task(run(Priority.INTERACTIVE, "a")),
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(first, *queued)
+
+    assert order == [Priority.BACKGROUND, Priority.INTERACTIVE, Priority.RECALL, Priority.BACKGROUND]
+
+
+@pytest.mark.asyncio
+async def test_rooms_take_turns_within_a_lane():
+    scheduler = InferenceScheduler(max_in_flight=1)
+    gate = asyncio.Event()
+    order = []
+
+    async def run(room):
+        async with scheduler.slot(Priority.INTERACTIVE, room):
+            order.append(room)
+            await gate.wait()
+
+    holder = asyncio.create_task(run("busy"))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(run(r)) for r in ["busy", "busy", "quiet"]]
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(holder, *queued)
+
+    assert order == ["busy", "busy", "quiet", "busy"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    scheduler = InferenceScheduler(max_in_flight=1)
+    gate = asyncio.Event()
+    order = []
+
+    holder = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, "r", order, gate))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(_hold(scheduler, Priority.INTERACTIVE, "r", order, gate))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.queue_depth() == 0
+    gate.set()
+    await holder
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_stats_report_lanes():
+    scheduler = InferenceScheduler(max_in_flight=2)
+    async with scheduler.slot(Priority.RECALL, "r"):
+        stats = scheduler.stats()
+        assert stats['in_flight'] == 1
+
+    stats = scheduler.stats()
+    assert stats['max_in_flight'] == 2
+    assert stats['lanes']['recall']['served'] == 1
+    assert stats['lanes']['interactive']['queued'] == 0
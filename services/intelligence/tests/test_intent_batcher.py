@@ -0,0 +1,88 @@
+"""
+Tests for micro-batched intent classification.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from intent_batcher import IntentBatcher
+
+
+def _intent(content, intent="CHAT"):
+    return {"intent": intent, "content": content, "slots": {}}
+
+
+@pytest.fixture
+def brain():
+    brain = MagicMock()
+    brain.analyze_intent = AsyncMock(side_effect=lambda c, room_id=None: _intent(c, "SINGLE"))
+    brain.analyze_intents = AsyncMock(side_effect=lambda cs, room_id=None: [_intent(c, "BATCH") for c in cs])
+    return brain
+
+
+@pytest.mark.asyncio
+async def test_lone_message_uses_single_call(brain):
+    batcher = IntentBatcher(brain, window_s=0.01)
+
+    result = await batcher.classify("hello there", room_id="room1")
+
+    assert result["intent"] == "SINGLE"
+    brain.analyze_intent.assert_called_once_with("hello there", room_id="room1")
+    brain.analyze_intents.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_messages_in_window_share_one_generation(brain):
+    batcher = IntentBatcher(brain, window_s=0.05)
+
+    results = await asyncio.gather(
+        batcher.classify("one", room_id="a"),
+        batcher.classify("two", room_id="b"),
+        batcher.classify("three", room_id="a"),
+    )
+
+    assert [r["content"] for r in results] == ["one", "two", "three"]
+    assert [r["intent"] for r in results] == ["BATCH", "SINGLE", "BATCH"]
+    # Split by room so each generation queues under its own room
+    brain.analyze_intents.assert_called_once_with(["one", "three"], room_id="a")
+    brain.analyze_intent.assert_called_once_with("two", room_id="b")
+    assert batcher.stats()["batched_messages"] == 2
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting(brain):
+    batcher = IntentBatcher(brain, window_s=10, max_batch=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.classify("one"), batcher.classify("two")), timeout=1
+    )
+
+    assert len(results) == 2
+    brain.analyze_intents.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_skipped_messages_fall_back_to_single_calls(brain):
+    brain.analyze_intents = AsyncMock(return_value=[_intent("one", "BATCH"), None])
+    batcher = IntentBatcher(brain, window_s=0.01)
+
+    first, second = await asyncio.gather(batcher.classify("one"), batcher.classify("two"))
+
+    assert first["intent"] == "BATCH"
+    assert second["intent"] == "SINGLE"
+    brain.analyze_intent.assert_called_once_with("two", room_id=None)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_message_is_dropped_from_batch(brain):
+    batcher = IntentBatcher(brain, window_s=0.05)
+
+    stale = asyncio.create_task(batcher.classify("stale"))
+    fresh = asyncio.create_task(batcher.classify("fresh"))
+    await asyncio.sleep(0)
+    stale.cancel()
+
+    result = await fresh
+    assert result["intent"] == "SINGLE"
+    brain.analyze_intent.assert_called_once_with("fresh", room_id=None)
@@ -0,0 +1,59 @@
+"""
+Tests for the rule-based fast-path intent classifier.
+"""
+
+import pytest
+
+from intent_rules import FastIntentClassifier
+
+
+@pytest.fixture
+def classifier():
+    return FastIntentClassifier()
+
+
+@pytest.mark.parametrize("message,intent,content", [
+    ("add milk and eggs to the list", "LIST_ADD", "milk, eggs"),
+    ("Please put bread, butter & jam on the shopping list", "LIST_ADD", "bread, butter, jam"),
+    ("What's on the list?", "LIST_SHOW", "What's on the list"),
+    ("show me the shopping list", "LIST_SHOW", "show me the shopping list"),
+    ("what's happening tomorrow?", "CALENDAR", "tomorrow"),
+    ("anything on this week?", "CALENDAR", "week"),
+    ("show me the calendar", "CALENDAR", ""),
+    ("put dentist Friday 3pm on the calendar", "SCHEDULE", "dentist Friday 3pm"),
+    ("remind me to call mom at 3pm", "REMINDER", "call mom at 3pm"),
+    ("don't forget to pick up the kids", "REMINDER", "pick up the kids"),
+    ("remember that the WiFi password is ABC123", "REMEMBER", "the WiFi password is ABC123"),
+    ("what do you know about sailing", "RECALL", "sailing"),
+    ("what did I miss?", "SUMMARIZE", "what did I miss"),
+    ("give me a briefing", "BRIEFING", "give me a briefing"),
+    ("thanks memu!", "CHAT", "thanks"),
+])
+def test_confident_matches(classifier, message, intent, content):
+    result = classifier.classify(message)
+    assert result == {"intent": intent, "content": content}
+
+
+def test_strips_bot_address(classifier):
+    result = classifier.classify("Hey Memu, what's on the list?")
+    assert result["intent"] == "LIST_SHOW"
+
+
+@pytest.mark.parametrize("message", [
+    "what's the WiFi password?",
+    "we need a plan for the weekend",
+    "remember when we went to Wales?",
+    "soccer practice Tuesday 5pm",
+    # Reminders and questions must not be saved as facts
+    "remember to call mom tomorrow at 5",
+    "remember to buy milk on friday",
+    "remember my locker code?",
+    "remember the plumber's number?",
+    "add milk to the list?",
+    # Not a shopping item
+    "we're out of time",
+    "we're out of bread",
+    "",
+])
+def test_ambiguous_messages_fall_back(classifier, message):
+    assert classifier.classify(message) is None
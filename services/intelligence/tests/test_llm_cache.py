@@ -0,0 +1,101 @@
+"""
+Tests for the LLM response cache.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from llm_cache import ResponseCache
+
+
+def test_key_normalizes_whitespace_but_not_case():
+    a = ResponseCache.make_key("m", "What's on   the list? ", None, "json")
+    b = ResponseCache.make_key("m", "What's on the list?", None, "json")
+    assert a == b
+    assert ResponseCache.make_key("m", "Remember the wifi password is Xy7Q", None, "json") != \
+        ResponseCache.make_key("m", "Remember the wifi password is xy7q", None, "json")
+
+
+def test_key_depends_on_model_and_format():
+    base = ResponseCache.make_key("m1", "prompt", None, "json")
+    assert base != ResponseCache.make_key("m2", "prompt", None, "json")
+    assert base != ResponseCache.make_key("m1", "prompt", None, None)
+
+
+@pytest.mark.asyncio
+async def test_hit_and_miss_counters():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+
+    assert await cache.get("k") is None
+    await cache.put("k", "m", "value")
+    assert await cache.get("k") == "value"
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    await cache.put("a", "m", "1")
+    await cache.put("b", "m", "2")
+    await cache.get("a")  # a is now most recently used
+    await cache.put("c", "m", "3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == "1"
+    assert cache.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry():
+    cache = ResponseCache(max_entries=10, ttl_seconds=60)
+    with patch("llm_cache.time.monotonic", return_value=1000.0):
+        await cache.put("k", "m", "value")
+    with patch("llm_cache.time.monotonic", return_value=1061.0):
+        assert await cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_model_change_invalidates():
+    cache = ResponseCache()
+    cache.use_model("m1")
+    await cache.put("k", "m1", "value")
+
+    cache.use_model("m2")
+
+    assert cache.stats()['entries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_persistent_store_used_on_memory_miss():
+    store = MagicMock()
+    store.prune_llm_cache = AsyncMock(return_value=3)
+    store.get_cached_response = AsyncMock(return_value="from db")
+    store.put_cached_response = AsyncMock()
+
+    cache = ResponseCache(ttl_seconds=60)
+    await cache.attach_store(store, ["m1", "small"])
+
+    store.prune_llm_cache.assert_called_once_with(["m1", "small"])
+    assert await cache.get("k") == "from db"
+    store.get_cached_response.assert_called_once_with("k", 60)
+
+    await cache.put("k2", "m1", "v")
+    store.put_cached_response.assert_called_once_with("k2", "m1", "v")
+
+
+@pytest.mark.asyncio
+async def test_store_errors_are_swallowed():
+    store = MagicMock()
+    store.get_cached_response = AsyncMock(side_effect=Exception("db down"))
+    store.put_cached_response = AsyncMock(side_effect=Exception("db down"))
+
+    cache = ResponseCache()
+    cache.store = store
+
+    assert await cache.get("k") is None
+    await cache.put("k", "m", "v")
+    assert await cache.get("k") == "v"
@@ -30,7 +30,8 @@ def mock_pool():
     pool = AsyncMock()
     conn = AsyncMock()
 
-    # Make pool.acquire() return an async context manager
+    # Make pool.acquire() return an async context manager (not a coroutine)
+    pool.acquire = MagicMock()
     pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
     pool.acquire.return_value.__aexit__ = AsyncMock(return_value=None)
 
@@ -324,3 +325,204 @@ async def test_get_last_usb_backup_time_returns_none_when_never_copied(memory_st
     result = await store.get_last_usb_backup_time()
 
     assert result is None
+
+
+# =============================================================================
+# Test: fact recall uses the full-text index
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_init_db_creates_fact_search_indexes(memory_store):
+    store, conn = memory_store
+
+    await store.init_db()
+
+    sql = conn.execute.call_args[0][0]
+    assert 'fact_tsv tsvector' in sql
+    assert 'CREATE TRIGGER trg_household_memory_tsv' in sql
+    assert 'USING GIN(fact_tsv)' in sql
+    assert 'household_memory(room_id, created_at DESC)' in sql
+    assert 'gin_trgm_ops' in sql
+
+
+@pytest.mark.asyncio
+async def test_recall_facts_ranks_full_text_matches(memory_store):
+    store, conn = memory_store
+    conn.fetchval.return_value = False
+    conn.fetch.return_value = [{'fact': "grandma's birthday is March 15", 'created_at': 1, 'created_by': '@a:test'}]
+
+    result = await store.recall_facts("room1", "birthdays")
+
+    from memory import _ANY_WORD_QUERY as ANY_WORD
+    sql, *params = conn.fetch.call_args[0]
+    assert 'fact_tsv @@ q' in sql
+    assert ANY_WORD in sql
+    assert 'ts_rank' in sql
+    assert 'ILIKE' not in sql
+    assert params == ["room1", "birthdays", 5]
+    assert result[0]['fact'].startswith("grandma")
+
+
+@pytest.mark.asyncio
+async def test_recall_facts_adds_fuzzy_matching_with_pg_trgm(memory_store):
+    store, conn = memory_store
+    conn.fetchval.return_value = True
+    conn.fetch.return_value = []
+
+    await store.recall_facts("room1", "wifi pasword")
+    await store.recall_facts("room1", "wifi")
+
+    sql, *params = conn.fetch.call_args[0]
+    assert 'word_similarity' in sql
+    assert params == ["room1", "wifi", "%wifi%", 5]
+    conn.fetchval.assert_called_once()  # extension check is cached
+
+
+# =============================================================================
+# Test: chat history comes from the local archive
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_search_chat_history_uses_archive(memory_store):
+    store, conn = memory_store
+    conn.fetch.return_value = [{'sender': '@a:test', 'body': 'dentist friday', 'timestamp': 1,
+                                'event_id': '$1', 'source': 'chat'}]
+
+    with patch('memory.Config') as config, patch('http_clients.clients.get') as http:
+        config.CHAT_ARCHIVE_ENABLED = True
+        results = await store.search_chat_history("room1", "dentist", limit=5)
+
+    http.assert_not_called()
+    from memory import _ANY_WORD_QUERY as ANY_WORD
+    sql, *params = conn.fetch.call_args[0]
+    assert 'body_tsv @@ q' in sql
+    assert ANY_WORD in sql
+    assert params == ["room1", "dentist", 5]
+    assert results[0]['body'] == 'dentist friday'
+
+
+@pytest.mark.asyncio
+async def test_archive_messages_reports_new_rows(memory_store):
+    store, conn = memory_store
+    conn.execute.return_value = "INSERT 0 1"
+
+    added = await store.archive_messages([
+        {'event_id': '$1', 'room_id': 'room1', 'sender': '@a:test', 'body': 'hi', 'timestamp': 5},
+    ])
+
+    assert added == 1
+    assert 'ON CONFLICT (event_id) DO NOTHING' in conn.execute.call_args[0][0]
+
+
+# =============================================================================
+# Test: semantic recall merges vector and keyword matches
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_init_db_adds_vector_columns_when_available(memory_store):
+    store, conn = memory_store
+
+    await store.init_db()
+
+    sql = conn.execute.call_args[0][0]
+    assert 'CREATE EXTENSION IF NOT EXISTS vectors' in sql
+    assert 'vector_cos_ops' in sql
+    assert 'EXCEPTION WHEN OTHERS' in sql
+
+
+@pytest.mark.asyncio
+async def test_unified_recall_fuses_vector_results(memory_store):
+    store, conn = memory_store
+    store.recall_facts = AsyncMock(return_value=[])
+    store.search_chat_history = AsyncMock(return_value=[
+        {'sender': '@a:test', 'body': 'birthday cake', 'timestamp': 1, 'event_id': '$1', 'source': 'chat'},
+    ])
+    store.vector_search = AsyncMock(side_effect=[
+        [{'fact': "grandma's birthday is March 15", 'created_at': 1, 'created_by': '@a:test'}],
+        [{'sender': '@b:test', 'body': "nan's party", 'timestamp': 2, 'event_id': '$2', 'source': 'chat'},
+         {'sender': '@a:test', 'body': 'birthday cake', 'timestamp': 1, 'event_id': '$1', 'source': 'chat'}],
+    ])
+
+    results = await store.unified_recall("room1", "nan's birthday", query_vector="[0.1,0.2]")
+
+    assert results['facts'][0]['fact'].startswith("grandma")
+    # Found by both searches, so it outranks the vector-only match
+    assert [m['event_id'] for m in results['chat']] == ['$1', '$2']
+
+
+@pytest.mark.asyncio
+async def test_unified_recall_keyword_only_when_vector_search_fails(memory_store):
+    store, conn = memory_store
+    store.recall_facts = AsyncMock(return_value=[{'fact': 'wifi is hunter2', 'created_at': 1, 'created_by': 'x'}])
+    store.search_chat_history = AsyncMock(return_value=[])
+    store.vector_search = AsyncMock(side_effect=Exception("type \"vector\" does not exist"))
+
+    results = await store.unified_recall("room1", "wifi", query_vector="[0.1]")
+
+    assert results['facts'][0]['fact'] == 'wifi is hunter2'
+
+
+@pytest.mark.asyncio
+async def test_vector_search_orders_by_cosine_distance(memory_store):
+    store, conn = memory_store
+    conn.fetch.return_value = [{'fact': 'bins go out tuesday', 'created_at': 1, 'created_by': 'x', 'distance': 0.2}]
+
+    results = await store.vector_search('facts', "room1", "[0.1,0.2]", limit=3)
+
+    sql, *params = conn.fetch.call_args[0]
+    assert 'ORDER BY embedding <=> $2::text::vector' in sql
+    assert params[:3] == ["room1", "[0.1,0.2]", 3]
+    assert results == [{'fact': 'bins go out tuesday', 'created_at': 1, 'created_by': 'x'}]
+
+
+@pytest.mark.asyncio
+async def test_edited_message_is_re_embedded(memory_store):
+    store, conn = memory_store
+    conn.fetchval.return_value = True
+
+    await store.update_archived_message("$1", "swimming at 11")
+
+    sql = conn.execute.call_args[0][0]
+    assert 'embedding = NULL' in sql
+
+
+@pytest.mark.asyncio
+async def test_get_unembedded_chat_newest_by_timestamp(memory_store):
+    store, conn = memory_store
+    conn.fetch.return_value = []
+
+    await store.get_unembedded('chat', 10)
+
+    assert 'ORDER BY origin_ts DESC' in conn.fetch.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_embedding_dimensions_reads_column_types(memory_store):
+    store, conn = memory_store
+    conn.fetch.return_value = [
+        {'table_name': 'household_memory', 'type': 'vector(768)'},
+        {'table_name': 'chat_archive', 'type': 'vector(768)'},
+    ]
+
+    assert await store.embedding_dimensions() == {'household_memory': 768, 'chat_archive': 768}
+
+
+# =============================================================================
+# Test: due reminders are claimed atomically
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_claim_due_reminders_skips_locked_rows(memory_store):
+    store, conn = memory_store
+    now = datetime(2030, 1, 1, 9, 0)
+    lease = now + timedelta(minutes=2)
+    conn.fetch.return_value = [{'id': 1, 'room_id': 'room1', 'user_id': '@a:test', 'content': 'bins',
+                                'due_at': now, 'attempts': 1}]
+
+    claimed = await store.claim_due_reminders(now, lease, "hub:1", limit=10)
+
+    sql, *params = conn.fetch.call_args[0]
+    assert 'FOR UPDATE SKIP LOCKED' in sql
+    assert 'RETURNING' in sql
+    assert params == [now, lease, "hub:1", 10]
+    assert claimed[0]['content'] == 'bins'
@@ -0,0 +1,86 @@
+"""
+Tests for the schema migration runner.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from migrator import Migration, MigrationError, MigrationRunner, load_migrations
+
+
+MIGRATIONS = [
+    Migration(1, 'initial', "CREATE TABLE IF NOT EXISTS a (id INT);\n"),
+    Migration(2, 'vectors', "ALTER TABLE a ADD COLUMN IF NOT EXISTS v vector({{dims}});\n"),
+]
+
+
+def _conn(applied=()):
+    conn = AsyncMock()
+    conn.fetch.return_value = [{'version': m.version, 'checksum': m.checksum} for m in applied]
+    return conn
+
+
+def test_shipped_migrations_are_ordered_and_unique():
+    migrations = load_migrations()
+    versions = [m.version for m in migrations]
+
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+    assert any('backup_history' in m.sql for m in migrations)
+
+
+def test_load_migrations_rejects_duplicate_versions(tmp_path):
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;")
+    (tmp_path / "0001_b.sql").write_text("SELECT 2;")
+
+    with pytest.raises(MigrationError):
+        load_migrations(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_up_to_date_database_costs_one_query():
+    conn = _conn(applied=MIGRATIONS)
+
+    assert await MigrationRunner(MIGRATIONS).run(conn) == []
+
+    conn.fetch.assert_awaited_once()
+    conn.fetchval.assert_not_called()
+    conn.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_pending_migrations_applied_in_one_script_under_lock():
+    conn = _conn(applied=MIGRATIONS[:1])
+
+    applied = await MigrationRunner(MIGRATIONS, params={'dims': 768}).run(conn)
+
+    assert applied == [2]
+    script = conn.execute.call_args[0][0]
+    assert 'vector(768)' in script
+    assert 'CREATE TABLE IF NOT EXISTS a' not in script
+    assert f"VALUES (2, 'vectors', '{MIGRATIONS[1].checksum}')" in script
+    locks = [c.args[0] for c in conn.fetchval.call_args_list if 'advisory' in c.args[0]]
+    assert locks == ["SELECT pg_advisory_lock($1)", "SELECT pg_advisory_unlock($1)"]
+
+
+@pytest.mark.asyncio
+async def test_new_database_gets_everything():
+    undefined_table = type('UndefinedTableError', (Exception,), {})
+    conn = AsyncMock()
+    conn.fetch.side_effect = undefined_table('relation "schema_migrations" does not exist')
+
+    with patch('migrator.asyncpg.UndefinedTableError', undefined_table):
+        applied = await MigrationRunner(MIGRATIONS).run(conn)
+
+    assert applied == [1, 2]
+    assert 'CREATE TABLE IF NOT EXISTS schema_migrations' in conn.execute.call_args[0][0]
+
+
+@pytest.mark.asyncio
+async def test_edited_migration_fails_checksum():
+    conn = _conn(applied=[Migration(1, 'initial', "CREATE TABLE a (id INT);\n")])
+
+    with pytest.raises(MigrationError):
+        await MigrationRunner(MIGRATIONS).run(conn)
+
+    conn.execute.assert_not_called()
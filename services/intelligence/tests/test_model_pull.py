@@ -0,0 +1,114 @@
+"""
+Tests for background model pulls.
+"""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from model_pull import ModelPuller
+
+
+@pytest.fixture
+def brain():
+    brain = MagicMock()
+    brain.ollama_url = "http://ollama:11434"
+    brain.active_models = MagicMock(return_value=["test-model"])
+    brain.embed_model = None
+    brain.is_model_available = AsyncMock(return_value=False)
+    return brain
+
+
+def _mock_stream(mock_client, lines, before_line=None):
+    async def aiter_lines():
+        for line in lines:
+            if before_line is not None:
+                before_line()
+            yield json.dumps(line)
+
+    response = MagicMock()
+    response.raise_for_status = MagicMock()
+    response.aiter_lines = aiter_lines
+    stream_ctx = MagicMock()
+    stream_ctx.__aenter__ = AsyncMock(return_value=response)
+    stream_ctx.__aexit__ = AsyncMock(return_value=None)
+
+    mock_context = MagicMock()
+    mock_context.stream = MagicMock(return_value=stream_ctx)
+    mock_client.return_value = mock_context
+    return mock_context
+
+
+@pytest.mark.asyncio
+async def test_skips_available_models(brain):
+    brain.is_model_available.return_value = True
+    puller = ModelPuller(brain)
+
+    with patch("http_clients.clients.get") as mock_client:
+        assert await puller.run() is True
+        mock_client.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_streams_progress_until_success(brain):
+    puller = ModelPuller(brain)
+    progress_seen = []
+
+    lines = [
+        {"status": "pulling manifest"},
+        {"status": "pulling abc", "digest": "sha256:abc", "total": 100, "completed": 42},
+        {"status": "pulling abc", "digest": "sha256:abc", "total": 100, "completed": 100},
+        {"status": "success"},
+    ]
+
+    def record():
+        progress_seen.append((puller.pulling, puller.is_loading("test-model"), puller.progress))
+
+    with patch("http_clients.clients.get") as mock_client:
+        mock_context = _mock_stream(mock_client, lines, before_line=record)
+        assert await puller.run() is True
+
+    # Progress as observed just before each line was processed
+    assert progress_seen[2] == (True, True, 42)
+    assert puller.pulling is False
+    assert not puller.is_loading("test-model")
+    assert puller.progress == 100
+    assert mock_context.stream.call_args.kwargs['json'] == {"name": "test-model", "stream": True}
+
+
+@pytest.mark.asyncio
+async def test_pull_error_is_reported(brain):
+    puller = ModelPuller(brain)
+
+    with patch("http_clients.clients.get") as mock_client:
+        _mock_stream(mock_client, [{"error": "pull model manifest: file does not exist"}])
+        assert await puller.run() is False
+
+    assert puller.failed == ["test-model"]
+    assert puller.pulling is False
+
+
+@pytest.mark.asyncio
+async def test_loading_state_is_per_model(brain):
+    brain.active_models.return_value = ["main-model"]
+    brain.embed_model = "embed-model"
+    brain.is_model_available = AsyncMock(side_effect=lambda m: m == "main-model")
+    puller = ModelPuller(brain)
+    seen = []
+
+    def record():
+        seen.append((puller.is_loading("main-model"), puller.is_loading("embed-model")))
+
+    with patch("http_clients.clients.get") as mock_client:
+        _mock_stream(mock_client, [{"status": "success"}], before_line=record)
+        assert await puller.run() is True
+
+    assert seen == [(False, True)]
+    assert not puller.is_loading("embed-model")
+
+
+def test_loading_message_includes_percent(brain):
+    puller = ModelPuller(brain)
+    puller._layers = {"a": (42, 100)}
+
+    assert "42%" in puller.loading_message()
@@ -0,0 +1,62 @@
+"""
+Tests for per-task generation profiles.
+"""
+
+from unittest.mock import patch
+
+from profiles import DEFAULT, INTENT_SCHEMA, PROFILES, _apply_overrides, get_profile
+from prompts import PROMPTS
+
+
+def test_every_prompt_template_has_a_profile():
+    assert set(PROMPTS) <= set(PROFILES)
+
+
+def test_json_tasks_are_schema_constrained_and_capped():
+    for task in ('intent', 'extract_reminder', 'extract_calendar_event'):
+        profile = get_profile(task)
+        assert profile.schema is not None
+        assert profile.temperature == 0.0
+        assert profile.options()['num_predict'] <= 160
+
+
+def test_format_uses_schema_when_structured_output_enabled():
+    profile = get_profile('intent')
+
+    with patch("profiles.Config.STRUCTURED_OUTPUT_ENABLED", True):
+        assert profile.format(json_mode=True) == INTENT_SCHEMA
+    with patch("profiles.Config.STRUCTURED_OUTPUT_ENABLED", False):
+        assert profile.format(json_mode=True) == 'json'
+    assert profile.format(json_mode=False) is None
+
+
+def test_num_ctx_falls_back_to_global_setting():
+    with patch("profiles.Config.OLLAMA_NUM_CTX", 0):
+        assert 'num_ctx' not in DEFAULT.options()
+    with patch("profiles.Config.OLLAMA_NUM_CTX", 4096):
+        assert DEFAULT.options()['num_ctx'] == 4096
+
+
+def test_unknown_task_uses_default():
+    assert get_profile('something_new') is DEFAULT
+    assert get_profile(None).options()['temperature'] == 0.7
+
+
+def test_overrides_merge_into_builtin_profiles():
+    profiles = {p.name: p for p in PROFILES.values()}
+
+    merged = _apply_overrides(
+        profiles,
+        '{"briefing": {"num_predict": 600, "bogus": 1}, "new_task": {"temperature": 0.1}}'
+    )
+
+    assert merged['briefing'].num_predict == 600
+    assert merged['briefing'].temperature == PROFILES['briefing'].temperature
+    assert merged['new_task'].temperature == 0.1
+
+
+def test_invalid_overrides_are_ignored():
+    profiles = {'chat': PROFILES['chat']}
+
+    assert _apply_overrides(dict(profiles), 'not json') == profiles
+    assert _apply_overrides(dict(profiles), '{"chat": 5}') == profiles
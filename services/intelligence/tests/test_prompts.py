@@ -0,0 +1,48 @@
+"""
+Tests for the prompt template registry.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from brain import Brain
+from prompts import PROMPTS
+
+
+@pytest.mark.parametrize("name", sorted(PROMPTS))
+def test_system_prefix_has_no_placeholders(name):
+    """The cached prefix must never depend on request data."""
+    template = PROMPTS[name]
+    assert template.name == name
+    assert "{content}" not in template.system
+    assert "{context}" not in template.system
+    assert "{query}" not in template.system
+
+
+def test_user_content_is_at_the_end():
+    rendered = PROMPTS['intent'].render(content="add milk")
+    assert rendered.rstrip().endswith('"add milk"')
+
+
+@pytest.mark.asyncio
+async def test_intent_prefix_is_identical_across_calls():
+    brain = Brain()
+    brain.generate = AsyncMock(return_value='{"intent": "NONE"}')
+
+    await brain.analyze_intent("first message")
+    await brain.analyze_intent("a completely different message")
+
+    first, second = brain.generate.call_args_list
+    assert first.kwargs['system_prompt'] == second.kwargs['system_prompt']
+    assert first.kwargs['task'] == "intent"
+    assert "first message" in first.args[0]
+
+
+def test_prompt_eval_report_averages_per_template():
+    brain = Brain()
+    with patch("brain.Config.PROMPT_METRICS_ENABLED", True):
+        brain._observe({'prompt_eval_count': 400, 'prompt_eval_duration': 2_000_000_000}, "intent")
+        brain._observe({'prompt_eval_count': 20, 'prompt_eval_duration': 100_000_000}, "intent")
+
+    report = brain.prompt_eval_report()
+    assert report['intent'] == {'calls': 2, 'avg_prompt_tokens': 210.0, 'avg_prompt_eval_ms': 1050.0}
@@ -0,0 +1,184 @@
+"""
+Tests for the event-driven reminder scheduler.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import reminder_scheduler
+from reminder_scheduler import ReminderScheduler
+
+
+def _reminder(reminder_id, seconds, content="take the bins out"):
+    return {'id': reminder_id, 'room_id': 'room1', 'user_id': '@a:test', 'content': content,
+            'due_at': datetime.now() + timedelta(seconds=seconds)}
+
+
+class FakeStore:
+    """The reminders table, with claim/lease semantics."""
+
+    def __init__(self, rows=()):
+        self.rows = {r['id']: {**r, 'processed': False, 'claimed_until': None, 'attempts': 0} for r in rows}
+        self.syncs = 0
+        self.claims = []
+        self.released = []
+        self.listen = AsyncMock(return_value=AsyncMock())
+
+    async def get_pending_reminders(self):
+        self.syncs += 1
+        return [{**r, 'due_at': max(r['due_at'], r['claimed_until'] or r['due_at'])}
+                for r in self.rows.values() if not r['processed']]
+
+    async def claim_due_reminders(self, now, lease_until, worker, limit=20):
+        claimed = []
+        for r in sorted(self.rows.values(), key=lambda r: r['due_at']):
+            if (not r['processed'] and r['due_at'] <= now
+                    and (r['claimed_until'] is None or r['claimed_until'] <= now)):
+                r['claimed_until'] = lease_until
+                r['attempts'] += 1
+                claimed.append(dict(r))
+            if len(claimed) == limit:
+                break
+        self.claims.append([r['id'] for r in claimed])
+        return claimed
+
+    async def mark_reminder_processed(self, reminder_id):
+        self.rows[reminder_id]['processed'] = True
+
+    async def release_reminder(self, reminder_id, retry_at, error):
+        self.released.append((reminder_id, retry_at, error))
+        self.rows[reminder_id]['claimed_until'] = retry_at
+        self.rows[reminder_id]['processed'] = retry_at is None
+
+
+def _scheduler(pending=()):
+    store = FakeStore(pending)
+    deliver = AsyncMock()
+    return ReminderScheduler(store, deliver, resync_interval=60), store, deliver
+
+
+async def _run_briefly(scheduler, seconds=0.2):
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_delivers_due_reminders_and_keeps_future_ones():
+    scheduler, store, deliver = _scheduler([_reminder(2, -1, "second"), _reminder(1, -5, "first"),
+                                            _reminder(3, 3600)])
+
+    await _run_briefly(scheduler)
+
+    assert sorted(c.args[0]['content'] for c in deliver.call_args_list) == ["first", "second"]
+    assert store.claims == [[1, 2]]
+    assert store.rows[1]['processed'] and store.rows[2]['processed']
+    assert not store.rows[3]['processed']
+    assert store.syncs == 1  # no polling
+
+
+@pytest.mark.asyncio
+async def test_added_reminder_wakes_the_sleeper():
+    scheduler, store, deliver = _scheduler()
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.05)
+
+    reminder = _reminder(7, 0.05)
+    store.rows[7] = {**reminder, 'processed': False, 'claimed_until': None, 'attempts': 0}
+    scheduler.add(reminder)
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    deliver.assert_awaited_once()
+    assert store.rows[7]['processed']
+
+
+@pytest.mark.asyncio
+async def test_notification_for_unknown_reminder_triggers_resync():
+    scheduler, store, deliver = _scheduler()
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.05)
+
+    store.rows[9] = {**_reminder(9, -1), 'processed': False, 'claimed_until': None, 'attempts': 0}
+    scheduler._on_notify("9")
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert store.syncs == 2
+    deliver.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lost_connection_relistens_and_resyncs():
+    scheduler, store, deliver = _scheduler()
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.05)
+
+    scheduler._on_connection_lost()
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert store.listen.await_count == 2
+    assert store.syncs == 2
+
+
+@pytest.mark.asyncio
+async def test_reminder_leased_by_another_worker_is_not_sent():
+    scheduler, store, deliver = _scheduler([_reminder(5, -1)])
+    lease_end = datetime.now() + timedelta(seconds=120)
+    store.rows[5]['claimed_until'] = lease_end
+
+    await _run_briefly(scheduler, 0.1)
+
+    deliver.assert_not_called()
+    # Due again here once the other worker's lease runs out
+    assert scheduler.next_due() == lease_end
+
+
+@pytest.mark.asyncio
+async def test_sends_concurrently_up_to_the_limit():
+    scheduler, store, deliver = _scheduler([_reminder(i, -1) for i in range(6)])
+    scheduler._sending = asyncio.Semaphore(2)
+    running, peak = 0, 0
+
+    async def slow_send(reminder):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    deliver.side_effect = slow_send
+    await _run_briefly(scheduler, 0.2)
+
+    assert deliver.await_count == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_with_backoff_then_given_up():
+    scheduler, store, deliver = _scheduler([_reminder(4, -1)])
+    deliver.side_effect = Exception("M_LIMIT_EXCEEDED")
+
+    await _run_briefly(scheduler, 0.1)
+
+    reminder_id, retry_at, error = store.released[0]
+    assert error == "M_LIMIT_EXCEEDED"
+    assert retry_at > datetime.now() + timedelta(seconds=reminder_scheduler.RETRY_DELAY - 5)
+    assert scheduler.next_due() == retry_at
+    assert scheduler.retry_delay(3) == reminder_scheduler.RETRY_DELAY * 4
+
+    scheduler.max_attempts = 1
+    await scheduler._failed({**_reminder(4, -1), 'attempts': 1}, Exception("M_FORBIDDEN"))
+    assert store.released[-1][1] is None
+    assert store.rows[4]['processed']
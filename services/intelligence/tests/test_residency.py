@@ -0,0 +1,80 @@
+"""
+Tests for the model residency manager.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from inference_scheduler import Priority
+from residency import ModelResidency
+
+
+@pytest.fixture
+def brain():
+    brain = MagicMock()
+    brain.enabled = True
+    brain.model = "test-model"
+    brain.generate = AsyncMock(return_value="Hello")
+    brain.active_models = MagicMock(return_value=["test-model"])
+    return brain
+
+
+def test_observe_counts_cold_starts(brain):
+    residency = ModelResidency(brain)
+
+    residency.observe({'load_duration': 4_000_000_000, 'eval_duration': 1_000_000_000})
+    residency.observe({'load_duration': 10_000_000, 'eval_duration': 1_000_000_000})
+
+    stats = residency.stats()
+    assert stats['requests'] == 2
+    assert stats['cold_starts'] == 1
+    assert stats['avg_eval_s'] == 1.0
+    assert stats['last_load_s'] == 0.01
+
+
+@pytest.mark.asyncio
+async def test_warm_up_uses_background_lane(brain):
+    residency = ModelResidency(brain)
+
+    assert await residency.warm_up() is True
+
+    kwargs = brain.generate.call_args.kwargs
+    assert kwargs['priority'] == Priority.BACKGROUND
+    assert kwargs['options'] == {'num_predict': 1}
+    assert residency.warmups == 1
+
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_every_task_model(brain):
+    brain.active_models.return_value = ["big-model", "small-model"]
+    residency = ModelResidency(brain)
+
+    await residency.warm_up()
+
+    warmed = [c.kwargs['model'] for c in brain.generate.call_args_list]
+    assert warmed == ["big-model", "small-model"]
+
+
+@pytest.mark.asyncio
+async def test_keep_alive_ping_skips_recently_used_model(brain):
+    residency = ModelResidency(brain)
+    residency.ping_interval_s = 600
+
+    with patch("residency.time.monotonic", return_value=1000.0):
+        residency.observe({'load_duration': 0, 'eval_duration': 0})
+    with patch("residency.time.monotonic", return_value=1100.0):
+        await residency.keep_alive_ping()
+    brain.generate.assert_not_called()
+
+    with patch("residency.time.monotonic", return_value=1700.0):
+        await residency.keep_alive_ping()
+    brain.generate.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_warm_up_noop_when_ai_disabled(brain):
+    brain.enabled = False
+    residency = ModelResidency(brain)
+
+    assert await residency.warm_up() is False
+    brain.generate.assert_not_called()
@@ -0,0 +1,108 @@
+"""
+Tests for semantic recall (embedding backfill and rank fusion).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from inference_scheduler import Priority
+from semantic_index import SemanticIndex, fuse, to_pgvector
+
+
+def _index(available=True):
+    brain = MagicMock()
+    brain.puller.is_loading = MagicMock(return_value=False)
+    store = MagicMock()
+    store.embedding_dimensions = AsyncMock(return_value={'household_memory': 768} if available else {})
+    brain.embed_model = "nomic-embed-text"
+    index = SemanticIndex(brain, store)
+    index.enabled = True
+    index.batch_size = 2
+    return index, brain, store
+
+
+def test_fuse_rewards_items_found_by_both_lists():
+    keyword = [{'id': 'a'}, {'id': 'b'}]
+    vector = [{'id': 'c'}, {'id': 'b'}]
+
+    assert [r['id'] for r in fuse(keyword, vector, key='id')] == ['b', 'a', 'c']
+    assert len(fuse(keyword, vector, key='id', limit=1)) == 1
+
+
+def test_to_pgvector_text_format():
+    assert to_pgvector([0.5, 1, -2.25]) == '[0.5,1.0,-2.25]'
+
+
+@pytest.mark.asyncio
+async def test_backfill_embeds_in_batches_until_done():
+    index, brain, store = _index()
+    store.get_unembedded = AsyncMock(side_effect=[
+        [{'key': 1, 'text': 'wifi is hunter2'}, {'key': 2, 'text': 'bins on tuesday'}],
+        [],
+        [{'key': '$1', 'text': 'dentist on friday at 3'}],
+        [],
+    ])
+    store.set_embeddings = AsyncMock()
+    brain.embed = AsyncMock(side_effect=[[[0.1, 0.2], [0.3, 0.4]], [[0.5, 0.6]]])
+
+    done = await index.backfill()
+
+    assert done == 3
+    assert brain.embed.call_args_list[0].kwargs['priority'] == Priority.BACKGROUND
+    store.set_embeddings.assert_any_call('facts', [1, 2], ['[0.1,0.2]', '[0.3,0.4]'])
+    store.set_embeddings.assert_any_call('chat', ['$1'], ['[0.5,0.6]'])
+
+
+@pytest.mark.asyncio
+async def test_backfill_stops_when_embedding_fails():
+    index, brain, store = _index()
+    store.get_unembedded = AsyncMock(return_value=[{'key': 1, 'text': 'wifi is hunter2'}])
+    store.set_embeddings = AsyncMock()
+    brain.embed = AsyncMock(side_effect=Exception("model not found"))
+
+    assert await index.backfill() == 0
+    store.set_embeddings.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_query_vector_none_without_pgvecto_rs():
+    index, brain, store = _index(available=False)
+    brain.embed = AsyncMock()
+
+    assert await index.query_vector("nan's birthday") is None
+    assert await index.query_vector("wifi") is None
+    brain.embed.assert_not_called()
+    store.embedding_dimensions.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_query_vector_falls_back_on_embed_error():
+    index, brain, store = _index()
+    brain.embed = AsyncMock(side_effect=Exception("timeout"))
+
+    assert await index.query_vector("nan's birthday") is None
+
+    brain.embed = AsyncMock(return_value=[[0.25, 0.5]])
+    assert await index.query_vector("nan's birthday") == '[0.25,0.5]'
+
+
+@pytest.mark.asyncio
+async def test_unavailable_while_embed_model_downloads():
+    index, brain, store = _index()
+    brain.puller.is_loading.return_value = True
+
+    assert await index.available() is False
+
+
+@pytest.mark.asyncio
+async def test_unavailable_when_columns_do_not_match_config(caplog):
+    index, brain, store = _index()
+    store.embedding_dimensions.return_value = {'household_memory': 768, 'chat_archive': 768}
+    brain.embed = AsyncMock()
+
+    with patch("semantic_index.Config.OLLAMA_EMBED_DIMENSIONS", 1024):
+        assert await index.available() is False
+        assert await index.query_vector("nan's birthday") is None
+
+    brain.embed.assert_not_called()
+    assert "OLLAMA_EMBED_DIMENSIONS=1024" in caplog.text
@@ -0,0 +1,108 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+import pytest
+
+from singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    gate = asyncio.Event()
+    calls = 0
+
+    async def fn(progress):
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "answer"
+
+    tasks = [asyncio.create_task(flights.do("k", fn)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == ["answer"] * 3
+    assert calls == 1
+    assert flights.stats() == {'in_flight': 0, 'started': 1, 'coalesced': 2}
+
+
+@pytest.mark.asyncio
+async def test_progress_fans_out_to_late_joiners():
+    flights = SingleFlight()
+    step = asyncio.Event()
+    first, second = [], []
+
+    async def fn(progress):
+        await progress("Hel")
+        await step.wait()
+        await progress("Hello")
+        return "Hello"
+
+    async def on_first(text):
+        first.append(text)
+
+    async def on_second(text):
+        second.append(text)
+
+    leader = asyncio.create_task(flights.do("k", fn, on_first))
+    await asyncio.sleep(0)
+    joiner = asyncio.create_task(flights.do("k", fn, on_second))
+    await asyncio.sleep(0)
+    step.set()
+    await asyncio.gather(leader, joiner)
+
+    assert first == ["Hel", "Hello"]
+    assert second == ["Hel", "Hello"]  # caught up, then live
+
+
+@pytest.mark.asyncio
+async def test_shared_call_survives_one_cancellation():
+    flights = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fn(progress):
+        await gate.wait()
+        return "done"
+
+    a = asyncio.create_task(flights.do("k", fn))
+    b = asyncio.create_task(flights.do("k", fn))
+    await asyncio.sleep(0)
+
+    a.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await a
+
+    gate.set()
+    assert await b == "done"
+
+
+@pytest.mark.asyncio
+async def test_last_cancellation_cancels_shared_call():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def fn(progress):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    a = asyncio.create_task(flights.do("k", fn))
+    await asyncio.sleep(0)
+    a.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await a
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flights.in_flight() == 0
+
+
+def test_key_ignores_stream_flag():
+    base = {'model': 'm', 'prompt': 'p'}
+    assert SingleFlight.make_key({**base, 'stream': True}) == SingleFlight.make_key({**base, 'stream': False})
+    assert SingleFlight.make_key(base) != SingleFlight.make_key({**base, 'prompt': 'q'})
@@ -0,0 +1,92 @@
+"""
+Tests for progressive (streamed) Matrix replies.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from streaming import StreamingReply, TYPING_MARKER
+
+
+@pytest.fixture
+def mock_bot():
+    bot = MagicMock()
+    bot.send_text = AsyncMock(return_value="$event1")
+    bot.edit_text = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def streaming_config():
+    with patch('streaming.Config') as mock_config:
+        mock_config.STREAMING_ENABLED = True
+        mock_config.STREAM_EDIT_INTERVAL = 0
+        yield mock_config
+
+
+@pytest.mark.asyncio
+async def test_first_update_sends_then_edits(mock_bot, streaming_config):
+    reply = StreamingReply(mock_bot, "room1", header="📋 Summary:\n")
+
+    await reply.update("Hello")
+    await reply.update("Hello world")
+
+    mock_bot.send_text.assert_called_once_with("room1", f"📋 Summary:\nHello{TYPING_MARKER}")
+    mock_bot.edit_text.assert_called_once_with("room1", "$event1", f"📋 Summary:\nHello world{TYPING_MARKER}")
+
+
+@pytest.mark.asyncio
+async def test_updates_are_throttled(mock_bot, streaming_config):
+    streaming_config.STREAM_EDIT_INTERVAL = 60
+    reply = StreamingReply(mock_bot, "room1")
+
+    await reply.update("a")
+    await reply.update("ab")
+    await reply.update("abc")
+
+    mock_bot.send_text.assert_called_once()
+    mock_bot.edit_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_finish_edits_final_text(mock_bot, streaming_config):
+    reply = StreamingReply(mock_bot, "room1")
+
+    await reply.update("partial")
+    await reply.finish("partial answer")
+
+    mock_bot.edit_text.assert_called_with("room1", "$event1", "partial answer")
+
+
+@pytest.mark.asyncio
+async def test_finish_without_progress_sends_message(mock_bot, streaming_config):
+    reply = StreamingReply(mock_bot, "room1", header="H: ")
+
+    await reply.finish("done")
+
+    mock_bot.send_text.assert_called_once_with("room1", "H: done")
+    mock_bot.edit_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_disabled_streaming_only_sends_final(mock_bot, streaming_config):
+    streaming_config.STREAMING_ENABLED = False
+    reply = StreamingReply(mock_bot, "room1")
+
+    await reply.update("partial")
+    await reply.finish("final")
+
+    mock_bot.send_text.assert_called_once_with("room1", "final")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_reply_is_marked_stopped(mock_bot, streaming_config):
+    reply = StreamingReply(mock_bot, "room1")
+
+    with pytest.raises(asyncio.CancelledError):
+        async with reply:
+            await reply.update("Half an ans")
+            raise asyncio.CancelledError()
+
+    mock_bot.edit_text.assert_called_once_with("room1", "$event1", "Half an ans … (stopped)")